@@ -0,0 +1,69 @@
+"""Per-worker memory of a WorkerPool sharing one loaded classifier.
+
+Loads the Russian classifier once, forks N workers, runs the tune corpus
+through them and prints each worker's memory before and after the work:
+``Rss`` counts the shared model pages in full, ``Pss`` splits them between
+sharers and ``Private_Dirty`` is the per-worker growth that actually has to
+fit in RAM.
+
+    python benchmarks/worker_rss.py --model lg --workers 16
+"""
+
+from pathlib import Path
+
+import click
+
+import ttc
+from ttc.corpus import find_corpus_files, load_corpus_file
+from ttc.pool import WorkerPool, process_memory, worker_memory
+
+TUNE_PATH = Path(__file__).parents[1] / "tests" / "russian" / "texts" / "tune"
+
+
+def _run_file(cc, path: Path) -> tuple[int, dict[str, int]]:
+    cf = load_corpus_file(path)
+    cc.connect_play(cc.extract_dialogue(cf.text))
+    return worker_memory(cc, path)
+
+
+def _by_worker(samples) -> dict[int, dict[str, int]]:
+    # the last sample of each worker is its high-water mark
+    return dict(samples)
+
+
+def _mb(kb: int) -> str:
+    return f"{kb / 1024:>9.1f}"
+
+
+@click.command()
+@click.option("--model", type=click.Choice(["sm", "md", "lg"]), default="sm")
+@click.option("--workers", type=click.IntRange(min=1), default=4)
+@click.option("--corpus", type=click.Path(exists=True, path_type=Path))
+def main(model: str, workers: int, corpus: Path | None):
+    cc = ttc.load("ru", model_size=model)
+    files = find_corpus_files(corpus or TUNE_PATH)
+    parent = process_memory()
+
+    with WorkerPool(cc, workers) as pool:
+        idle = _by_worker(pool.map(worker_memory, range(workers * 4)))
+        busy = _by_worker(pool.map(_run_file, files * max(1, workers // len(files))))
+
+    click.echo(f"parent ({model}): Rss {_mb(parent['Rss']).strip()} MB")
+    click.echo(f"{'worker':>8}{'Rss':>10}{'Pss':>10}{'Private':>10}{'+Private':>10}")
+    total = 0
+    for pid, after in sorted(busy.items()):
+        before = idle.get(pid, after)
+        growth = after["Private_Dirty"] - before["Private_Dirty"]
+        total += after["Private_Dirty"]
+        click.echo(
+            f"{pid:>8}{_mb(after['Rss'])} {_mb(after['Pss'])} "
+            f"{_mb(after['Private_Dirty'])} {_mb(growth)}"
+        )
+    click.echo(
+        f"private total {_mb(total).strip()} MB across {len(busy)} worker(s),"
+        f" vs. {_mb(parent['Rss'] * len(busy)).strip()} MB for unshared copies"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 from pathlib import Path
+from types import SimpleNamespace
 
 from ttc.corpora.audit import AuditReport, Disagreement, audit_native, format_report
+from ttc.corpus import load_corpus_file
+from ttc.language import PlayRow
+from ttc.predictions import PredictionCache
 
 FIXTURES = Path(__file__).parent / "fixtures" / "native"
 
@@ -37,3 +41,31 @@ def test_format_report_lists_disagreements():
     text = format_report(report)
     assert "out of bounds" in text
     assert "ясна" in text and "тозбек" in text and "HIGH" in text
+
+
+def test_disagreements_served_from_prediction_cache(tmp_path: Path):
+    class Uncallable:
+        language = SimpleNamespace(
+            meta={"lang": "ru", "name": "core_news_sm", "version": "0"}
+        )
+
+        def extract_dialogue(self, text):
+            raise AssertionError("pipeline must not run on a cache hit")
+
+    cc = Uncallable()
+    cache = PredictionCache(cc, root=tmp_path)
+    text = load_corpus_file(FIXTURES / "sample.txt").text
+    second = text.index("Здравствуй")
+    yasna = text.index("Ясна")
+    cache.put(
+        text,
+        [
+            PlayRow(2, 9, yasna, yasna + 4, "ясна", actor_lemma="ясна"),
+            PlayRow(second, second + 22, yasna, yasna + 4, "ясна", actor_lemma="ясна"),
+        ],
+        seconds=1.5,
+    )
+    report = audit_native([FIXTURES / "sample.txt"], cc=cc, cache=cache)
+    assert cache.hits == 1 and cache.misses == 0
+    (d,) = report.disagreements
+    assert (d.gold, d.pred, d.high_confidence) == ("тозбек", "ясна", True)
@@ -4,6 +4,14 @@ from pathlib import Path
 from click.testing import CliRunner
 
 from ttc.cli import cli
+from ttc.eval import (
+    AttrError,
+    Counters,
+    FileReport,
+    format_report,
+    in_shard,
+    report_to_dict,
+)
 
 FIXTURES = Path(__file__).parent / "fixtures"
 
@@ -38,3 +46,40 @@ def test_corpus_convert_unknown_source():
     res = CliRunner().invoke(cli, ["corpus", "convert", "nope", ".", "--out", "x"])
     assert res.exit_code != 0
     assert "Unknown corpus source" in res.output
+
+
+def test_eval_merge_reproduces_unsharded_report(tmp_path: Path):
+    reports = [
+        FileReport(
+            n_gold=10 + i,
+            n_pred=9 + i,
+            n_matched=8,
+            n_attr_correct=i,
+            path=Path(f"tune/text-{i}.txt"),
+            errors=[AttrError(f"replica {i}", "a", "b")],
+            seconds=i / 3,
+            qtype_counters={"explicit": Counters(n_gold=i, n_matched=i)},
+        )
+        for i in range(8)
+    ]
+    partials = []
+    for shard in range(3):
+        partial = tmp_path / f"part-{shard}.json"
+        rows = [
+            {"index": i, **report_to_dict(r)}
+            for i, r in enumerate(reports)
+            if in_shard(r.path.name, (shard, 3))
+        ]
+        sections = [{"title": "tune", "kind": "paths", "reports": rows}]
+        partial.write_text(json.dumps({"shard": [shard, 3], "sections": sections}))
+        partials.append(str(partial))
+
+    runner = CliRunner()
+    res = runner.invoke(cli, ["eval", "merge", *partials, "--by-file", "--errors"])
+    assert res.exit_code == 0, res.output
+    expected = format_report(reports, by_file=True, show_errors=True)
+    assert res.output == f"== tune\n{expected}\n"
+
+    res = runner.invoke(cli, ["eval", "merge", *partials[:2]])
+    assert res.exit_code != 0
+    assert "one partial report per shard" in res.output
@@ -1,8 +1,18 @@
+import io
+import json
 from pathlib import Path
 
+import pytest
+
 from tests.corpora.util import assert_matches_golden
-from ttc.corpora.jy_quoteplus import convert
-from ttc.corpora.schema import validate
+from ttc.corpora.jy_quoteplus import (
+    context_overlap,
+    convert,
+    convert_stitched,
+    iter_json_array,
+)
+from ttc.corpora.schema import to_dict, validate
+from ttc.corpora.splits import doc_split
 
 FIXTURES = Path(__file__).parent / "fixtures" / "jy_quoteplus"
 
@@ -23,3 +33,113 @@ def test_convert_mini_items():
     # speaker mention located before the quote
     assert d1.text[d1.mentions[0].start : d1.mentions[0].end] == "郭靖"
     assert_matches_golden(docs, FIXTURES / "golden.jsonl")
+
+
+def test_convert_stitched_shares_contexts():
+    (doc,) = convert_stitched(FIXTURES)  # both items quote the same context
+    assert doc.doc_id == "jy_quoteplus/mini/00000-00001"
+    assert validate(doc) == []
+    items = list(convert(FIXTURES))
+    assert doc.text == items[0].text
+    assert [r.origin for r in doc.replicas] == [d.doc_id for d in items]
+    names = {c.id: c.name for c in doc.characters}
+    assert [names[r.speaker] for r in doc.replicas] == ["郭靖", "黄蓉"]
+    assert [names[r.addressee] for r in doc.replicas] == ["黄蓉", "郭靖"]
+    assert len(doc.characters) == 2
+
+
+def test_convert_stitched_joins_overlaps(tmp_path):
+    first = "郭靖说道：“师父，我们走吧。”黄蓉笑道:“好啊。”"
+    second = "黄蓉笑道:“好啊。”洪七公道：“走罢。”"
+
+    def item(quote, context, speaker):
+        return {
+            "quote": quote,
+            "context": context,
+            "labels": {"说话人-entity": speaker},
+        }
+
+    items = [
+        item("“师父，我们走吧。”", first, "郭靖"),
+        item("“走罢。”", second, "洪七公"),
+        item("“嗯。”", "完全无关的段落。郭靖道：“嗯。”", "郭靖"),
+    ]
+    (tmp_path / "a.json").write_text(json.dumps(items), encoding="utf-8")
+    assert context_overlap(first, second) == len("黄蓉笑道:“好啊。”")
+    stitched, unrelated = convert_stitched(tmp_path / "a.json")
+    assert stitched.text == first + "洪七公道：“走罢。”"
+    assert stitched.doc_id == "jy_quoteplus/a/00000-00001"
+    assert [stitched.text[r.start : r.end] for r in stitched.replicas] == [
+        "“师父，我们走吧。”",
+        "“走罢。”",
+    ]
+    assert validate(stitched) == []
+    assert unrelated.doc_id == "jy_quoteplus/a/00002"
+    assert [r.origin for r in unrelated.replicas] == ["jy_quoteplus/a/00002"]
+
+
+def test_convert_stitched_keeps_item_splits(tmp_path):
+    context = "郭靖说道：“师父，我们走吧。”黄蓉笑道:“好啊。”"
+    items = [
+        {"quote": q, "context": context, "labels": {"说话人-entity": "郭靖"}}
+        for q in ("“师父，我们走吧。”", "“好啊。”", "“师父，我们走吧。”")
+    ]
+    (tmp_path / "d.json").write_text(json.dumps(items), encoding="utf-8")
+    docs = list(convert_stitched(tmp_path / "d.json"))
+    plain = {d.doc_id: doc_split(d) for d in convert(tmp_path / "d.json")}
+    assert list(plain.values()) == ["heldout", "heldout", "tune"]
+    # items 0 and 1 share a passage, item 2 shares the context but not the split
+    assert [d.doc_id for d in docs] == [
+        "jy_quoteplus/d/00000-00001",
+        "jy_quoteplus/d/00002",
+    ]
+    for doc in docs:
+        assert {plain[r.origin] for r in doc.replicas} == {doc_split(doc)}
+    assert all(
+        "origin" not in r
+        for r in to_dict(convert(tmp_path / "d.json").__next__())["replicas"]
+    )
+
+
+def test_convert_stitched_looks_for_contexts_near_the_end(tmp_path):
+    opening = "郭靖说道：“师父，我们走吧。”"
+    items = [
+        {
+            "quote": "“师父，我们走吧。”",
+            "context": c,
+            "labels": {"说话人-entity": "郭靖"},
+        }
+        for c in (opening + "两人沿着湖边慢慢走去。" * 5, opening)
+    ]
+    (tmp_path / "a.json").write_text(json.dumps(items), encoding="utf-8")
+    # the second context only occurs far from the end of the first one
+    assert [d.doc_id for d in convert_stitched(tmp_path / "a.json")] == [
+        "jy_quoteplus/a/00000",
+        "jy_quoteplus/a/00001",
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+def test_iter_json_array_matches_json_loads(chunk_size):
+    items = [
+        12345,
+        -0.5e3,
+        'а, ] [ \\" ” 引号',
+        {"labels": {"听者-entity": ["黄蓉", None]}, "n": [1, [2, []]]},
+        [],
+        {},
+        True,
+        None,
+    ]
+    for text in (json.dumps(items), json.dumps(items, indent=2), " [ ] ", "[7]"):
+        expected = json.loads(text)
+        assert list(iter_json_array(io.StringIO(text), chunk_size)) == expected
+    mini = (FIXTURES / "mini.json").read_text(encoding="utf-8")
+    with (FIXTURES / "mini.json").open(encoding="utf-8") as f:
+        assert list(iter_json_array(f, chunk_size)) == json.loads(mini)
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1 2]", "[1,", '["unterminated]'])
+def test_iter_json_array_rejects_malformed_input(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO(text), chunk_size=3))
@@ -1,7 +1,9 @@
 from pathlib import Path
 
+import pytest
+
 from tests.corpora.util import assert_matches_golden
-from ttc.corpora.native import convert
+from ttc.corpora.native import ReplicaLocator, convert
 from ttc.corpora.schema import validate
 
 FIXTURES = Path(__file__).parent / "fixtures" / "native"
@@ -25,3 +27,26 @@ def test_convert_sample():
     yasna = next(c for c in doc.characters if c.name == "ясна")
     assert set(yasna.aliases) == {"принцесса", "светлость"}
     assert_matches_golden(docs, FIXTURES / "golden.jsonl")
+
+
+def test_locator_is_whitespace_insensitive_and_ordered():
+    text = "– Да,\n  – сказал он. –  Да,\tда.\n"
+    locator = ReplicaLocator(text)
+    first = locator.find("Да,")
+    assert first == (2, 5)
+    second = locator.find("Да, да.", first[1])
+    assert second is not None
+    assert text[second[0] : second[1]] == "Да,\tда."
+    # a position inside a whitespace run still finds the next word
+    assert locator.find("сказал он.", 7) == (text.index("сказал"), 20)
+    assert locator.find("сказал", second[1]) is None
+    assert locator.find("  ", 4) == (4, 4)
+
+
+def test_unlocatable_replica_warns(tmp_path):
+    path = tmp_path / "missing.txt"
+    text = (FIXTURES / "sample.txt").read_text(encoding="utf-8")
+    path.write_text(text.replace("Тозбек::Здравствуй", "Тозбек::Прощай"), "utf-8")
+    with pytest.warns(UserWarning, match="replica not found"):
+        (doc,) = convert(path)
+    assert [doc.text[r.start : r.end] for r in doc.replicas] == ["Привет,"]
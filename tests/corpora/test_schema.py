@@ -1,13 +1,17 @@
+import json
 from pathlib import Path
 
 from ttc.corpora.schema import (
+    BlobText,
     Character,
     CorpusDoc,
     Cue,
     Mention,
     Replica,
+    ReplicaTable,
     doc_from_dict,
     read_jsonl,
+    text_blob_path,
     to_dict,
     validate,
     write_jsonl,
@@ -80,3 +84,58 @@ def test_validate_catches_issues():
         "qtype",
     ):
         assert needle in issues, issues
+
+
+def test_schema_dataclasses_are_slotted():
+    doc = make_doc()
+    for obj in (doc.replicas[0], doc.replicas[0].cue, doc.characters[0]):
+        assert not hasattr(obj, "__dict__")
+    assert not hasattr(doc.mentions[0], "__dict__")
+
+
+def test_replica_table_round_trip(tmp_path: Path):
+    doc = make_doc()
+    doc.replicas.append(Replica(23, 30, None, mode="thought"))
+    path = tmp_path / "c.jsonl"
+    write_jsonl([doc], path)
+    (compact,) = read_jsonl(path, compact=True)
+    assert isinstance(compact.replicas, ReplicaTable)
+    assert compact == doc
+    assert list(compact.replicas) == doc.replicas
+    assert compact.replicas[-1].speaker is None
+    assert compact.replicas[-1].cue is None
+    assert compact.replicas[1:] == doc.replicas[1:]
+    assert to_dict(compact) == to_dict(doc)
+
+
+def test_replica_table_interns_speakers():
+    table = ReplicaTable.from_replicas(
+        [Replica(i, i + 1, f"char_{i % 2}") for i in range(100)]
+    )
+    assert len(table) == 100 and table.strings == ["char_0", "char_1"]
+    assert [r.speaker for r in table[:3]] == ["char_0", "char_1", "char_0"]
+    assert table.nbytes == 100 * 9 * 4
+
+
+def test_text_blob_round_trip(tmp_path: Path):
+    docs = [make_doc(), make_doc()]
+    docs[1].doc_id = "pdnc/emma/2"
+    docs[1].text = "«Ёж» — 🦔\n"
+    docs[1].replicas = []
+    docs[1].mentions = []
+    path = tmp_path / "c.jsonl"
+    write_jsonl(docs, path, text_blob=True)
+    assert text_blob_path(path).stat().st_size == 4 * sum(len(d.text) for d in docs)
+    record = json.loads(path.read_text(encoding="utf-8").splitlines()[1])
+    assert "text" not in record and record["text_span"] == [34, 9]
+
+    loaded = list(read_jsonl(path))
+    assert loaded == docs
+    emma, hedgehog = (doc.text for doc in loaded)
+    assert isinstance(emma, BlobText)
+    assert len(emma) == len(docs[0].text)
+    assert emma[0:12] == "“Come here,”" and emma[-1] == "."
+    assert hedgehog[-2:] == "🦔\n" and str(hedgehog) == docs[1].text
+    assert bytes(hedgehog.view(0, 1)) == "«".encode("utf-32-le")
+    assert to_dict(loaded[1]) == to_dict(docs[1])
+    assert validate(loaded[0]) == []
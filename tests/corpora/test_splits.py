@@ -1,4 +1,4 @@
-from ttc.corpora.splits import split_of
+from ttc.corpora.splits import shard_of, split_of
 
 
 def test_split_deterministic_and_roughly_proportional():
@@ -11,3 +11,20 @@ def test_split_deterministic_and_roughly_proportional():
 
 def test_split_values():
     assert {split_of(f"x/{i}") for i in range(50)} <= {"tune", "heldout"}
+
+
+def test_shards_cover_all_ids():
+    ids = [f"pdnc/novel/{i}" for i in range(1000)]
+    shards = [shard_of(i, 4) for i in ids]
+    assert shards == [shard_of(i, 4) for i in ids]
+    assert all(200 <= shards.count(s) <= 300 for s in range(4))
+    assert {shard_of(i, 1) for i in ids} == {0}
+
+
+def test_shards_are_even_within_one_split():
+    tune = [
+        i for i in (f"jy_quoteplus/x/{n}" for n in range(5000)) if split_of(i) == "tune"
+    ]
+    for n in (4, 5):
+        shards = [shard_of(i, n) for i in tune]
+        assert all(0.8 <= shards.count(s) * n / len(tune) <= 1.2 for s in range(n))
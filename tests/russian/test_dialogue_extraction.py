@@ -1,6 +1,19 @@
+from pathlib import Path
+from typing import Final
+
+import numpy as np
 import pytest
 
 import ttc
+from ttc.corpus import find_corpus_files, load_corpus_file
+from ttc.language.russian.pipelines.replicizer import (
+    NEWLINE,
+    LineMatches,
+    token_classes,
+)
+from ttc.language.russian.token_extensions import is_hyphen
+
+TUNE_PATH: Final = Path(__file__).parent / "texts" / "tune"
 
 
 @pytest.fixture(scope="module")
@@ -180,3 +193,22 @@ def test_unquoted_insertion_with_no_action_verb(cc):
         "Он умер?!",
         "С ним же все было в порядке на той неделе!",
     ]
+
+
+@pytest.mark.parametrize(
+    "path", find_corpus_files(TUNE_PATH, recursive=False), ids=lambda p: p.name
+)
+def test_line_matches_agree_with_span_matching(cc, path):
+    doc = cc.extract_dialogue(load_corpus_file(path).text).doc
+    line_ends = np.flatnonzero(token_classes(doc) & NEWLINE)
+    decision_points = [t.i for t in doc[:-1] if t.is_punct and is_hyphen(doc[t.i + 1])]
+    for matcher in cc.token_matchers.values():
+        matches = LineMatches(doc, matcher, line_ends)
+        for i in decision_points:
+            line_end = int(line_ends[np.searchsorted(line_ends, i)])
+            expected = [
+                m for m in matcher(doc[i : line_end + 1], as_spans=True) if m.start == i
+            ]
+            assert [(m.start, m.end, m.label) for m in matches.starting_at(i)] == [
+                (m.start, m.end, m.label) for m in expected
+            ]
@@ -0,0 +1,37 @@
+import pickle
+
+import spacy
+from spacy.tokens import Doc
+
+from ttc.language.russian.pipelines.line_numerator import _mark_line_numbers
+
+TEXT = "— Да.\n— Нет,\n\nсказал он."
+
+
+def test_line_numbers():
+    if not Doc.has_extension("nl_indices"):
+        Doc.set_extension("nl_indices", default=frozenset())
+    doc = spacy.blank("ru").make_doc(TEXT.replace("\n", " "))
+    doc._.nl_indices = frozenset(i for i, c in enumerate(TEXT) if c == "\n")
+    assert [t._.line_no for t in doc] == [1] * len(doc)
+
+    doc = _mark_line_numbers(doc)
+
+    assert [(t.text, t._.line_no) for t in doc] == [
+        ("—", 1),
+        ("Да", 1),
+        (".", 1),
+        ("—", 2),
+        ("Нет", 2),
+        (",", 2),
+        (" ", 3),  # the second newline is a token itself
+        ("сказал", 3),
+        ("он", 3),
+        (".", 3),
+    ]
+    assert doc[1:5]._.start_line_no == 1
+    assert doc[1:5]._.end_line_no == 2
+    # a single user_data entry, whatever the doc length
+    assert len(doc.user_data) == 2
+    copy = pickle.loads(pickle.dumps(doc))
+    assert [t._.line_no for t in copy] == [t._.line_no for t in doc]
@@ -0,0 +1,45 @@
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+from ttc.language.russian.pipelines.actor_classifier import (
+    NameIndex,
+    nearest_after,
+    nearest_before,
+)
+
+TOKENS = [  # word, pos, morph, lemma
+    ("Ясна", "PROPN", "Case=Nom", "ясна"),
+    ("видела", "VERB", "", "видеть"),
+    ("Ясну", "PROPN", "Case=Acc", "ясна"),
+    ("и", "CCONJ", "", "и"),
+    ("раба", "NOUN", "Animacy=Anim|Case=Acc", "раб"),
+    (".", "PUNCT", "", "."),
+    ("Ясна", "PROPN", "Case=Nom", "ясна"),
+    ("ушла", "VERB", "", "уйти"),
+    ("к", "ADP", "", "к"),
+    ("рабу", "NOUN", "Animacy=Anim|Case=Dat", "раб"),
+]
+
+
+def make_doc() -> Doc:
+    words, pos, morphs, lemmas = map(list, zip(*TOKENS))
+    return Doc(Vocab(), words=words, pos=pos, morphs=morphs, lemmas=lemmas)
+
+
+def test_name_index():
+    doc = make_doc()
+    index = NameIndex.of(doc)
+    assert index is NameIndex.of(doc)  # built once per doc
+    assert index.nominative_propn_by_lemma == {"ясна": [0, 6]}
+    assert index.nominative_propn_by_prefix["яс"] == [0, 6]
+    assert "ясну" not in index.nominative_propn_by_prefix  # oblique
+    assert index.oblique_noun_by_lemma == {"раб": [4, 9]}
+
+
+def test_nearest_occurrence():
+    positions = [0, 6]
+    assert nearest_before(positions, 0) is None
+    assert nearest_before(positions, 6) == 0
+    assert nearest_before(positions, 7) == 6
+    assert nearest_after(positions, 6) == 6
+    assert nearest_after(positions, 7) is None
@@ -0,0 +1,55 @@
+import spacy
+from spacy.tokens import Doc
+
+from ttc.language.common.token_extensions import has_newline
+from ttc.language.russian.pipelines.replicizer import (
+    CLOSE_QUOTE,
+    COLON,
+    HYPHEN,
+    NEWLINE,
+    OPEN_QUOTE,
+    PUNCT,
+    ReplicaState,
+    significant_tokens,
+    token_classes,
+)
+
+TEXT = "Он сказал:\n— Да, — и ушёл.\n«Нет», — ответили ему."
+
+
+def make_doc() -> Doc:
+    if not Doc.has_extension("nl_indices"):
+        Doc.set_extension("nl_indices", default=frozenset())
+    doc = spacy.blank("ru").make_doc(TEXT.replace("\n", " "))
+    doc._.nl_indices = frozenset(i for i, c in enumerate(TEXT) if c == "\n")
+    return doc
+
+
+def test_token_classes():
+    doc = make_doc()
+    codes = token_classes(doc)
+    assert [bool(c & NEWLINE) for c in codes] == [has_newline(t) for t in doc]
+    by_text = {t.text: int(c) for t, c in zip(doc, codes)}
+    assert by_text["—"] & HYPHEN and by_text["—"] & PUNCT
+    assert by_text[":"] & COLON
+    assert by_text["«"] & OPEN_QUOTE and not by_text["«"] & CLOSE_QUOTE
+    assert by_text["»"] & CLOSE_QUOTE
+    assert by_text["сказал"] == 0
+
+
+def test_significant_tokens():
+    doc = make_doc()
+    stops = significant_tokens(token_classes(doc))
+    texts = {state: [doc[int(i)].text for i in stops[state]] for state in ReplicaState}
+    # a hyphen opening a line and a quote after punctuation
+    assert texts[ReplicaState.AUTHOR] == ["—", "«"]
+    assert texts[ReplicaState.REPLICA_BY_COLON_AND_QUOTE] == ["»"]
+    # line ends and hyphens after punctuation
+    assert texts[ReplicaState.REPLICA_BY_NEWLINE_AND_HYPHEN] == [
+        ":",
+        "—",
+        "—",
+        ".",
+        "—",
+        ".",
+    ]
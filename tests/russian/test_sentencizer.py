@@ -0,0 +1,25 @@
+import spacy
+from spacy.tokens import Doc
+
+from ttc.language.russian.pipelines.sentencizer import Sentencizer
+
+TEXT = "Он пришёл. Сел! — Да?! — спросил он —\n— Нет...\nНу"
+
+
+def test_sentence_starts():
+    if not Doc.has_extension("nl_indices"):
+        Doc.set_extension("nl_indices", default=frozenset())
+    doc = spacy.blank("ru").make_doc(TEXT.replace("\n", " "))
+    doc._.nl_indices = frozenset(i for i, c in enumerate(TEXT) if c == "\n")
+
+    [starts] = Sentencizer("sentencizer").predict([doc])
+
+    assert [t.text for t, start in zip(doc, starts) if start] == [
+        "Он",  # the first token
+        "Сел",  # after a period
+        "—",  # a hyphen after a period
+        "—",  # ... after several periods
+        "—",  # a hyphen before a newline starts the next line's sentence
+        "Ну",  # after a newline
+    ]
+    assert Sentencizer("sentencizer").predict([doc[:0].as_doc()]) == [[]]
@@ -0,0 +1,99 @@
+import re
+
+import spacy
+from spacy.tokens import Doc
+
+from ttc.language import Attribution, ConversationClassifier, Dialogue, Play
+from ttc.language.russian import tiered
+from ttc.language.russian.tiered import (
+    TieredConversationClassifier,
+    escalation_regions,
+    original_text,
+)
+
+TEXT = (
+    "Иван вошёл.\n"
+    "– Привет, – сказал он.\n"
+    "– Здравствуй.\n"
+    "– Как дела?\n"
+    "\n"
+    "Прошёл час.\n"
+    "– Пора."
+)
+
+
+def make_doc(text: str) -> Doc:
+    doc = spacy.blank("xx").make_doc(text.replace("\n", " "))
+    if not Doc.has_extension("nl_indices"):
+        Doc.set_extension("nl_indices", default=frozenset())
+    doc._.nl_indices = frozenset(i for i, c in enumerate(text) if c == "\n")
+    return doc
+
+
+def dash_lines(doc: Doc, text: str) -> list:
+    return [
+        doc.char_span(m.start(), m.end(), alignment_mode="expand")
+        for m in re.finditer(r"^–.*$", text, flags=re.MULTILINE)
+    ]
+
+
+def test_escalation_regions_cover_whole_lines_with_context():
+    replicas = dash_lines(make_doc(TEXT), TEXT)
+    assert len(replicas) == 4
+    ((start, end, indices),) = escalation_regions(TEXT, replicas, [2])
+    # from the line above the first context replica to the uncertain line end
+    assert TEXT[start:end] == TEXT[: TEXT.index("\n\n")]
+    assert indices == [2]
+
+
+def test_escalation_regions_merge_overlaps():
+    replicas = dash_lines(make_doc(TEXT), TEXT)
+    ((start, end, indices),) = escalation_regions(TEXT, replicas, [1, 3])
+    assert (start, end, indices) == (0, len(TEXT), [1, 3])
+
+
+def test_original_text():
+    assert original_text(make_doc(TEXT)) == TEXT
+
+
+class FirstTokenSpeaks(ConversationClassifier):
+    """Dash lines are replicas, all spoken by the first token of the text."""
+
+    def __init__(self, sources: list[Attribution]):
+        self.language = spacy.blank("xx")
+        self.sources = sources
+        self.texts: list[str] = []
+
+    def extract_dialogue(self, text: str) -> Dialogue:
+        self.texts.append(text)
+        doc = make_doc(text)
+        return Dialogue(self.language, doc, dash_lines(doc, text))
+
+    def connect_play(self, dialogue: Dialogue) -> Play:
+        play = Play(self.language)
+        for replica, source in zip(dialogue.replicas, self.sources):
+            play[replica] = dialogue.doc[0:1]
+            play.sources[replica] = source
+        return play
+
+
+def test_only_uncertain_replicas_are_escalated(monkeypatch):
+    text = "Иван вошёл.\n– Привет.\n– Здравствуй.\n– Как дела?\n– Хорошо.\n– Пора."
+    sure, guess = Attribution.AUTHOR_SPEECH, Attribution.ALTERNATION
+    fast = FirstTokenSpeaks([sure, sure, Attribution.LINE_ABOVE, sure, guess])
+    accurate = FirstTokenSpeaks([Attribution.LINE_ABOVE] * 5)
+    models = {"sm": fast, "lg": accurate}
+    monkeypatch.setattr(tiered, "RussianConversationClassifier", models.get)
+
+    cc = TieredConversationClassifier()
+    dialogue = fast.extract_dialogue(text)
+    play = cc.connect_play(dialogue)
+    assert (cc.n_escalated, cc.n_replicas) == (1, 5)
+    # the lines of the three replicas before the uncertain one, and the line above
+    region = text[text.index("– Привет") :]
+    assert accurate.texts == [region]
+    *kept, escalated = dialogue.replicas
+    assert [play[r].text for r in kept] == ["Иван"] * 4
+    # the first token of the region, as offsets into the whole text
+    assert play[escalated].start_char == text.index("– Привет")
+    assert play.sources[escalated] == Attribution.LINE_ABOVE
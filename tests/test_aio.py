@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+import spacy
+
+from ttc.aio import AsyncClassifier
+from ttc.language import ConversationClassifier, Dialogue, Play
+
+
+class FirstWordSpeaks(ConversationClassifier):
+    """Every text is one replica spoken by its first word; "boom" fails."""
+
+    def __init__(self):
+        self.language = spacy.blank("xx")
+        self.batches: list[list[str]] = []
+        self.threads: set[str] = set()
+
+    def extract_dialogue(self, text: str) -> Dialogue:
+        if text == "boom":
+            raise ValueError(text)
+        doc = self.language.make_doc(text)
+        return Dialogue(self.language, doc, [doc[:]])
+
+    def extract_dialogues(self, texts):
+        self.batches.append(list(texts))
+        self.threads.add(threading.current_thread().name)
+        return [self.extract_dialogue(text) for text in texts]
+
+    def connect_play(self, dialogue: Dialogue) -> Play:
+        play = Play(self.language)
+        play[dialogue.replicas[0]] = dialogue.doc[0:1]
+        return play
+
+
+def test_concurrent_requests_are_batched():
+    cc = FirstWordSpeaks()
+
+    async def main():
+        async with AsyncClassifier(cc, max_batch=4, window=0.05) as aio:
+            texts = [f"speaker{i} says hello" for i in range(10)]
+            results = await asyncio.gather(*(aio.classify(t) for t in texts))
+            return aio.metrics, texts, results
+
+    metrics, texts, results = asyncio.run(main())
+    assert [list(r.lines(t)) for r, t in zip(results, texts, strict=True)] == [
+        [(t, t.split()[0])] for t in texts
+    ]
+    assert [len(b) for b in cc.batches] == [4, 4, 2]
+    assert cc.threads == {"ttc-aio_0"}
+    assert metrics.requests == 10 and metrics.batches == 3
+    assert metrics.mean_batch_size == 10 / 3
+    assert 0 < metrics.latency(0.5) <= metrics.latency(0.99)
+
+
+def test_failing_text_fails_only_its_request():
+    cc = FirstWordSpeaks()
+
+    async def main():
+        async with AsyncClassifier(cc, window=0.05) as aio:
+            return await asyncio.gather(
+                aio.classify("a b"), aio.classify("boom"), return_exceptions=True
+            )
+
+    ok, failed = asyncio.run(main())
+    assert list(ok.lines("a b")) == [("a b", "a")]
+    assert isinstance(failed, ValueError)
+
+
+def test_backpressure():
+    cc = FirstWordSpeaks()
+
+    async def main():
+        aio = AsyncClassifier(cc, max_queue=1)
+        with pytest.raises(RuntimeError):
+            await aio.classify("a")
+        async with aio:
+            first = asyncio.ensure_future(aio.classify("a", wait=False))
+            await asyncio.sleep(0)  # queued, not yet taken by the batcher
+            assert aio.queue_depth == 1
+            with pytest.raises(asyncio.QueueFull):
+                await aio.classify("b", wait=False)
+            await first
+        return aio.metrics
+
+    metrics = asyncio.run(main())
+    assert (metrics.requests, metrics.rejected) == (1, 1)
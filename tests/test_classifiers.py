@@ -0,0 +1,56 @@
+from ttc.classifiers import ClassifierPool
+
+
+class Loads:
+    """Stand-in for ``ttc.load`` that counts loads and holds ``mb`` of memory."""
+
+    def __init__(self, mb: int = 0):
+        self.mb = mb
+        self.calls: list[tuple[str, str | None]] = []
+
+    def __call__(self, lang: str, model_size: str | None = None):
+        self.calls.append((lang, model_size))
+        if lang == "xx":
+            return None
+        return (lang, model_size, b"m" * (self.mb << 20))
+
+
+def test_pool_loads_each_key_once():
+    load = Loads()
+    pool = ClassifierPool(max_size=2, load=load)
+    ru = pool.get("ru", "sm")
+    assert pool.get(" RU ", "sm") is ru
+    assert pool.get("ru", "lg") is not ru
+    assert pool.get("xx") is None and len(pool) == 2
+    assert load.calls == [("ru", "sm"), ("ru", "lg"), ("xx", None)]
+
+
+def test_pool_evicts_least_recently_used():
+    load = Loads()
+    pool = ClassifierPool(max_size=2, load=load)
+    pool.get("ru")
+    pool.get("en")
+    pool.get("ru")  # en is now the least recently used
+    pool.get("zh")
+    assert ("ru", None) in pool and ("zh", None) in pool
+    assert ("en", None) not in pool
+    pool.get("en")
+    assert load.calls.count(("en", None)) == 2
+
+
+def test_pool_memory_cap():
+    pool = ClassifierPool(max_size=10, memory_cap=100 << 10, load=Loads(mb=64))
+    pool.get("ru")
+    assert pool.memory >= 64 << 10
+    pool.get("en")  # 128 MB > 100 MB: ru goes
+    assert len(pool) == 1 and ("en", None) in pool
+
+
+def test_pool_keeps_pinned_classifiers():
+    load = Loads()
+    pool = ClassifierPool(max_size=2, load=load)
+    ru = pool.get("ru", pin=True)
+    pool.get("en")
+    pool.get("zh")  # ru is the least recently used, but pinned
+    assert ("ru", None) in pool and ("en", None) not in pool
+    assert pool.get("ru") is ru and load.calls.count(("ru", None)) == 1
@@ -0,0 +1,117 @@
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import spacy
+
+from ttc.corpora.schema import CorpusDoc
+from ttc.corpus import DELIMITER, parse_corpus_content
+from ttc.eval import (
+    FileReport,
+    diff_predictions,
+    evaluate_file,
+    evaluate_interchange_docs,
+    format_diff,
+    read_snapshot,
+    report_from_dict,
+    report_to_dict,
+    write_snapshot,
+)
+from ttc.language import ConversationClassifier, Dialogue, Play
+
+GOLD = [("— Да.", "анна"), ("— Нет.", "иван"), ("— Ну?", "анна"), ("— Ах.", "иван")]
+
+
+def test_diff_predictions():
+    old = [("— Да.", "анна"), ("— Нет.", "анна"), ("— Ах.", "иван")]
+    new = [("— Да.", "иван"), ("— Нет.", "иван"), ("— Ну?", "анна"), ("— Ах.", "иван")]
+    diff = diff_predictions(Path("a.txt"), GOLD, old, new)
+    assert [(c.replica, c.old, c.new) for c in diff.fixed] == [
+        ("— Нет.", "анна", "иван"),
+        ("— Ну?", None, "анна"),  # newly extracted
+    ]
+    assert [(c.replica, c.old, c.new) for c in diff.broken] == [
+        ("— Да.", "анна", "иван")
+    ]
+    assert (diff.old.n_matched, diff.old.n_attr_correct) == (3, 2)
+    assert (diff.new.n_matched, diff.new.n_attr_correct) == (4, 3)
+
+    text = format_diff([diff])
+    assert "fixed   2  broken   1" in text
+    assert "e2e  +25.0pp" in text and "(2 -> 3/4)" in text
+    assert "— Да." not in format_diff([diff], show_replicas=False)
+
+    other = diff_predictions(Path("heldout/b.txt"), GOLD, new, old)
+    text = format_diff([diff, other], show_replicas=lambda d: d is diff)
+    assert "+ 'иван' (was 'анна') | — Нет." in text  # a.txt listed
+    assert "- 'иван' -> 'анна' | — Нет." not in text  # heldout/b.txt not
+    assert "b.txt" in text
+
+
+def test_snapshot_round_trip(tmp_path):
+    reports = [
+        FileReport(path=Path("a.txt"), digest="d1", pred=GOLD[:2]),
+        FileReport(path=Path("b.txt"), digest="d2", pred=[]),
+        FileReport(path=None),
+    ]
+    snapshot = tmp_path / "snapshot.json"
+    assert write_snapshot(reports, snapshot) == 2
+    assert read_snapshot(snapshot) == {"d1": GOLD[:2], "d2": []}
+
+
+class CountingTiers(ConversationClassifier):
+    """Re-parses every other replica, like a tiered classifier counting them."""
+
+    def __init__(self):
+        self.language = spacy.blank("xx")
+        self.n_replicas = self.n_escalated = 0
+
+    def extract_dialogue(self, text: str) -> Dialogue:
+        doc = self.language.make_doc(text)
+        return Dialogue(self.language, doc, [doc[:]])
+
+    def connect_play(self, dialogue: Dialogue) -> Play:
+        self.n_replicas += 2
+        self.n_escalated += 1
+        return Play(self.language)
+
+
+def test_reports_count_escalations():
+    cc = CountingTiers()
+    cc.n_replicas = cc.n_escalated = 7  # from earlier texts
+    cf = parse_corpus_content(f"Ян спит.\n{DELIMITER}\n")
+    report = evaluate_file(cc, cf)
+    assert report.escalation == (1, 2)
+    assert report_from_dict(report_to_dict(report)).escalation == (1, 2)
+
+
+class Batches(CountingTiers):
+    """Records the batches of texts it is asked to parse."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches: list[list[str]] = []
+
+    def extract_dialogues(self, texts: Iterable[str]) -> Iterator[Dialogue]:
+        self.batches.append(list(texts))
+        return map(self.extract_dialogue, self.batches[-1])
+
+
+def test_interchange_docs_are_parsed_as_one_batch(tmp_path):
+    from ttc.predictions import PredictionCache
+
+    docs = [
+        CorpusDoc(f"d{i}", "xx", "fiction", "test", "CC0", text)
+        for i, text in enumerate(["Ян спит.", "Ян встал.", "Ян спит."])
+    ]
+    cc = Batches()
+    reports = list(evaluate_interchange_docs(cc, docs))
+    assert cc.batches == [["Ян спит.", "Ян встал.", "Ян спит."]]
+    assert [r.path for r in reports] == [Path("d0"), Path("d1"), Path("d2")]
+    assert [r.escalation for r in reports] == [(1, 2)] * 3
+
+    cache = PredictionCache(cc, tmp_path)
+    list(evaluate_interchange_docs(cc, docs[:1], cache))
+    reports = list(evaluate_interchange_docs(cc, docs, cache))
+    assert cc.batches[-1] == ["Ян встал."]  # cached texts are not parsed again
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert [r.escalation for r in reports] == [(0, 0), (1, 2), (0, 0)]
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+import spacy
+
+from ttc.extract import MANIFEST, Outcome, extract_books, find_books, read_manifest
+from ttc.language import ConversationClassifier, Dialogue, Play
+
+
+class FirstWordSpeaks(ConversationClassifier):
+    """Every text is one replica spoken by its first word; "boom" fails."""
+
+    def __init__(self):
+        self.language = spacy.blank("xx")
+        self.texts: list[str] = []
+
+    def extract_dialogue(self, text: str) -> Dialogue:
+        if text == "boom":
+            raise ValueError(text)
+        self.texts.append(text)
+        doc = self.language.make_doc(text)
+        return Dialogue(self.language, doc, [doc[:]])
+
+    def connect_play(self, dialogue: Dialogue) -> Play:
+        play = Play(self.language)
+        play[dialogue.replicas[0]] = dialogue.doc[0:1]
+        return play
+
+
+@pytest.fixture
+def library(tmp_path):
+    root = tmp_path / "books"
+    (root / "tolstoy").mkdir(parents=True)
+    (root / "tolstoy" / "war.txt").write_text("Пьер сказал: да", encoding="utf-8")
+    (root / "gogol.txt").write_text("Чичиков молчал", encoding="utf-8")
+    (root / "notes.md").write_text("not a book", encoding="utf-8")
+    return root
+
+
+def test_find_books(library):
+    by_dir = find_books([str(library)])
+    assert [b.key for b in by_dir] == ["gogol", "tolstoy/war"]
+    by_glob = find_books([str(library / "**" / "*.txt")])
+    assert by_glob == by_dir
+    assert [b.key for b in find_books([str(library / "gogol.txt")])] == ["gogol"]
+    (library / "tolstoy" / "gogol.txt").write_text("", encoding="utf-8")
+    with pytest.raises(ValueError, match="both map to gogol"):
+        find_books([str(library / "gogol.txt"), str(library / "tolstoy")])
+
+
+def test_extract_writes_rows_and_skips_up_to_date(library, tmp_path):
+    cc, out = FirstWordSpeaks(), tmp_path / "out"
+    books = find_books([str(library)])
+    assert [o for _, o, _ in extract_books(cc, books, out)] == [Outcome.CLASSIFIED] * 2
+    rows = (out / "tolstoy" / "war.jsonl").read_text(encoding="utf-8").splitlines()
+    assert json.loads(rows[0]) == {
+        "start_char": 0,
+        "end_char": 15,
+        "actor_start_char": 0,
+        "actor_end_char": 4,
+        "actor_key": "пьер",
+        "confidence": 1.0,
+        "actor_lemma": "",
+    }
+
+    (library / "gogol.txt").write_text("Ноздрёв кричал", encoding="utf-8")
+    cc.texts.clear()
+    classified = {b.key: o for b, o, _ in extract_books(cc, books, out)}
+    assert classified == {
+        "gogol": Outcome.CLASSIFIED,
+        "tolstoy/war": Outcome.UP_TO_DATE,
+    }
+    assert cc.texts == ["Ноздрёв кричал"]
+    assert read_manifest(out)["gogol"]["replicas"] == 1
+
+    cc.texts.clear()
+    list(extract_books(cc, books, out, force=True))
+    assert len(cc.texts) == 2
+
+
+def test_extract_resumes_after_a_killed_run(library, tmp_path):
+    cc, out = FirstWordSpeaks(), tmp_path / "out"
+    books = find_books([str(library)])
+    next(extract_books(cc, books, out))  # killed after the first book
+    with (out / MANIFEST).open("a", encoding="utf-8") as f:
+        f.write('{"book": "tolstoy/w')  # ... and while appending the second
+    cc.texts.clear()
+    classified = {b.key: o for b, o, _ in extract_books(cc, books, out)}
+    assert classified == {
+        "gogol": Outcome.UP_TO_DATE,
+        "tolstoy/war": Outcome.CLASSIFIED,
+    }
+    assert cc.texts == ["Пьер сказал: да"]
+    assert set(read_manifest(out)) == {"gogol", "tolstoy/war"}
+
+
+def test_extract_in_workers(library, tmp_path):
+    out = tmp_path / "out"
+    books = find_books([str(library)])
+    outcomes = [o for _, o, _ in extract_books(FirstWordSpeaks(), books, out, 2)]
+    assert outcomes == [Outcome.CLASSIFIED] * 2
+    assert (out / "gogol.jsonl").read_text(encoding="utf-8").count("\n") == 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_extract_goes_past_bad_books(library, tmp_path, workers):
+    (library / "bad.txt").write_bytes(b"\xff\xfe not utf-8")
+    (library / "boom.txt").write_text("boom", encoding="utf-8")
+    cc, out = FirstWordSpeaks(), tmp_path / "out"
+    books = find_books([str(library)])
+    results = {b.key: (o, e) for b, o, e in extract_books(cc, books, out, workers)}
+    assert results["bad"][0] == results["boom"][0] == Outcome.FAILED
+    assert results["boom"][1] == "ValueError: boom"
+    assert results["gogol"] == results["tolstoy/war"] == (Outcome.CLASSIFIED, None)
+    manifest = read_manifest(out)
+    assert "UnicodeDecodeError" in manifest["bad"]["error"]
+
+    (library / "boom.txt").write_text("Всё хорошо", encoding="utf-8")
+    results = {b.key: o for b, o, _ in extract_books(cc, books, out, workers)}
+    assert results == {
+        "bad": Outcome.FAILED,
+        "boom": Outcome.CLASSIFIED,
+        "gogol": Outcome.UP_TO_DATE,
+        "tolstoy/war": Outcome.UP_TO_DATE,
+    }
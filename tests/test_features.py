@@ -0,0 +1,33 @@
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+from ttc.language.common.features import FeatureStore
+
+TOKENS = [  # word, pos, morph, entity
+    ("Ясна", "PROPN", "Animacy=Anim|Case=Nom|Gender=Fem", "B-PER"),
+    ("видела", "VERB", "Gender=Fem|Mood=Ind", "O"),
+    ("рабов", "NOUN", "Animacy=Anim|Case=Acc,Gen|Number=Plur", "O"),
+    (".", "PUNCT", "", "O"),
+]
+
+
+def make_doc() -> Doc:
+    words, pos, morphs, ents = map(list, zip(*TOKENS))
+    return Doc(Vocab(), words=words, pos=pos, morphs=morphs, ents=ents)
+
+
+def test_feature_store_matches_token_morph():
+    doc = make_doc()
+    store = FeatureStore.of(doc)
+    assert store is FeatureStore.of(doc)
+    for name in ("Animacy", "Case", "Gender", "Number", "Person"):
+        assert [store.values(name, t.i) for t in doc] == [
+            t.morph.get(name) for t in doc
+        ]
+    assert store.has("Case", "Gen").tolist() == [False, False, True, False]
+    assert store.has("Case").tolist() == [True, False, True, False]
+    assert store.has_pair("Animacy=Anim").tolist() == [True, False, True, False]
+    assert store.feature("Gender")[0] == store.feature("Gender")[1] != 0
+    assert store.is_ent("PER").tolist() == [True, False, False, False]
+    assert not store.is_ent("LOC").any()
+    assert [int(p) for p in store.pos] == [t.pos for t in doc]
@@ -0,0 +1,30 @@
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+from ttc.language.common.memo import Memo, activate, memoized
+
+WORDS = ["Привет", ",", "Ясна", "."]
+calls: list[str] = []
+
+
+@memoized
+def text_length(obj):
+    calls.append(obj.text)
+    return len(obj.text)
+
+
+def test_memoized_by_offsets_while_active():
+    doc = Doc(Vocab(), words=WORDS, spaces=[False, True, False, False])
+    calls.clear()
+    text_length(doc[0:2])
+    text_length(doc[0:2])
+    assert len(calls) == 2  # no active memo
+
+    memo = Memo()
+    with activate(memo):
+        assert text_length(doc[0:2]) == 7
+        assert text_length(doc[0:2]) == 7  # a new Span object, same offsets
+        assert text_length(doc[2]) == 4
+        assert text_length(doc[2:3]) == 4  # a span is not its token
+    assert calls[2:] == ["Привет,", "Ясна", "Ясна"]
+    assert memo.stats() == {text_length.__qualname__: (1, 3)}
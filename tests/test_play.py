@@ -0,0 +1,78 @@
+import gc
+import weakref
+
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+from ttc.language import Attribution, Play, PlayResult, PlayRow
+from ttc.language.play import CONFIDENCE
+
+
+def make_doc() -> Doc:
+    return Doc(Vocab(), words=["Привет", ",", "Ясна", ".", "Пока", "."])
+
+
+def test_play_version_changes_on_mutation():
+    doc = make_doc()
+    play, other = Play(None), Play(None)  # type: ignore[arg-type]
+    assert play.version != other.version
+    version = play.version
+    play[doc[0:2]] = doc[2:3]
+    assert play.version != version
+    version = play.version
+    del play[doc[0:2]]
+    assert play.version != version
+
+
+def test_play_replica_bounds_from_the_bottom():
+    doc = make_doc()
+    play = Play(None)  # type: ignore[arg-type]
+    play[doc[4:6]] = None
+    play[doc[0:2]] = None
+    play[doc[0:1]] = None  # same start: insertion order is kept
+    play[doc[4:6]] = doc[2:3]  # re-attribution does not move the bound
+    assert list(play.replica_bounds()) == [(4, 6), (0, 2), (0, 1)]
+    del play[doc[0:2]]
+    assert list(play.replica_bounds()) == [(4, 6), (0, 1)]
+
+
+def test_play_result_is_detached_from_the_doc():
+    doc = make_doc()
+    play = Play(None)  # type: ignore[arg-type]
+    play[doc[0:4]] = doc[2:3]
+    play[doc[4:6]] = None
+    result = PlayResult.of(play)
+    assert list(result) == [
+        PlayRow(0, 15, 9, 13, "ясна"),
+        PlayRow(16, 22, None, None, ""),
+    ]
+    assert list(result.lines(doc.text)) == [
+        ("Привет , Ясна .", "Ясна"),
+        ("Пока .", None),
+    ]
+    ref = weakref.ref(doc)
+    del doc, play
+    gc.collect()
+    assert ref() is None
+    assert len(result) == 2
+
+
+def test_play_confidence_by_attribution():
+    doc = make_doc()
+    play = Play(None)  # type: ignore[arg-type]
+    play[doc[0:2]] = doc[2:3]
+    play.sources[doc[0:2]] = Attribution.AUTHOR_SPEECH
+    play[doc[4:6]] = doc[2:3]
+    play.sources[doc[4:6]] = Attribution.ALTERNATION
+    play[doc[3:4]] = None
+    play.sources[doc[3:4]] = Attribution.LINE_ABOVE  # but nothing was found
+    play[doc[2:3]] = None  # untracked
+    assert [play.confidence(r) for r in play.replicas] == [
+        CONFIDENCE[Attribution.AUTHOR_SPEECH],
+        CONFIDENCE[Attribution.ALTERNATION],
+        0.0,
+        1.0,
+    ]
+    assert [row.confidence for row in PlayResult.of(play)] == [0.9, 0.4, 0.0, 1.0]
+    del play[doc[4:6]]
+    assert doc[4:6] not in play.sources
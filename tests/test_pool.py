@@ -0,0 +1,26 @@
+import os
+import threading
+
+from ttc.pool import WorkerPool, process_memory
+
+
+class Unpicklable:
+    def __init__(self):
+        self.lock = threading.Lock()  # cannot cross a process boundary
+        self.scale = 10
+
+
+def scaled(shared: Unpicklable, item: int) -> tuple[int, int]:
+    return os.getpid(), item * shared.scale
+
+
+def test_workers_inherit_shared_state_in_order():
+    with WorkerPool(Unpicklable(), workers=2) as pool:
+        results = list(pool.map(scaled, range(20)))
+    assert [value for _, value in results] == [i * 10 for i in range(20)]
+    assert os.getpid() not in {pid for pid, _ in results}
+
+
+def test_process_memory():
+    counters = process_memory()
+    assert counters["Rss"] >= counters["Private_Dirty"] > 0
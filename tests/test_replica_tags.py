@@ -0,0 +1,34 @@
+from spacy.tokens import Doc, Span
+from spacy.vocab import Vocab
+
+from ttc.language.common.span_extensions import (
+    SPAN_EXTENSIONS,
+    replica_tag_bit,
+    replica_tag_table,
+)
+
+for name, ext in SPAN_EXTENSIONS.items():
+    if not Span.has_extension(name):
+        Span.set_extension(name, **ext)
+
+
+def test_replica_tags():
+    doc = Doc(Vocab(), words=["а", "б", "в", "г", "д", "е"])
+    first, second, third = doc[4:6], doc[0:2], doc[0:3]
+    doc._.replica_tags = replica_tag_table(
+        [first, second], [replica_tag_bit("is_before_author_ending"), 0]
+    )
+    assert first._.is_before_author_ending
+    assert not first._.is_before_author_insertion
+    assert not second._.is_before_author_ending
+    assert not third._.is_unannotated_alternation
+
+    third._.set("is_unannotated_alternation", True)
+    second._.set("is_after_author_starting", True)
+    first._.set("is_before_author_ending", False)
+
+    assert third._.is_unannotated_alternation
+    assert second._.is_after_author_starting
+    assert not second._.is_unannotated_alternation
+    assert not first._.is_before_author_ending
+    assert doc._.replica_tags[:, :2].tolist() == [[0, 2], [0, 3], [4, 6]]
@@ -0,0 +1,49 @@
+from ttc.language import PlayResult, PlayRow
+from ttc.language.common.constants import CLOSE_QUOTES, HYPHENS, OPEN_QUOTES
+from ttc.language.common.sanitizer import doc_text, normalize, sanitize
+
+RAW = "―\xa0При\xadвет,  — сказал Ян.  \r\n\n\n   ‒ Пока „да“"
+
+
+def test_normalize_keeps_offsets():
+    text = normalize(RAW)
+    assert len(text) == len(RAW)
+    assert text.startswith("— При\xadвет")
+    assert text.endswith("— Пока «да»")
+    assert text[0] in HYPHENS and text[-4] in OPEN_QUOTES and text[-1] in CLOSE_QUOTES
+    assert normalize(text) == text
+
+
+def test_doc_text_moves_newlines_aside():
+    text, nl_indices = doc_text("— Да.\r\n— Нет ")
+    assert text == "— Да.  — Нет "
+    assert nl_indices == {6, 12}
+
+
+def test_sanitize_maps_offsets_back():
+    clean = sanitize(RAW)
+    assert clean.text == "— Привет, — сказал Ян.\n\n— Пока «да»"
+    for i, c in enumerate(clean.text):
+        if not c.isspace():
+            assert normalize(RAW)[clean.original(i)] == c
+    # an end offset before a dropped run stays at the run's start
+    assert clean.original(clean.text.index("\n")) == RAW.index(".") + 1
+
+    ian = clean.text.index("Ян")
+    result = PlayResult(
+        (PlayRow(0, 9, ian, ian + 2, "ян"), PlayRow(24, 35, None, None, ""))
+    )
+    restored = clean.restore(result)
+    assert RAW[restored.rows[0].start_char : restored.rows[0].end_char] == (
+        "―\xa0При\xadвет,"
+    )
+    assert RAW[restored.rows[0].actor_start_char : restored.rows[0].actor_end_char] == (
+        "Ян"
+    )
+    assert restored.rows[1][2:] == (None, None, "", 1.0, "")
+    assert RAW[restored.rows[1].start_char : restored.rows[1].end_char] == "‒ Пока „да“"
+
+
+def test_sanitize_unchanged_text():
+    clean = sanitize("— Да.\n\n— Нет.")
+    assert clean.text == "— Да.\n\n— Нет." and clean.starts == (0,)
@@ -0,0 +1,71 @@
+import spacy
+from spacy.tokens import Doc
+
+from ttc.language import ConversationClassifier, Dialogue, Play
+from ttc.language.scenes import SceneClassifier, connect_scenes, split_scenes
+from ttc.pool import WorkerPool
+
+TEXT = (
+    "— Привет, — сказал Ян.\n"
+    "— Пока.\n"
+    "\n"
+    "— Утро. — Ян зевнул.\n"
+    "* * *\n"
+    "— Вечер."
+)
+
+
+class FirstWordClassifier(ConversationClassifier):
+    """Attributes every replica to its first word."""
+
+    def __init__(self):
+        self.language = spacy.blank("ru")
+
+    def extract_dialogue(self, text: str) -> Dialogue:
+        if not Doc.has_extension("nl_indices"):
+            Doc.set_extension("nl_indices", default=frozenset())
+        doc = self.language.make_doc(text.replace("\n", " "))
+        doc._.nl_indices = frozenset(i for i, c in enumerate(text) if c == "\n")
+        replicas = [
+            doc[t.i + 1 : t.i + 3] for t in doc if t.text == "—" and t.i + 1 < len(doc)
+        ]
+        replicas = [r for r in replicas if r[0].is_alpha]
+        return Dialogue(self.language, doc, replicas)
+
+    def connect_play(self, dialogue: Dialogue) -> Play:
+        play = Play(self.language)
+        for replica in dialogue.replicas:
+            play[replica] = (replica[0:1], [replica[1]])
+        return play
+
+
+def test_split_scenes_by_blank_and_separator_lines():
+    cc = FirstWordClassifier()
+    dialogue = cc.extract_dialogue(TEXT)
+    scenes = split_scenes(dialogue)
+    assert [[str(r) for r in s.replicas] for s in scenes] == [
+        ["Привет,", "сказал Ян", "Пока."],
+        ["Утро.", "Ян зевнул"],
+        ["Вечер."],
+    ]
+    assert all(s.doc is dialogue.doc for s in scenes)
+
+
+def test_connect_scenes_in_workers():
+    cc = FirstWordClassifier()
+    dialogue = cc.extract_dialogue(TEXT)
+    expected = cc.connect_play(dialogue)
+    with WorkerPool(cc, workers=2) as pool:
+        play = connect_scenes(cc, dialogue, pool)
+    assert list(play.lines) == list(expected.lines)
+    assert play._refs == expected._refs
+    assert all(a.doc is dialogue.doc for a in play.actors)
+
+
+def test_scene_classifier_wraps_a_classifier():
+    cc = FirstWordClassifier()
+    cc.variant = "+lg@0.5"
+    scenes = SceneClassifier(cc)
+    assert scenes.variant == "+lg@0.5+scenes"
+    expected = cc.classify(TEXT)
+    assert scenes.classify(TEXT) == expected
@@ -0,0 +1,35 @@
+import os
+import threading
+
+from spacy.tokens import Span
+
+from ttc.language.common import span_extensions
+from ttc.watch import RULE_MODULES, module_path, reload_rules, watch_changes
+
+
+def test_rule_modules_exist():
+    assert all(module_path(m).is_file() for m in RULE_MODULES)
+
+
+def test_reload_rules_reregisters_span_extensions():
+    before = Span.get_extension("is_before_author_ending")
+    reload_rules()
+    after = Span.get_extension("is_before_author_ending")
+    assert after is not None and after != before
+    assert after[2] is span_extensions.is_before_author_ending  # getter
+
+
+def test_watch_changes(tmp_path):
+    edited = tmp_path / "rules.py"
+    edited.write_text("x = 1\n")
+    (tmp_path / "notes.txt").write_text("")
+
+    def edit():
+        os.utime(edited, (0, 12345))
+        (tmp_path / "new.py").write_text("")
+
+    threading.Timer(0.05, edit).start()
+    assert next(watch_changes(tmp_path, interval=0.2)) == {
+        edited,
+        tmp_path / "new.py",
+    }
@@ -6,6 +6,11 @@ from ttc.language import ConversationClassifier, LanguageCode
 def load(lang_code: "LanguageCode | str", **kwargs) -> ConversationClassifier | None:
     normalized_lang_code = lang_code.strip().lower()
     if normalized_lang_code == "ru":
+        if kwargs.pop("tiered", False):
+            from ttc.language.russian.tiered import TieredConversationClassifier
+
+            return TieredConversationClassifier(**kwargs)
+
         from ttc.language.russian import RussianConversationClassifier
 
         return RussianConversationClassifier(**kwargs)
@@ -0,0 +1,166 @@
+"""An asyncio facade over a classifier, batching concurrent requests.
+
+Classifying a text blocks for seconds, and texts parse faster together in
+``nlp.pipe`` than one by one. :class:`AsyncClassifier` queues the texts of
+concurrent requests, gathers the ones arriving within a short window into
+one batch, and classifies each batch on a dedicated worker thread, so the
+event loop keeps serving while a batch runs.
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Self
+
+from ttc.language import ConversationClassifier, PlayResult
+
+MAX_BATCH = 16
+BATCH_WINDOW = 0.01
+"""Seconds to wait for more texts after the first one of a batch."""
+MAX_QUEUE = 256
+
+
+@dataclass
+class Metrics:
+    requests: int = 0
+    batches: int = 0
+    rejected: int = 0
+    """Requests refused because the queue was full."""
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    """Seconds from submission to result of the latest requests."""
+    batch_sizes: deque[int] = field(default_factory=lambda: deque(maxlen=1024))
+
+    def latency(self, quantile: float = 0.5) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+
+    @property
+    def mean_batch_size(self) -> float | None:
+        if not self.batch_sizes:
+            return None
+        return sum(self.batch_sizes) / len(self.batch_sizes)
+
+
+class AsyncClassifier:
+    """Resolves :meth:`classify` requests in micro-batches.
+
+    Up to ``max_queue`` texts wait for a batch; beyond that, requests wait
+    for room (or fail with :class:`asyncio.QueueFull` if they must not
+    wait). A batch takes up to ``max_batch`` texts, arriving at most
+    ``window`` seconds after its first one. Use as an async context manager,
+    or call :meth:`start` and :meth:`close`, from one running event loop.
+    """
+
+    def __init__(
+        self,
+        cc: ConversationClassifier,
+        max_batch: int = MAX_BATCH,
+        window: float = BATCH_WINDOW,
+        max_queue: int = MAX_QUEUE,
+    ):
+        self.cc = cc
+        self.max_batch = max_batch
+        self.window = window
+        self.metrics = Metrics()
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future, float]] = asyncio.Queue(
+            maxsize=max_queue
+        )
+        self._executor: ThreadPoolExecutor | None = None
+        self._batcher: asyncio.Task | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        if self._batcher is None:
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="ttc-aio")
+            self._batcher = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Finish the queued requests, then stop the worker thread."""
+        if self._batcher is None:
+            return
+        await self._queue.join()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        assert self._executor is not None
+        self._executor.shutdown()
+        self._batcher = self._executor = None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def classify(self, text: str, wait: bool = True) -> PlayResult:
+        """The play of ``text``; ``wait=False`` fails at once on a full queue."""
+        if self._batcher is None:
+            raise RuntimeError("AsyncClassifier is not started")
+        future = asyncio.get_running_loop().create_future()
+        item = (text, future, time.perf_counter())
+        if wait:
+            await self._queue.put(item)
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.metrics.rejected += 1
+                raise
+        self.metrics.requests += 1
+        return await future
+
+    async def _next_batch(self) -> list[tuple[str, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            texts = [text for text, _, _ in batch]
+            results = await loop.run_in_executor(self._executor, self._classify, texts)
+            self.metrics.batches += 1
+            self.metrics.batch_sizes.append(len(batch))
+            done = time.perf_counter()
+            for (_, future, submitted), result in zip(batch, results, strict=True):
+                self.metrics.latencies.append(done - submitted)
+                if not future.done():  # the request may have been cancelled
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+                self._queue.task_done()
+
+    def _classify(self, texts: list[str]) -> list[PlayResult | Exception]:
+        """Worker thread: the plays of a batch, or the errors of its texts."""
+        try:
+            return [
+                PlayResult.of(self.cc.connect_play(dialogue))
+                for dialogue in self.cc.extract_dialogues(texts)
+            ]
+        except Exception:  # noqa: BLE001
+            # find the failing text(s) without failing the whole batch
+            results: list[PlayResult | Exception] = []
+            for text in texts:
+                try:
+                    results.append(self.cc.classify(text))
+                except Exception as e:  # noqa: BLE001
+                    results.append(e)
+            return results
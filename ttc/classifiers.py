@@ -0,0 +1,101 @@
+"""Loaded classifiers, kept by language and model size.
+
+A classifier costs seconds and hundreds of MB to load, so code meeting
+several languages (a mixed-language interchange JSONL) takes them from a
+:class:`ClassifierPool` instead of loading one per document. The least
+recently used classifiers are dropped to stay within a memory cap.
+"""
+
+import gc
+from collections import OrderedDict
+from collections.abc import Callable
+
+from ttc.language import ConversationClassifier
+from ttc.pool import process_memory
+
+
+def _rss() -> int:
+    """Resident memory of this process in kB; 0 where it cannot be read."""
+    try:
+        return process_memory()["Rss"]
+    except (OSError, KeyError):
+        return 0
+
+
+class ClassifierPool:
+    """LRU of ``ttc.load(lang, model_size=...)`` results, keyed by both.
+
+    The memory of a classifier is taken as the growth of the process ``Rss``
+    while loading it. After a load, the least recently used others are
+    evicted until at most ``max_size`` classifiers and ``memory_cap`` kB
+    (if given) remain; the one just loaded and the pinned ones are always
+    kept.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 2,
+        memory_cap: int | None = None,
+        load: Callable[..., ConversationClassifier | None] | None = None,
+    ):
+        if load is None:
+            from ttc import load
+        self.max_size = max_size
+        self.memory_cap = memory_cap
+        self._load = load
+        self._entries: OrderedDict[
+            tuple[str, str | None], tuple[ConversationClassifier, int]
+        ] = OrderedDict()
+        self._pinned: set[tuple[str, str | None]] = set()
+
+    def get(
+        self, lang: str, model_size: str | None = None, pin: bool = False
+    ) -> ConversationClassifier | None:
+        """The classifier of ``lang``, loading it if needed (None if unsupported).
+
+        A classifier the caller keeps using must be ``pin``-ned: evicting it
+        would give no memory back, and the next ``get`` would load a copy.
+        """
+        key = (lang.strip().lower(), model_size)
+        if pin:
+            self._pinned.add(key)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+        before = _rss()
+        cc = self._load(key[0], model_size=model_size)
+        if cc is None:
+            return None
+        self._entries[key] = (cc, max(0, _rss() - before))
+        self._evict()
+        return cc
+
+    @property
+    def memory(self) -> int:
+        """Estimated kB taken by the pooled classifiers."""
+        return sum(size for _, size in self._entries.values())
+
+    def _evict(self) -> None:
+        evicted = False
+        # least recently used first, never the one just loaded
+        evictable = [k for k in list(self._entries)[:-1] if k not in self._pinned]
+        while evictable and (
+            len(self._entries) > self.max_size
+            or (self.memory_cap is not None and self.memory > self.memory_cap)
+        ):
+            del self._entries[evictable.pop(0)]
+            evicted = True
+        if evicted:
+            # a model holds reference cycles; give its memory back right away
+            gc.collect()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._pinned.clear()
+        gc.collect()
+
+    def __contains__(self, key: tuple[str, str | None]) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
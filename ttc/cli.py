@@ -1,8 +1,8 @@
+import contextlib
 import itertools
 import json as jsonlib
 import random
 import sys
-from dataclasses import asdict
 from pathlib import Path
 from typing import TextIO
 
@@ -22,7 +22,88 @@ def cli():
     pass
 
 
-@cli.command("eval")
+class DefaultGroup(click.Group):
+    """A group that runs its ``default`` command when no subcommand is named."""
+
+    def __init__(self, *args, default: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default = default
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or args[0] not in self.commands:
+            args = [self.default, *args]
+        return super().parse_args(ctx, args)
+
+
+@cli.group("eval", cls=DefaultGroup, default="run")
+def eval_group():
+    """Accuracy evaluation (`ttc eval [PATHS]...` is `ttc eval run`)."""
+
+
+def _parse_shard(ctx, param, value: str | None) -> tuple[int, int] | None:
+    if value is None:
+        return None
+    i, _, n = value.partition("/")
+    if not (i.isdigit() and n.isdigit() and 1 <= int(i) <= int(n)):
+        raise click.BadParameter("expected I/N with 1 <= I <= N")
+    return int(i) - 1, int(n)
+
+
+def _is_heldout(path: Path | None) -> bool:
+    return path is not None and "heldout" in (part.lower() for part in path.parts)
+
+
+def _refuse_heldout_errors(paths) -> None:
+    blocked = [p for p in paths if _is_heldout(p)]
+    if blocked:
+        echo(
+            "Refusing to list per-replica errors for held-out texts:"
+            f" {', '.join(str(p) for p in blocked)}\n"
+            "Held-out data is for aggregate numbers only while tuning;"
+            " pass --unblind-heldout if you really need this."
+        )
+        sys.exit(2)
+
+
+def _partial_section(title: str, kind: str, indexed) -> dict:
+    from ttc.eval import report_to_dict
+
+    return {
+        "title": title,
+        "kind": kind,
+        "reports": [{"index": i, **report_to_dict(r)} for i, r in indexed],
+    }
+
+
+def _echo_section(title: str, kind: str, reports, by_file, show_errors, as_json=False):
+    """Print the report of one corpus path (``kind`` "paths") or JSONL file."""
+    from ttc.eval import aggregate, format_report, report_to_dict
+
+    if kind == "jsonl":
+        if reports:
+            echo(f"== {title}")
+            echo(format_report(reports, by_file=by_file, show_errors=show_errors))
+    elif as_json:
+        total = aggregate(reports)
+        echo(
+            jsonlib.dumps(
+                {
+                    "path": title,
+                    "files": [report_to_dict(r) for r in reports],
+                    "end_to_end_accuracy": total.end_to_end_accuracy,
+                    "attribution_accuracy": total.attribution_accuracy,
+                    "extraction_precision": total.extraction_precision,
+                    "extraction_recall": total.extraction_recall,
+                },
+                ensure_ascii=False,
+            )
+        )
+    else:
+        echo(f"== {title}")
+        echo(format_report(reports, by_file=by_file, show_errors=show_errors))
+
+
+@eval_group.command("run")
 @click.argument(
     "paths", type=click.Path(exists=True, path_type=Path), nargs=-1, required=False
 )
@@ -42,16 +123,113 @@ def cli():
     multiple=True,
     help="Interchange JSONL corpora (multi-corpus/multi-language).",
 )
+@click.option(
+    "--cache",
+    "use_cache",
+    is_flag=True,
+    help="Reuse predictions for unchanged texts/model/code (see TTC_CACHE_DIR).",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Forked worker processes sharing one loaded model (corpus PATHS only).",
+)
+@click.option(
+    "--max-models",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Loaded models to keep across --jsonl languages.",
+)
+@click.option(
+    "--memory-cap",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Unload least recently used models above this many MB.",
+)
+@click.option(
+    "--shard",
+    callback=_parse_shard,
+    default=None,
+    metavar="I/N",
+    help="Evaluate only the I-th of N deterministic shards of the files/docs.",
+)
+@click.option(
+    "--emit-partial",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Also write a partial report for `ttc eval merge` to this file.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep the model and parses loaded; re-run PATHS on rule edits.",
+)
+@click.option(
+    "--tiered",
+    is_flag=True,
+    help="Run --model (default sm) and re-parse uncertain replicas with lg.",
+)
+@click.option(
+    "--scenes",
+    is_flag=True,
+    help="Connect every scene on its own, to compare against whole texts.",
+)
+@click.option(
+    "--snapshot",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Save the predictions on PATHS, keyed by text hash, to this file.",
+)
+@click.option(
+    "--diff-against",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="List replicas fixed/broken since a --snapshot, with metric deltas.",
+)
 def eval_corpus(
-    paths, model, by_file, show_errors, unblind_heldout, as_json, jsonl_paths
+    paths,
+    model,
+    by_file,
+    show_errors,
+    unblind_heldout,
+    as_json,
+    jsonl_paths,
+    use_cache,
+    workers,
+    max_models,
+    memory_cap,
+    shard,
+    emit_partial,
+    watch,
+    tiered,
+    scenes,
+    snapshot,
+    diff_against,
 ):
     """Measure extraction/attribution accuracy on annotated corpus PATHS.
 
     PATHS are corpus .txt files or directories of them; defaults to
     tests/russian/texts/{tune,heldout} relative to the current directory.
     Pass --jsonl to evaluate interchange corpora (with a qtype breakdown).
+    With --shard, files (by name) and docs (by doc_id) are split between
+    N runs, whose --emit-partial reports `ttc eval merge` combines.
+    With --watch, PATHS are re-evaluated whenever a rule module under
+    ttc/language changes, reusing the loaded model and parsed texts, and
+    diffed against --diff-against or else the previous run.
     """
-    from ttc.eval import aggregate, evaluate_paths, format_report
+    from ttc.classifiers import ClassifierPool
+    from ttc.eval import (
+        corpus_paths,
+        evaluate_paths,
+        in_shard,
+        read_snapshot,
+        write_snapshot,
+    )
+    from ttc.pool import WorkerPool
+    from ttc.predictions import PredictionCache
 
     if not paths and not jsonl_paths:
         texts = Path("tests/russian/texts")
@@ -61,60 +239,238 @@ def eval_corpus(
             sys.exit(1)
 
     if show_errors and not unblind_heldout:
-        blocked = [p for p in paths if "heldout" in (part.lower() for part in p.parts)]
-        if blocked:
-            echo(
-                "Refusing to list per-replica errors for held-out texts:"
-                f" {', '.join(str(p) for p in blocked)}\n"
-                "Held-out data is for aggregate numbers only while tuning;"
-                " pass --unblind-heldout if you really need this."
-            )
-            sys.exit(2)
+        _refuse_heldout_errors(paths)
+    if watch and (workers > 1 or use_cache or jsonl_paths or shard or tiered):
+        raise click.UsageError(
+            "--watch re-evaluates corpus PATHS in one process; it cannot be"
+            " combined with --workers, --cache, --jsonl, --shard or --tiered."
+        )
+
+    classifiers = ClassifierPool(
+        max_size=max_models, memory_cap=memory_cap and memory_cap * 1024
+    )
+    tiers = None
+    if tiered:
+        from ttc.language.russian.tiered import TieredConversationClassifier
 
-    cc = ttc.load("ru", model_size=model)
+        # kept apart: cc may be wrapped in a SceneClassifier below
+        cc = tiers = TieredConversationClassifier(model)
+    else:
+        # pinned: cc is used throughout, evicting it would only load a copy
+        cc = classifiers.get("ru", model, pin=True)
     assert cc is not None
+    if watch:
+        from ttc.language.russian.conversation_classifier import (
+            RussianConversationClassifier,
+        )
+        from ttc.watch import WarmClassifier
+
+        # --watch excludes --tiered: cc is the plain Russian classifier
+        assert isinstance(cc, RussianConversationClassifier)
+        cc = WarmClassifier(cc)
+    if scenes:
+        from ttc.language.scenes import SceneClassifier
+
+        cc = SceneClassifier(cc)
+    cache = PredictionCache(cc) if use_cache else None
 
     exit_code = 0
-    for path in paths:
-        reports = evaluate_paths(cc, [path])
-        if not reports:
-            echo(f"{path}: no corpus files found")
-            exit_code = 1
-            continue
-        if as_json:
-            total = aggregate(reports)
-            echo(
-                jsonlib.dumps(
-                    {
-                        "path": str(path),
-                        "files": [{**asdict(r), "path": str(r.path)} for r in reports],
-                        "end_to_end_accuracy": total.end_to_end_accuracy,
-                        "attribution_accuracy": total.attribution_accuracy,
-                        "extraction_precision": total.extraction_precision,
-                        "extraction_recall": total.extraction_recall,
-                    },
-                    ensure_ascii=False,
-                )
+    sections: list[dict] = []
+    path_reports = []
+    jsonl_reports = []
+    with (
+        WorkerPool((cc, cache), workers)
+        if workers > 1 and paths
+        else contextlib.nullcontext()
+    ) as pool:
+        for path in paths:
+            files = corpus_paths([path])
+            reports = evaluate_paths(cc, [path], cache, pool, shard)
+            path_reports += reports
+            # reports keep the order of the files in the shard
+            indices = [i for i, f in enumerate(files) if in_shard(f.name, shard)]
+            sections.append(
+                _partial_section(str(path), "paths", list(zip(indices, reports)))
             )
-        else:
-            echo(f"== {path}")
-            echo(format_report(reports, by_file=by_file, show_errors=show_errors))
+            if not files:
+                echo(f"{path}: no corpus files found")
+                exit_code = 1
+                continue
+            _echo_section(str(path), "paths", reports, by_file, show_errors, as_json)
 
     for jp in jsonl_paths:
         from ttc.corpora.schema import read_jsonl
-        from ttc.eval import evaluate_interchange_doc
-
-        reports = []
-        for doc in read_jsonl(jp):
-            doc_cc = cc if doc.lang == "ru" else ttc.load(doc.lang)
-            if doc_cc is None:
-                echo(f"{doc.doc_id}: no classifier for lang {doc.lang!r}, skipped")
+        from ttc.eval import evaluate_interchange_docs
+
+        # one batch per language, so each model is loaded once per file
+        by_lang: dict[str, list] = {}
+        for doc in read_jsonl(jp, compact=True):
+            by_lang.setdefault(doc.lang, []).append(doc)
+        ordered = enumerate(d for docs in by_lang.values() for d in docs)
+        indexed = []
+        for lang, group in itertools.groupby(ordered, key=lambda pair: pair[1].lang):
+            docs = [(i, d) for i, d in group if in_shard(d.doc_id, shard)]
+            if not docs:
                 continue
-            reports.append(evaluate_interchange_doc(doc_cc, doc))
-        if reports:
-            echo(f"== {jp}")
-            echo(format_report(reports, by_file=by_file, show_errors=show_errors))
+            # cc is the Russian one, tiered and split into scenes as asked
+            lang_cc = cc if lang == "ru" else classifiers.get(lang, model)
+            if lang_cc is None:
+                for _, doc in docs:
+                    echo(f"{doc.doc_id}: no classifier for lang {lang!r}, skipped")
+                continue
+            if scenes and lang_cc is not cc:
+                lang_cc = SceneClassifier(lang_cc)
+            lang_cache = cache if lang_cc is cc else None
+            if use_cache and lang_cache is None:
+                lang_cache = PredictionCache(lang_cc)
+            reports = evaluate_interchange_docs(
+                lang_cc, [d for _, d in docs], lang_cache
+            )
+            indexed += [(i, r) for (i, _), r in zip(docs, reports)]
+        sections.append(_partial_section(str(jp), "jsonl", indexed))
+        _echo_section(
+            str(jp), "jsonl", [r for _, r in indexed], by_file, show_errors, as_json
+        )
+        jsonl_reports += [r for _, r in indexed]
+    if tiers is not None:
+        # counted per report: with --workers, cc's own counters stay at 0
+        reports = path_reports + jsonl_reports
+        echo(
+            f"tiered: {sum(r.escalation[0] for r in reports)}"
+            f"/{sum(r.escalation[1] for r in reports)} replica(s)"
+            f" re-parsed with {tiers.accurate_size}"
+        )
+
+    if emit_partial is not None:
+        emit_partial.write_text(
+            jsonlib.dumps(
+                {"shard": list(shard or (0, 1)), "sections": sections},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+    if snapshot is not None:
+        n = write_snapshot(path_reports, snapshot)
+        echo(f"{n} file prediction(s) -> {snapshot}")
+    baseline = read_snapshot(diff_against) if diff_against is not None else None
+    if baseline is not None:
+        echo(f"== diff against {diff_against}")
+        _echo_diff(path_reports, baseline, unblind_heldout)
+    if watch:
+        _watch_eval(
+            cc,
+            [p for p in paths if corpus_paths([p])],
+            by_file,
+            show_errors,
+            path_reports,
+            baseline,
+            unblind_heldout,
+        )
+    sys.exit(exit_code)
+
+
+def _echo_diff(reports, baseline: dict, unblind_heldout: bool) -> None:
+    """Print the replicas of ``reports`` fixed or broken since ``baseline``."""
+    from ttc.corpus import load_corpus_file
+    from ttc.eval import corpus_gold, diff_predictions, format_diff
+
+    diffs = [
+        diff_predictions(
+            r.path, corpus_gold(load_corpus_file(r.path)), baseline[r.digest], r.pred
+        )
+        for r in reports
+        if r.digest in baseline
+    ]
+    blind = not unblind_heldout and any(_is_heldout(d.path) for d in diffs)
+    echo(
+        format_diff(
+            diffs, show_replicas=lambda d: unblind_heldout or not _is_heldout(d.path)
+        )
+    )
+    if blind:
+        echo("(held-out replicas not listed; pass --unblind-heldout to see them)")
+    if n_new := len(reports) - len(diffs):
+        echo(f"({n_new} file(s) with a changed text or not in the snapshot)")
+
+
+def _watch_eval(
+    cc,
+    paths: list[Path],
+    by_file: bool,
+    show_errors: bool,
+    first_run: list,
+    baseline: dict | None,
+    unblind_heldout: bool,
+) -> None:
+    """
+    Reload the rule modules and re-evaluate ``paths`` on every edit, diffing
+    against ``baseline`` predictions (the previous run's if None).
+    """
+    import traceback
 
+    from ttc.eval import evaluate_paths
+    from ttc.watch import RULE_MODULES, module_path, reload_rules, watch_changes
+
+    rules = {module_path(m) for m in RULE_MODULES}
+    previous = {r.digest: r.pred for r in first_run}
+    echo("Watching ttc/language for changes (Ctrl-C to stop)...")
+    try:
+        for changed in watch_changes():
+            echo(f"-- changed: {', '.join(sorted(p.name for p in changed))}")
+            if stale := sorted(p.name for p in changed - rules):
+                echo(style(f"not reloaded, restart for: {', '.join(stale)}", "yellow"))
+            try:
+                reload_rules()
+                reports = []
+                for path in paths:
+                    reports += (path_reports := evaluate_paths(cc, [path]))
+                    _echo_section(
+                        str(path), "paths", path_reports, by_file, show_errors
+                    )
+                echo("== diff")
+                _echo_diff(reports, baseline or previous, unblind_heldout)
+                previous = {r.digest: r.pred for r in reports}
+            except Exception:  # noqa: BLE001
+                # a half-done edit must not end the session
+                echo(style(traceback.format_exc(), "red"))
+    except KeyboardInterrupt:
+        pass
+
+
+@eval_group.command("merge")
+@click.argument(
+    "partials", type=click.Path(exists=True, path_type=Path), nargs=-1, required=True
+)
+@click.option("--by-file", is_flag=True, help="Report per-file metrics.")
+@click.option("--errors", "show_errors", is_flag=True, help="List mismatches.")
+@click.option(
+    "--unblind-heldout",
+    is_flag=True,
+    help="Allow --errors on held-out texts (breaks tuning blindness!).",
+)
+@click.option("--json", "as_json", is_flag=True, help="Machine-readable output.")
+def eval_merge(partials, by_file, show_errors, unblind_heldout, as_json):
+    """Report the run whose shards wrote the --emit-partial files PARTIALS."""
+    from ttc.eval import merge_partials
+
+    try:
+        sections = merge_partials(
+            [jsonlib.loads(p.read_text(encoding="utf-8")) for p in partials]
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if show_errors and not unblind_heldout:
+        _refuse_heldout_errors(
+            [Path(title) for title, kind, _ in sections if kind == "paths"]
+        )
+
+    exit_code = 0
+    for title, kind, reports in sections:
+        if kind == "paths" and not reports:
+            echo(f"{title}: no corpus files found")
+            exit_code = 1
+            continue
+        _echo_section(title, kind, reports, by_file, show_errors, as_json)
     sys.exit(exit_code)
 
 
@@ -134,11 +490,16 @@ def corpus_group():
     show_default=True,
     help="Keep only docs of this split (native docs are never filtered).",
 )
-def corpus_convert(source: str, in_path: Path, out: Path, split: str):
+@click.option(
+    "--text-blob",
+    is_flag=True,
+    help="Store texts in a memory-mappable sidecar (OUT with a .texts suffix).",
+)
+def corpus_convert(source: str, in_path: Path, out: Path, split: str, text_blob: bool):
     """Convert corpus SOURCE at IN_PATH into interchange JSONL."""
     from ttc.corpora import get_adapter
     from ttc.corpora.schema import validate, write_jsonl
-    from ttc.corpora.splits import split_of
+    from ttc.corpora.splits import doc_split
 
     try:
         adapter = get_adapter(source)
@@ -148,13 +509,13 @@ def corpus_convert(source: str, in_path: Path, out: Path, split: str):
     docs = []
     n_issues = 0
     for doc in adapter(in_path):
-        if source != "native" and split != "all" and split_of(doc.doc_id) != split:
+        if source != "native" and split != "all" and doc_split(doc) != split:
             continue
         n_issues += len(issues := validate(doc))
         for issue in issues:
             echo(style(issue, fg="yellow"))
         docs.append(doc)
-    n = write_jsonl(docs, out)
+    n = write_jsonl(docs, out, text_blob=text_blob)
     echo(
         f"{n} doc(s) -> {out}"
         + (f" ({n_issues} validation issues)" if n_issues else "")
@@ -175,7 +536,7 @@ def corpus_stats(jsonl):
     replicas = Counter()
     chars = Counter()
     for path in jsonl:
-        for doc in read_jsonl(path):
+        for doc in read_jsonl(path, compact=True):
             key = (doc.source, doc.lang, doc.domain)
             docs[key] += 1
             replicas[key] += len(doc.replicas)
@@ -196,14 +557,23 @@ def corpus_stats(jsonl):
 @click.option("--report", "report_path", type=click.Path(path_type=Path), default=None)
 @click.option("--skip-disagreements", is_flag=True, help="Mechanical checks only.")
 @click.option("--model", type=MODEL_SIZES, default=None, help="spaCy model size.")
-def corpus_audit(paths, report_path, skip_disagreements, model):
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Re-run the pipeline even for unchanged texts/model/code.",
+)
+def corpus_audit(paths, report_path, skip_disagreements, model, no_cache):
     """Audit native RU gold before it is used as training seed."""
     from ttc.corpora.audit import audit_native, format_report
+    from ttc.predictions import PredictionCache
 
     cc = None
+    cache = None
     if not skip_disagreements:
         cc = ttc.load("ru", model_size=model)
-    report = audit_native(list(paths), cc=cc)
+        if cc is not None and not no_cache:
+            cache = PredictionCache(cc)
+    report = audit_native(list(paths), cc=cc, cache=cache)
     text = format_report(report)
     if report_path:
         report_path.write_text(text, encoding="utf-8")
@@ -236,12 +606,84 @@ def annotate(text_file: Path, out: Path, model, port: int):
     run(cc, text_file, out, port)
 
 
+@cli.command("extract")
+@click.argument("inputs", nargs=-1, required=True)
+@click.option(
+    "--out",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=True,
+    help="Directory of the per-book JSONL plays and their manifest.",
+)
+@click.option("--lang", default="ru", show_default=True)
+@click.option("--model", type=MODEL_SIZES, default=None, help="spaCy model size.")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Forked worker processes sharing one loaded model.",
+)
+@click.option("--force", is_flag=True, help="Re-classify up-to-date books too.")
+def extract(inputs, out: Path, lang: str, model, workers: int, force: bool):
+    """Write the play of every .txt book of INPUTS to OUT/<book>.jsonl.
+
+    INPUTS are directories (searched recursively), files or glob patterns.
+    Books whose text, model and code are unchanged since the manifest entry
+    of their output are skipped, so an interrupted run resumes where it
+    stopped. Books that fail are reported and retried by the next run.
+    """
+    from collections import Counter
+
+    from ttc.extract import Outcome, extract_books, find_books
+
+    try:
+        books = find_books(inputs)
+    except ValueError as e:
+        raise click.UsageError(str(e)) from None
+    if not books:
+        raise click.UsageError("No .txt books found in INPUTS.")
+
+    cc = ttc.load(lang, model_size=model)
+    if cc is None:
+        echo("Specified language is not supported")
+        sys.exit(1)
+
+    outcomes = Counter()
+    results = extract_books(cc, books, out, workers, force)
+    for i, (book, outcome, error) in enumerate(results):
+        outcomes[outcome] += 1
+        line = f"[{i + 1}/{len(books)}] {book.key}"
+        if outcome == Outcome.FAILED:
+            echo(style(f"{line} failed: {error}", fg="red"))
+        else:
+            echo(line + (" (up to date)" if outcome == Outcome.UP_TO_DATE else ""))
+    echo(", ".join(f"{outcomes[o]} {o}" for o in Outcome) + f" -> {out}")
+    if outcomes[Outcome.FAILED]:
+        sys.exit(1)
+
+
 @cli.command("print-play")
 @click.argument("file", type=click.File("r", encoding="utf-8"), nargs=1)
 @click.argument("language", type=str, nargs=1)
 @click.option("--with-text", is_flag=True)
 @click.option("--model", type=MODEL_SIZES, default=None, help="spaCy model size.")
-def print_play(file: TextIO, language, with_text: bool, model):
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Connect --scenes in this many forked worker processes.",
+)
+@click.option(
+    "--scenes",
+    is_flag=True,
+    help="Connect every scene on its own (may change attributions).",
+)
+def print_play(
+    file: TextIO, language, with_text: bool, model, workers: int, scenes: bool
+):
+    if workers > 1 and not scenes:
+        raise click.UsageError("--workers connects scenes in parallel; add --scenes.")
     cc = ttc.load(language, model_size=model)
 
     if cc is None:
@@ -257,7 +699,18 @@ def print_play(file: TextIO, language, with_text: bool, model):
     dialogue = cc.extract_dialogue(text)
 
     echo("Connecting replicas into the play...")
-    play = cc.connect_play(dialogue)
+    if workers > 1:
+        from ttc.language.scenes import connect_scenes
+        from ttc.pool import WorkerPool
+
+        with WorkerPool(cc, workers) as pool:
+            play = connect_scenes(cc, dialogue, pool)
+    elif scenes:
+        from ttc.language.scenes import connect_scenes
+
+        play = connect_scenes(cc, dialogue)
+    else:
+        play = cc.connect_play(dialogue)
 
     colors = list(COLORS)
     random.shuffle(colors)
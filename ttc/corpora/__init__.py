@@ -10,12 +10,14 @@ if TYPE_CHECKING:
 
 ADAPTERS: dict[str, str] = {
     # source name -> module path; modules expose convert(path) -> Iterator[CorpusDoc]
+    # (or "module:function" for another converter of the same module)
     "native": "ttc.corpora.native",
     "rusdracor": "ttc.corpora.rusdracor",
     "pdnc": "ttc.corpora.pdnc",
     "riqua": "ttc.corpora.riqua",
     "quoteli3": "ttc.corpora.quoteli3",
     "jy_quoteplus": "ttc.corpora.jy_quoteplus",
+    "jy_quoteplus_stitched": "ttc.corpora.jy_quoteplus:convert_stitched",
     "droc": "ttc.corpora.droc",
 }
 
@@ -25,4 +27,5 @@ def get_adapter(name: str) -> "Callable[[Path], Iterator[CorpusDoc]]":
 
     if name not in ADAPTERS:
         raise KeyError(f"Unknown corpus source {name!r}; known: {sorted(ADAPTERS)}")
-    return importlib.import_module(ADAPTERS[name]).convert
+    module, _, function = ADAPTERS[name].partition(":")
+    return getattr(importlib.import_module(module), function or "convert")
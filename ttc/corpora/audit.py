@@ -11,11 +11,15 @@ Two layers:
 import warnings
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from ttc.corpora.native import doc_from_corpus_file
 from ttc.corpora.schema import validate
 from ttc.corpus import UNATTRIBUTED, find_corpus_files, load_corpus_file
 
+if TYPE_CHECKING:
+    from ttc.predictions import PredictionCache
+
 
 @dataclass
 class Disagreement:
@@ -38,7 +42,14 @@ class AuditReport:
         )
 
 
-def audit_native(paths: list[Path], cc=None) -> AuditReport:
+def audit_native(
+    paths: list[Path], cc=None, cache: "PredictionCache | None" = None
+) -> AuditReport:
+    """Run both audit layers; disagreements are mined only when ``cc`` is set.
+
+    With a ``cache``, files whose text, model and rule code are unchanged
+    are re-scored from cached predictions instead of re-running the pipeline.
+    """
     report = AuditReport()
     files: list[Path] = []
     for path in paths:
@@ -58,7 +69,7 @@ def audit_native(paths: list[Path], cc=None) -> AuditReport:
         if cc is not None:
             from ttc.eval import evaluate_file
 
-            for err in evaluate_file(cc, cf).errors:
+            for err in evaluate_file(cc, cf, cache).errors:
                 report.disagreements.append(
                     Disagreement(
                         f,
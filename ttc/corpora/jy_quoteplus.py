@@ -5,14 +5,79 @@ each carrying the quote, a context window, and labels
 说话人-mention/说话人-entity (speaker), 听者-entity (addressees),
 线索 (cue text), 方式 (mode). There is no global chapter text, so every
 item becomes its own CorpusDoc with ``text = context``.
+
+Neighboring items mostly share their context windows, so
+:func:`convert_stitched` joins overlapping contexts into passage docs with
+several replicas instead, each replica keeping its item id as ``origin``:
+the pipeline then runs over each piece of text once.
 """
 
 import json
 import warnings
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import Any, TextIO
 
 from ttc.corpora.schema import Character, CorpusDoc, Cue, Mention, Replica
+from ttc.corpora.splits import split_of
+
+READ_CHUNK = 1 << 16
+VALUE_END = frozenset(" \t\r\n,]")
+MIN_OVERLAP = 8
+"""Shortest context overlap (in characters) joining two items' passages."""
+
+
+def iter_json_array(f: TextIO, chunk_size: int = READ_CHUNK) -> Iterator[Any]:
+    """Decode the items of a top-level JSON array one by one.
+
+    Only a chunk of the file and the item being decoded are held in memory,
+    instead of the whole file text and the whole decoded list.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill() -> bool:
+        """Append a chunk to the unconsumed buffer; False at the end of file."""
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+        return not eof
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or not fill():
+                return buf[pos : pos + 1]
+
+    if next_char() != "[":
+        raise json.JSONDecodeError("Expecting '['", buf, pos)
+    pos += 1
+    if next_char() == "]":
+        return
+    while True:
+        next_char()
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+            # a value not followed by a delimiter may continue in the file
+            # (a number cut after "-0." decodes as -0)
+            complete = eof or buf[end : end + 1] in VALUE_END
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            fill()
+            continue
+        pos = end
+        yield item
+        separator = next_char()
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos - 1)
 
 
 def _item_doc(item: dict, doc_id: str) -> CorpusDoc | None:
@@ -72,8 +137,130 @@ def _item_doc(item: dict, doc_id: str) -> CorpusDoc | None:
 def convert(path: Path) -> Iterator[CorpusDoc]:
     files = [path] if path.is_file() else sorted(path.glob("*.json"))
     for f in files:
-        items = json.loads(f.read_text(encoding="utf-8"))
-        for i, item in enumerate(items):
-            doc = _item_doc(item, doc_id=f"jy_quoteplus/{f.stem}/{i:05d}")
-            if doc is not None:
-                yield doc
+        with f.open(encoding="utf-8") as stream:
+            for i, item in enumerate(iter_json_array(stream)):
+                doc = _item_doc(item, doc_id=f"jy_quoteplus/{f.stem}/{i:05d}")
+                if doc is not None:
+                    yield doc
+
+
+def context_overlap(passage: str, context: str) -> int:
+    """Length of the longest suffix of ``passage`` that is a prefix of ``context``."""
+    s = context + "\0" + passage[-len(context) :]
+    border = [0] * len(s)  # KMP prefix function
+    for i in range(1, len(s)):
+        k = border[i - 1]
+        while k and s[i] != s[k]:
+            k = border[k - 1]
+        if s[i] == s[k]:
+            k += 1
+        border[i] = k
+    return border[-1]
+
+
+def _passage_doc(text: str, members: list[tuple[int, CorpusDoc]]) -> CorpusDoc:
+    """One doc of item docs placed at their offsets in a stitched ``text``."""
+    first_id, last_id = members[0][1].doc_id, members[-1][1].doc_id
+    by_name: dict[str, str] = {}
+    characters: list[Character] = []
+    replicas: list[Replica] = []
+    mentions: list[Mention] = []
+    seen_replicas: set[tuple[int, int]] = set()
+    seen_mentions: set[tuple[int, int, str]] = set()
+
+    def char_id(names: dict[str, str], ident: str | None) -> str | None:
+        if ident is None:
+            return None
+        name = names[ident]
+        if name not in by_name:
+            by_name[name] = f"char_{len(by_name)}"
+            characters.append(Character(by_name[name], name))
+        return by_name[name]
+
+    for offset, item in members:
+        names = {c.id: c.name for c in item.characters}
+        for r in item.replicas:
+            span = (r.start + offset, r.end + offset)
+            if span in seen_replicas:
+                warnings.warn(f"{item.doc_id}: same quote as an earlier item, skipped")
+                continue
+            seen_replicas.add(span)
+            cue = Cue(r.cue.start + offset, r.cue.end + offset) if r.cue else None
+            replicas.append(
+                Replica(
+                    *span,
+                    char_id(names, r.speaker),
+                    char_id(names, r.addressee),
+                    r.qtype,
+                    cue,
+                    r.mode,
+                    origin=item.doc_id,
+                )
+            )
+        for m in item.mentions:
+            mention = Mention(
+                m.start + offset, m.end + offset, char_id(names, m.char) or ""
+            )
+            if (key := (mention.start, mention.end, mention.char)) not in seen_mentions:
+                seen_mentions.add(key)
+                mentions.append(mention)
+
+    replicas.sort(key=lambda r: r.start)
+    mentions.sort(key=lambda m: m.start)
+    return CorpusDoc(
+        doc_id=(
+            first_id
+            if first_id == last_id
+            else f"{first_id}-{last_id.rsplit('/', 1)[1]}"
+        ),
+        lang="zh",
+        domain="prose",
+        source="jy_quoteplus",
+        license=members[0][1].license,
+        text=text,
+        replicas=replicas,
+        characters=characters,
+        mentions=mentions,
+    )
+
+
+def stitch(items: Iterable[CorpusDoc]) -> Iterator[CorpusDoc]:
+    """
+    Join item docs whose contexts overlap into passage docs. An item joins
+    the current passage if its context occurs in its last ``2 * len(context)``
+    characters, or if the passage ends with at least ``MIN_OVERLAP`` leading
+    characters of the context.
+
+    Items of different splits (see :func:`split_of`) never share a passage:
+    each split has a current passage of its own, so every passage keeps the
+    split of its items.
+    """
+    passages: dict[str, tuple[str, list[tuple[int, CorpusDoc]]]] = {}
+    for item in items:
+        split = split_of(item.doc_id)
+        passage, members = passages.get(split, ("", []))
+        context = str(item.text)
+        # the passage only grows: look for the context near its end, not
+        # through all of it for every item
+        tail = max(0, len(passage) - 2 * len(context))
+        offset = passage.rfind(context, tail) if passage else -1
+        if (
+            offset < 0
+            and passage
+            and (k := context_overlap(passage, context)) >= MIN_OVERLAP
+        ):
+            offset = len(passage) - k
+            passage += context[k:]
+        if offset < 0:
+            if members:
+                yield _passage_doc(passage, members)
+            passage, members, offset = context, [], 0
+        members.append((offset, item))
+        passages[split] = (passage, members)
+    for passage, members in passages.values():
+        yield _passage_doc(passage, members)
+
+
+def convert_stitched(path: Path) -> Iterator[CorpusDoc]:
+    """Like :func:`convert`, with overlapping contexts stitched (see :func:`stitch`)."""
+    yield from stitch(convert(path))
@@ -6,7 +6,9 @@ so it doubles as the INCEpTION-replacement ingestion path.
 
 import re
 import warnings
+from bisect import bisect_right
 from collections.abc import Iterator
+from itertools import accumulate
 from pathlib import Path
 
 from ttc.corpora.schema import Character, CorpusDoc, Replica
@@ -19,12 +21,55 @@ from ttc.corpus import (
 
 LICENSE = "annotator-owned"
 
+_WHITESPACE = re.compile(r"\s+")
 
-def _find_span(text: str, needle: str, from_pos: int) -> tuple[int, int] | None:
-    """Whitespace-insensitive ordered search of ``needle`` in ``text``."""
-    pattern = r"\s+".join(re.escape(w) for w in needle.split())
-    m = re.compile(pattern).search(text, from_pos)
-    return (m.start(), m.end()) if m else None
+
+class ReplicaLocator:
+    """Whitespace-insensitive ordered search of replicas in one text.
+
+    The text is normalized once (every whitespace run becomes a single
+    space) with an offset map back to the original, so each lookup is a
+    plain :meth:`str.find` instead of a freshly compiled regex.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        runs = [(m.start(), m.end()) for m in _WHITESPACE.finditer(text)]
+        self._runs = runs
+        # characters dropped by the runs before each run
+        self._dropped = list(accumulate((b - a - 1 for a, b in runs), initial=0))
+        # normalized offset of each run's single space
+        self._norm_runs = [a - d for (a, _), d in zip(runs, self._dropped)]
+        self._norm = _WHITESPACE.sub(" ", text)
+
+    def _to_norm(self, pos: int) -> int:
+        i = bisect_right(self._runs, (pos, len(self.text) + 1)) - 1
+        if i < 0:
+            return pos
+        a, b = self._runs[i]
+        if pos < b:
+            # inside a run: nothing can match before its end
+            return self._norm_runs[i] + min(pos - a, 1)
+        return pos - self._dropped[i + 1]
+
+    def _to_orig(self, pos: int) -> int:
+        i = bisect_right(self._norm_runs, pos) - 1
+        if i < 0:
+            return pos
+        if pos == self._norm_runs[i]:
+            return self._runs[i][0]
+        return pos + self._dropped[i + 1]
+
+    def find(self, needle: str, from_pos: int = 0) -> tuple[int, int] | None:
+        """Original-text span of ``needle`` at or after ``from_pos``."""
+        start = self._to_norm(from_pos)
+        words = " ".join(needle.split())
+        if not words:
+            return from_pos, from_pos
+        found = self._norm.find(words, start)
+        if found < 0:
+            return None
+        return self._to_orig(found), self._to_orig(found + len(words) - 1) + 1
 
 
 def doc_from_corpus_file(cf: CorpusFile, doc_id: str) -> CorpusDoc:
@@ -49,9 +94,10 @@ def doc_from_corpus_file(cf: CorpusFile, doc_id: str) -> CorpusDoc:
             characters[-1].aliases = sorted(aliases)
 
     replicas: list[Replica] = []
+    locator = ReplicaLocator(cf.text)
     pos = 0
     for actor, replica_text in cf.pairs:
-        span = _find_span(cf.text, replica_text, pos)
+        span = locator.find(replica_text, pos)
         if span is None:
             warnings.warn(f"{doc_id}: replica not found in text: {replica_text[:60]!r}")
             continue
@@ -3,24 +3,34 @@
 All offsets are character offsets into ``text``. ``speaker``/``Mention.char``
 values reference ``Character.id`` entries; ``speaker is None`` means the
 replica has no identifiable speaker (narrator noise, crowd, etc.).
+
+Texts are either inlined (``"text"``) or, for large corpora, stored in a
+UTF-32-LE sidecar blob next to the JSONL (``"text_span": [offset, length]``
+in code points, see :func:`write_jsonl`), which is memory-mapped on read.
 """
 
+import contextlib
 import json
-from collections.abc import Iterable, Iterator
-from dataclasses import asdict, dataclass, field
+import mmap
+import sys
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
+from typing import overload
+
+import numpy as np
 
 QTYPES = ("explicit", "anaphoric", "implicit")
 DOMAINS = ("prose", "drama")
 
 
-@dataclass
+@dataclass(slots=True)
 class Cue:
     start: int
     end: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Replica:
     start: int
     end: int
@@ -36,9 +46,12 @@ class Replica:
     speaker-owned utterance a TTS engine still voices (possibly with a
     different engine/voice than speech), so it is kept, never dropped.
     """
+    origin: str | None = None
+    """Id of the source record the replica comes from, when a document was
+    stitched together from several records (see ``jy_quoteplus``)."""
 
 
-@dataclass
+@dataclass(slots=True)
 class Character:
     id: str
     name: str
@@ -46,13 +59,234 @@ class Character:
     gender: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Mention:
     start: int
     end: int
     char: str
 
 
+class ReplicaTable(Sequence[Replica]):
+    """Read-only, column-oriented replacement for a ``list[Replica]``.
+
+    Offsets live in int32 NumPy columns; speaker/addressee/qtype/mode/origin
+    values are interned into one per-table string list and stored as int32 ids
+    (``-1`` for ``None``). Indexing materializes a :class:`Replica` on
+    demand, so consumers iterating a doc's replicas need no changes — but
+    mutating a returned replica does not write back into the table.
+    """
+
+    COLUMNS = (
+        "starts",
+        "ends",
+        "speakers",
+        "addressees",
+        "qtypes",
+        "modes",
+        "cue_starts",
+        "cue_ends",
+        "origins",
+    )
+    __slots__ = (*COLUMNS, "strings")
+
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        speakers: np.ndarray,
+        addressees: np.ndarray,
+        qtypes: np.ndarray,
+        modes: np.ndarray,
+        cue_starts: np.ndarray,
+        cue_ends: np.ndarray,
+        origins: np.ndarray,
+        strings: list[str],
+    ):
+        self.starts = starts
+        self.ends = ends
+        self.speakers = speakers
+        self.addressees = addressees
+        self.qtypes = qtypes
+        self.modes = modes
+        self.cue_starts = cue_starts
+        self.cue_ends = cue_ends
+        self.origins = origins
+        self.strings = strings
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[
+            tuple[
+                int,
+                int,
+                str | None,
+                str | None,
+                str | None,
+                str | None,
+                Cue | None,
+                str | None,
+            ]
+        ],
+    ) -> "ReplicaTable":
+        """Build from ``(start, end, speaker, addressee, qtype, mode, cue, origin)``
+        rows."""
+        ids: dict[str, int] = {}
+        strings: list[str] = []
+
+        def intern(value: str | None) -> int:
+            if value is None:
+                return -1
+            if value not in ids:
+                ids[value] = len(strings)
+                strings.append(sys.intern(value))
+            return ids[value]
+
+        table = np.array(
+            [
+                (
+                    start,
+                    end,
+                    intern(speaker),
+                    intern(addressee),
+                    intern(qtype),
+                    intern(mode),
+                    cue.start if cue else -1,
+                    cue.end if cue else -1,
+                    intern(origin),
+                )
+                for start, end, speaker, addressee, qtype, mode, cue, origin in rows
+            ],
+            dtype=np.int32,
+        ).reshape(-1, 9)
+        return cls(*(np.ascontiguousarray(column) for column in table.T), strings)
+
+    @classmethod
+    def from_replicas(cls, replicas: Iterable[Replica]) -> "ReplicaTable":
+        return cls.from_rows(
+            (r.start, r.end, r.speaker, r.addressee, r.qtype, r.mode, r.cue, r.origin)
+            for r in replicas
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns (the interned strings are shared)."""
+        return sum(getattr(self, name).nbytes for name in self.COLUMNS)
+
+    def _string(self, ident: int) -> str | None:
+        return self.strings[ident] if ident >= 0 else None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @overload
+    def __getitem__(self, index: int) -> Replica: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "ReplicaTable": ...
+
+    def __getitem__(self, index: int | slice) -> "Replica | ReplicaTable":
+        if isinstance(index, slice):
+            return ReplicaTable(
+                *(getattr(self, name)[index] for name in self.COLUMNS),
+                self.strings,
+            )
+        cue_start = int(self.cue_starts[index])
+        return Replica(
+            start=int(self.starts[index]),
+            end=int(self.ends[index]),
+            speaker=self._string(int(self.speakers[index])),
+            addressee=self._string(int(self.addressees[index])),
+            qtype=self._string(int(self.qtypes[index])),
+            cue=Cue(cue_start, int(self.cue_ends[index])) if cue_start >= 0 else None,
+            mode=self._string(int(self.modes[index])),
+            origin=self._string(int(self.origins[index])),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ReplicaTable({len(self)} replicas)"
+
+
+TEXT_BLOB_ENCODING = "utf-32-le"
+TEXT_BLOB_WIDTH = 4  # bytes per code point
+
+
+def text_blob_path(path: Path) -> Path:
+    """Sidecar blob holding the texts of the JSONL at ``path``."""
+    return path.with_suffix(".texts")
+
+
+class BlobText:
+    """Read-only view of one document's text inside a mapped text blob.
+
+    Length and slicing are O(1) and O(slice): a slice decodes only its own
+    code points, so evaluating replicas never materializes the whole text.
+    ``str(text)`` decodes the full document when a real ``str`` is needed
+    (e.g. to run the pipeline on it).
+    """
+
+    __slots__ = ("buffer", "length", "offset")
+
+    def __init__(self, buffer: memoryview, offset: int, length: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.length = length
+
+    def view(self, start: int = 0, end: int | None = None) -> memoryview:
+        """Raw UTF-32-LE bytes of ``[start:end]`` without copying."""
+        start, end, _ = slice(start, end).indices(self.length)
+        base = self.offset * TEXT_BLOB_WIDTH
+        return self.buffer[
+            base + start * TEXT_BLOB_WIDTH : base + max(start, end) * TEXT_BLOB_WIDTH
+        ]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int | slice) -> str:
+        if isinstance(index, slice):
+            start, end, step = index.indices(self.length)
+            if step != 1:
+                return str(self)[index]
+        else:
+            if index < 0:
+                index += self.length
+            if not 0 <= index < self.length:
+                raise IndexError("BlobText index out of range")
+            start, end = index, index + 1
+        return str(self.view(start, end), TEXT_BLOB_ENCODING, "surrogatepass")
+
+    def __str__(self) -> str:
+        return str(self.view(), TEXT_BLOB_ENCODING, "surrogatepass")
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, BlobText):
+            return self.view() == other.view()
+        if isinstance(other, str):
+            return len(other) == self.length and str(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        return f"BlobText({self.length} chars at {self.offset})"
+
+
+def _map_text_blob(path: Path) -> memoryview:
+    with path.open("rb") as f:
+        if not f.seek(0, 2):
+            return memoryview(b"")
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
 @dataclass
 class CorpusDoc:
     doc_id: str
@@ -60,36 +294,67 @@ class CorpusDoc:
     domain: str
     source: str
     license: str
-    text: str
-    replicas: list[Replica] = field(default_factory=list)
+    text: str | BlobText
+    replicas: list[Replica] | ReplicaTable = field(default_factory=list)
     characters: list[Character] = field(default_factory=list)
     mentions: list[Mention] = field(default_factory=list)
 
 
 def to_dict(doc: CorpusDoc) -> dict:
-    return asdict(doc)
+    if isinstance(doc.replicas, ReplicaTable):
+        doc = replace(doc, replicas=list(doc.replicas))
+    if isinstance(doc.text, BlobText):
+        doc = replace(doc, text=str(doc.text))
+    d = asdict(doc)
+    for r in d["replicas"]:
+        if r["origin"] is None:  # only stitched docs have origins
+            del r["origin"]
+    return d
+
 
+def doc_from_dict(
+    d: dict, compact: bool = False, text_blob: memoryview | None = None
+) -> CorpusDoc:
+    """Inverse of :func:`to_dict`.
 
-def doc_from_dict(d: dict) -> CorpusDoc:
+    ``compact`` stores the replicas in a :class:`ReplicaTable` instead of
+    a list of :class:`Replica` objects (for large read-only corpora).
+    ``text_blob`` resolves a ``"text_span"`` record into a :class:`BlobText`.
+    """
+    if "text_span" in d:
+        if text_blob is None:
+            raise ValueError(f"{d['doc_id']}: text_span without a text blob")
+        text: str | BlobText = BlobText(text_blob, *d["text_span"])
+    else:
+        text = d["text"]
+    rows = (
+        (
+            r["start"],
+            r["end"],
+            r.get("speaker"),
+            r.get("addressee"),
+            r.get("qtype"),
+            r.get("mode"),
+            Cue(**r["cue"]) if r.get("cue") else None,
+            r.get("origin"),
+        )
+        for r in d.get("replicas", [])
+    )
     return CorpusDoc(
         doc_id=d["doc_id"],
         lang=d["lang"],
         domain=d["domain"],
         source=d["source"],
         license=d["license"],
-        text=d["text"],
-        replicas=[
-            Replica(
-                start=r["start"],
-                end=r["end"],
-                speaker=r.get("speaker"),
-                addressee=r.get("addressee"),
-                qtype=r.get("qtype"),
-                cue=Cue(**r["cue"]) if r.get("cue") else None,
-                mode=r.get("mode"),
-            )
-            for r in d.get("replicas", [])
-        ],
+        text=text,
+        replicas=(
+            ReplicaTable.from_rows(rows)
+            if compact
+            else [
+                Replica(start, end, speaker, addressee, qtype, cue, mode, origin)
+                for start, end, speaker, addressee, qtype, mode, cue, origin in rows
+            ]
+        ),
         characters=[
             Character(
                 id=c["id"],
@@ -106,20 +371,45 @@ def doc_from_dict(d: dict) -> CorpusDoc:
     )
 
 
-def write_jsonl(docs: Iterable[CorpusDoc], path: Path) -> int:
+def write_jsonl(docs: Iterable[CorpusDoc], path: Path, text_blob: bool = False) -> int:
+    """Write ``docs`` to ``path``; returns the number of docs written.
+
+    With ``text_blob`` the texts go to :func:`text_blob_path` instead and
+    each record references its text by ``"text_span"``.
+    """
     n = 0
-    with path.open("w", encoding="utf-8") as f:
+    offset = 0
+    with contextlib.ExitStack() as stack:
+        f = stack.enter_context(path.open("w", encoding="utf-8"))
+        blob = (
+            stack.enter_context(text_blob_path(path).open("wb")) if text_blob else None
+        )
         for doc in docs:
-            f.write(json.dumps(to_dict(doc), ensure_ascii=False) + "\n")
+            record = to_dict(doc)
+            if blob is not None:
+                text = record.pop("text")
+                blob.write(text.encode(TEXT_BLOB_ENCODING, "surrogatepass"))
+                record["text_span"] = [offset, len(text)]
+                offset += len(text)
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
             n += 1
     return n
 
 
-def read_jsonl(path: Path) -> Iterator[CorpusDoc]:
+def read_jsonl(path: Path, compact: bool = False) -> Iterator[CorpusDoc]:
+    """Read docs written by :func:`write_jsonl`.
+
+    A sidecar text blob, if referenced, is memory-mapped once and shared by
+    all docs, so reading costs O(metadata) rather than O(text).
+    """
+    text_blob: memoryview | None = None
     with path.open("r", encoding="utf-8") as f:
         for line in f:
             if line.strip():
-                yield doc_from_dict(json.loads(line))
+                d = json.loads(line)
+                if text_blob is None and "text_span" in d:
+                    text_blob = _map_text_blob(text_blob_path(path))
+                yield doc_from_dict(d, compact=compact, text_blob=text_blob)
 
 
 def validate(doc: CorpusDoc) -> list[str]:
@@ -2,13 +2,33 @@
 
 Native RU gold keeps its directory-based split (tests/russian/texts/*);
 everything else is split by a stable hash of doc_id so that re-running
-a conversion never migrates a document across splits.
+a conversion never migrates a document across splits. Evaluation shards
+hash a salted id instead: a JSONL holding one split only covers a slice
+of the unsalted hash, which would leave some shards (nearly) empty.
 """
 
 import hashlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ttc.corpora.schema import CorpusDoc
+
+
+def _bucket(doc_id: str, salt: bytes = b"") -> float:
+    digest = hashlib.sha1(salt + doc_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") / 2**32
 
 
 def split_of(doc_id: str, heldout_fraction: float = 0.2) -> str:
-    digest = hashlib.sha1(doc_id.encode("utf-8")).digest()
-    bucket = int.from_bytes(digest[:4], "big") / 2**32
-    return "heldout" if bucket < heldout_fraction else "tune"
+    return "heldout" if _bucket(doc_id) < heldout_fraction else "tune"
+
+
+def doc_split(doc: "CorpusDoc") -> str:
+    """Split of a converted doc: that of the items it was stitched from, if any."""
+    origin = next((r.origin for r in doc.replicas if r.origin), None)
+    return split_of(origin or doc.doc_id)
+
+
+def shard_of(doc_id: str, shards: int) -> int:
+    """Shard (from 0) of ``doc_id`` among ``shards`` evaluation shards."""
+    return int(_bucket(doc_id, b"shard:") * shards)
@@ -7,15 +7,23 @@ Metrics per file and micro-averaged:
 - attribution accuracy — share of *matched* replicas whose predicted
   actor equals the gold actor (after alias canonicalization);
 - end-to-end accuracy — correctly attributed replicas / all gold replicas.
+
+A run can be split into shards (see :func:`in_shard`) whose partial
+reports (see :func:`report_to_dict`) merge into the report of the full run.
+The scored predictions of a run can be kept as a snapshot (see
+:func:`write_snapshot`) to list the replicas a later run fixed or broke
+(see :func:`diff_predictions`).
 """
 
-import time
-from dataclasses import dataclass, field
+import json
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
 from difflib import SequenceMatcher
 from pathlib import Path
 
 from spacy.tokens import Span
 
+from ttc.corpora.splits import shard_of
 from ttc.corpus import (
     UNATTRIBUTED,
     CorpusFile,
@@ -24,6 +32,9 @@ from ttc.corpus import (
     load_corpus_file,
     normalize_name,
 )
+from ttc.language import PlayRow
+from ttc.pool import WorkerPool
+from ttc.predictions import PredictionCache, predict, predict_all, text_digest
 
 
 @dataclass
@@ -70,26 +81,162 @@ class FileReport(Counters):
     seconds: float = 0.0
     lang: str = "ru"
     qtype_counters: dict[str, Counters] = field(default_factory=dict)
+    digest: str = ""
+    """:func:`ttc.predictions.text_digest` of the evaluated text."""
+    pred: list[tuple[str, str]] = field(default_factory=list)
+    """Scored predictions, see :func:`scored_predictions`."""
+    escalation: tuple[int, int] = (0, 0)
+    """Replicas a tiered classifier re-parsed and classified for this text
+    (none for other classifiers and cached predictions)."""
 
 
-def pred_actor_key(actor: Span | None, aliases: dict[str, str]) -> str:
-    """Canonicalize a predicted actor span.
+@dataclass
+class ReplicaChange:
+    replica: str
+    gold: str
+    old: str | None
+    new: str | None
+    """Predicted actors; ``None`` for a replica that was not extracted."""
+
+
+@dataclass
+class PredictionDiff:
+    path: Path | None
+    old: Counters
+    new: Counters
+    fixed: list[ReplicaChange] = field(default_factory=list)
+    broken: list[ReplicaChange] = field(default_factory=list)
+
+
+Shard = tuple[int, int]
+"""``(i, n)``: the i-th (from 0) of ``n`` shards of an evaluation run."""
+
+
+def in_shard(key: str, shard: Shard | None) -> bool:
+    """Whether the file or doc ``key`` is evaluated by ``shard`` (all if None)."""
+    return shard is None or shard_of(key, shard[1]) == shard[0]
+
+
+def report_to_dict(report: FileReport) -> dict:
+    """JSON-serializable counters, errors and timing of ``report``."""
+    d = asdict(report)
+    del d["pred"]
+    return {**d, "path": str(report.path) if report.path else None}
+
+
+def report_from_dict(d: dict) -> FileReport:
+    return FileReport(
+        n_gold=d["n_gold"],
+        n_pred=d["n_pred"],
+        n_matched=d["n_matched"],
+        n_attr_correct=d["n_attr_correct"],
+        path=Path(d["path"]) if d["path"] is not None else None,
+        errors=[AttrError(**e) for e in d["errors"]],
+        seconds=d["seconds"],
+        lang=d["lang"],
+        qtype_counters={qt: Counters(**c) for qt, c in d["qtype_counters"].items()},
+        digest=d.get("digest", ""),
+        pred=[(replica, actor) for replica, actor in d.get("pred", [])],
+        escalation=tuple(d.get("escalation", (0, 0))),
+    )
+
+
+def merge_partials(partials: list[dict]) -> list[tuple[str, str, list[FileReport]]]:
+    """``(title, kind, reports)`` sections of a sharded run from the partial
+    reports of all of its shards, with reports back in their unsharded order.
+    """
+    shards = sorted((p["shard"][0], p["shard"][1]) for p in partials)
+    n = shards[0][1] if shards else 0
+    if not shards or shards != [(i, n) for i in range(n)]:
+        raise ValueError(f"need one partial report per shard, got shards {shards}")
+    layout = [(s["title"], s["kind"]) for s in partials[0]["sections"]]
+    if any(
+        [(s["title"], s["kind"]) for s in p["sections"]] != layout for p in partials
+    ):
+        raise ValueError("partial reports of different evaluation runs")
+    merged = []
+    for k, (title, kind) in enumerate(layout):
+        rows = sorted(
+            (row for p in partials for row in p["sections"][k]["reports"]),
+            key=lambda row: row["index"],
+        )
+        merged.append((title, kind, [report_from_dict(row) for row in rows]))
+    return merged
+
+
+def actor_key_of(surface: str, lemma: str, aliases: dict[str, str]) -> str:
+    """Canonicalize a predicted actor given its surface form and lemma.
 
     Predictions are often inflected surface forms («Ясну»), so when the
-    surface form has no alias entry, the span lemma is also tried before
+    surface form has no alias entry, the lemma is also tried before
     giving up.
     """
-    if actor is None or not len(actor):
-        return UNATTRIBUTED
-    surface = normalize_name(str(actor))
+    surface = normalize_name(surface)
     if surface in aliases:
         return aliases[surface]
-    lemma = normalize_name(actor.lemma_)
+    lemma = normalize_name(lemma)
     if lemma in aliases:
         return aliases[lemma]
     return surface
 
 
+def pred_actor_key(actor: Span | None, aliases: dict[str, str]) -> str:
+    """Canonicalize a predicted actor span (see :func:`actor_key_of`)."""
+    if actor is None or not len(actor):
+        return UNATTRIBUTED
+    return actor_key_of(str(actor), actor.lemma_, aliases)
+
+
+def _row_text(text: str, start: int, end: int) -> str:
+    # the pipeline sees newlines as spaces (see extract_dialogue)
+    return text[start:end].replace("\n", " ")
+
+
+def scored_predictions(
+    text: str, rows: list[PlayRow], aliases: dict[str, str]
+) -> list[tuple[str, str]]:
+    """(replica text, canonical actor) pairs of offset-only predictions."""
+    return [
+        (
+            _row_text(text, row.start_char, row.end_char),
+            (
+                actor_key_of(
+                    _row_text(text, row.actor_start_char, row.actor_end_char),
+                    row.actor_lemma,
+                    aliases,
+                )
+                if row.actor_start_char is not None and row.actor_end_char is not None
+                else UNATTRIBUTED
+            ),
+        )
+        for row in rows
+    ]
+
+
+def _escalation(cc) -> tuple[int, int]:
+    return getattr(cc, "n_escalated", 0), getattr(cc, "n_replicas", 0)
+
+
+def _predict(cc, text: str, cache: PredictionCache | None):
+    """Predictions, seconds and :attr:`FileReport.escalation` of ``text``."""
+    before = _escalation(cc)
+    lines, seconds = cache.predict(text) if cache is not None else predict(cc, text)
+    after = _escalation(cc)
+    return lines, seconds, (after[0] - before[0], after[1] - before[1])
+
+
+def _predict_all(cc, texts: list[str], cache: PredictionCache | None):
+    """:func:`_predict` for a batch of texts, classified together."""
+    predictions = (
+        cache.predict_all(texts) if cache is not None else predict_all(cc, texts)
+    )
+    for _ in texts:
+        before = _escalation(cc)
+        lines, seconds = next(predictions)
+        after = _escalation(cc)
+        yield lines, seconds, (after[0] - before[0], after[1] - before[1])
+
+
 def align_replicas(gold: list[str], pred: list[str]) -> list[tuple[int, int]]:
     matcher = SequenceMatcher(a=gold, b=pred, autojunk=False)
     return [
@@ -99,18 +246,70 @@ def align_replicas(gold: list[str], pred: list[str]) -> list[tuple[int, int]]:
     ]
 
 
-def evaluate_file(cc, cf: CorpusFile) -> FileReport:
-    started = time.perf_counter()
-    dialogue = cc.extract_dialogue(cf.text)
-    play = cc.connect_play(dialogue)
-    seconds = time.perf_counter() - started
+def attributions(gold: list[tuple[str, str]], pred: list[tuple[str, str]]) -> dict:
+    """Predicted actor of each extracted gold replica, by gold index."""
+    return {
+        gi: pred[pi][1]
+        for gi, pi in align_replicas([g[0] for g in gold], [p[0] for p in pred])
+    }
 
-    gold = [
+
+def _counters(gold: list[tuple[str, str]], attributed: dict[int, str], n_pred: int):
+    return Counters(
+        n_gold=len(gold),
+        n_pred=n_pred,
+        n_matched=len(attributed),
+        n_attr_correct=sum(gold[gi][1] == a for gi, a in attributed.items()),
+    )
+
+
+def diff_predictions(
+    path: Path | None,
+    gold: list[tuple[str, str]],
+    old_pred: list[tuple[str, str]],
+    new_pred: list[tuple[str, str]],
+) -> PredictionDiff:
+    """Gold replicas attributed correctly by only one of two predictions."""
+    old, new = attributions(gold, old_pred), attributions(gold, new_pred)
+    diff = PredictionDiff(
+        path, _counters(gold, old, len(old_pred)), _counters(gold, new, len(new_pred))
+    )
+    for gi, (replica, actor) in enumerate(gold):
+        was, now = old.get(gi) == actor, new.get(gi) == actor
+        if was != now:
+            change = ReplicaChange(replica, actor, old.get(gi), new.get(gi))
+            (diff.fixed if now else diff.broken).append(change)
+    return diff
+
+
+def corpus_gold(cf: CorpusFile) -> list[tuple[str, str]]:
+    """(replica text, canonical actor) gold pairs of a corpus file."""
+    return [
         (replica, canonical_actor(actor, cf.aliases)) for actor, replica in cf.pairs
     ]
-    pred = [(str(r), pred_actor_key(a, cf.aliases)) for r, a in play.lines]
 
-    report = FileReport(path=cf.path, seconds=seconds)
+
+def evaluate_file(
+    cc, cf: CorpusFile, cache: PredictionCache | None = None
+) -> FileReport:
+    """Score the pipeline on one corpus file.
+
+    With a ``cache``, predictions for an unchanged text/model/code are read
+    back instead of re-running the pipeline; gold (pairs and aliases) is
+    always re-read, so editing annotations needs no cache invalidation.
+    """
+    lines, seconds, escalation = _predict(cc, cf.text, cache)
+
+    gold = corpus_gold(cf)
+    pred = scored_predictions(cf.text, lines, cf.aliases)
+
+    report = FileReport(
+        path=cf.path,
+        seconds=seconds,
+        digest=text_digest(cf.text),
+        pred=pred,
+        escalation=escalation,
+    )
     report.n_gold = len(gold)
     report.n_pred = len(pred)
     for gi, pi in align_replicas([g[0] for g in gold], [p[0] for p in pred]):
@@ -122,18 +321,33 @@ def evaluate_file(cc, cf: CorpusFile) -> FileReport:
     return report
 
 
-def evaluate_interchange_doc(cc, doc) -> FileReport:
+def evaluate_interchange_doc(
+    cc, doc, cache: PredictionCache | None = None
+) -> FileReport:
     """Evaluate attribution on one interchange doc (gold = doc.replicas).
 
     ``doc`` is a :class:`ttc.corpora.schema.CorpusDoc`. Gold speakers are
     canonicalized through the doc's own character/alias table; results are
     additionally broken down per PDNC-style quotation type (qtype).
     """
-    started = time.perf_counter()
-    dialogue = cc.extract_dialogue(doc.text)
-    play = cc.connect_play(dialogue)
-    seconds = time.perf_counter() - started
+    (report,) = evaluate_interchange_docs(cc, [doc], cache)
+    return report
+
+
+def evaluate_interchange_docs(
+    cc, docs: list, cache: PredictionCache | None = None
+) -> Iterator[FileReport]:
+    """:func:`evaluate_interchange_doc` for docs of one language, parsed as
+    one batch (see :meth:`ttc.language.ConversationClassifier.classify_all`).
+    """
+    texts = [str(doc.text) for doc in docs]  # decodes memory-mapped BlobTexts
+    for doc, text, (lines, seconds, escalation) in zip(
+        docs, texts, _predict_all(cc, texts, cache)
+    ):
+        yield _interchange_report(doc, text, lines, seconds, escalation)
+
 
+def _interchange_report(doc, text: str, lines, seconds, escalation) -> FileReport:
     names = {c.id: normalize_name(c.name) for c in doc.characters}
     aliases: dict[str, str] = {}
     for c in doc.characters:
@@ -143,15 +357,17 @@ def evaluate_interchange_doc(cc, doc) -> FileReport:
 
     gold = [
         (
-            doc.text[r.start : r.end],
+            text[r.start : r.end],
             names.get(r.speaker, UNATTRIBUTED) if r.speaker else UNATTRIBUTED,
             r.qtype,
         )
         for r in doc.replicas
     ]
-    pred = [(str(r), pred_actor_key(a, aliases)) for r, a in play.lines]
+    pred = scored_predictions(text, lines, aliases)
 
-    report = FileReport(path=Path(doc.doc_id), lang=doc.lang, seconds=seconds)
+    report = FileReport(
+        path=Path(doc.doc_id), lang=doc.lang, seconds=seconds, escalation=escalation
+    )
     report.n_gold = len(gold)
     report.n_pred = len(pred)
     for qtype in {g[2] for g in gold if g[2]}:
@@ -172,11 +388,37 @@ def evaluate_interchange_doc(cc, doc) -> FileReport:
     return report
 
 
-def evaluate_paths(cc, paths: list[Path]) -> list[FileReport]:
+def _evaluate_corpus_path(
+    shared: tuple[object, PredictionCache | None], path: Path
+) -> FileReport:
+    cc, cache = shared
+    return evaluate_file(cc, load_corpus_file(path), cache)
+
+
+def corpus_paths(paths: list[Path]) -> list[Path]:
+    """Corpus files under ``paths``, in evaluation order."""
     files: list[Path] = []
     for path in paths:
         files += find_corpus_files(path) if path.is_dir() else [path]
-    return [evaluate_file(cc, load_corpus_file(f)) for f in files]
+    return files
+
+
+def evaluate_paths(
+    cc,
+    paths: list[Path],
+    cache: PredictionCache | None = None,
+    pool: WorkerPool | None = None,
+    shard: Shard | None = None,
+) -> list[FileReport]:
+    """Score every corpus file under ``paths`` (of ``shard``, by file name).
+
+    With a ``pool`` (sharing ``(cc, cache)``), files are scored in its
+    workers; reports keep the file order either way.
+    """
+    files = [f for f in corpus_paths(paths) if in_shard(f.name, shard)]
+    if pool is not None:
+        return list(pool.map(_evaluate_corpus_path, files))
+    return [_evaluate_corpus_path((cc, cache), f) for f in files]
 
 
 def aggregate(reports: list[FileReport]) -> Counters:
@@ -186,6 +428,27 @@ def aggregate(reports: list[FileReport]) -> Counters:
     return total
 
 
+def write_snapshot(reports: list[FileReport], path: Path) -> int:
+    """Keep the predictions of ``reports`` by text digest; returns their count."""
+    predictions = {r.digest: r.pred for r in reports if r.digest}
+    path.write_text(
+        json.dumps(
+            {"predictions": predictions}, ensure_ascii=False, separators=(",", ":")
+        ),
+        encoding="utf-8",
+    )
+    return len(predictions)
+
+
+def read_snapshot(path: Path) -> dict[str, list[tuple[str, str]]]:
+    """Predictions by text digest, as written by :func:`write_snapshot`."""
+    predictions = json.loads(path.read_text(encoding="utf-8"))["predictions"]
+    return {
+        digest: [(replica, actor) for replica, actor in pred]
+        for digest, pred in predictions.items()
+    }
+
+
 def _percent(value: float | None) -> str:
     return f"{value:7.1%}" if value is not None else "      -"
 
@@ -218,7 +481,8 @@ def format_report(
         f"  attr {_percent(total.attribution_accuracy)}"
         f"  extr P {_percent(total.extraction_precision)}"
         f" R {_percent(total.extraction_recall)}"
-        f"  ({total.n_attr_correct}/{total.n_gold})"
+        f"  ({total.n_attr_correct}/{total.n_gold},"
+        f" {sum(r.seconds for r in reports):.1f}s)"
     )
     by_qtype: dict[str, Counters] = {}
     for r in reports:
@@ -232,3 +496,41 @@ def format_report(
             f"  ({c.n_attr_correct}/{c.n_gold})"
         )
     return "\n".join(lines)
+
+
+def _delta(old: float | None, new: float | None) -> str:
+    if old is None or new is None:
+        return "      -"
+    return f"{(new - old) * 100:+6.1f}pp"
+
+
+def format_diff(
+    diffs: list[PredictionDiff],
+    show_replicas: bool | Callable[[PredictionDiff], bool] = True,
+) -> str:
+    """Per-file fixed/broken counts and metric deltas of ``diffs``, listing
+    the changed replicas of the files ``show_replicas`` (or returns true for).
+    """
+    lines = []
+    old, new = Counters(), Counters()
+    for d in diffs:
+        old.add(d.old)
+        new.add(d.new)
+        if not d.fixed and not d.broken:
+            continue
+        name = d.path.name if d.path else "<content>"
+        lines.append(f"{name:<44} fixed {len(d.fixed):>3}  broken {len(d.broken):>3}")
+        if show_replicas(d) if callable(show_replicas) else show_replicas:
+            for c in d.fixed:
+                lines.append(f"    + {c.gold!r} (was {c.old!r}) | {c.replica[:80]}")
+            for c in d.broken:
+                lines.append(f"    - {c.gold!r} -> {c.new!r} | {c.replica[:80]}")
+    lines.append(
+        f"{'DELTA (' + str(len(diffs)) + ' files)':<44}"
+        f" e2e {_delta(old.end_to_end_accuracy, new.end_to_end_accuracy)}"
+        f"  attr {_delta(old.attribution_accuracy, new.attribution_accuracy)}"
+        f"  extr P {_delta(old.extraction_precision, new.extraction_precision)}"
+        f" R {_delta(old.extraction_recall, new.extraction_recall)}"
+        f"  ({old.n_attr_correct} -> {new.n_attr_correct}/{new.n_gold})"
+    )
+    return "\n".join(lines)
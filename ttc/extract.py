@@ -0,0 +1,207 @@
+"""Batch extraction of plays from a directory of books, resumable.
+
+A library of books takes hours to classify, so :func:`extract_books`
+writes the play of every book to its own JSONL file as soon as it is done
+and records it in a manifest next to them. A book is classified again only
+if its text, the model or the TTC code changed since its entry was
+written; a run killed halfway resumes from the manifest, and an unchanged
+library costs one hash per book. Books are sanitized before they are
+classified; the offsets written are still offsets into the book.
+"""
+
+import glob
+import json
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import Final
+
+from ttc.language import ConversationClassifier, PlayRow
+from ttc.language.common.sanitizer import sanitize
+from ttc.predictions import code_version, model_id, text_digest
+
+MANIFEST: Final = "manifest.jsonl"
+"""Append-only log of the books written (or failed), in the output directory."""
+
+
+class Outcome(StrEnum):
+    CLASSIFIED = "classified"
+    UP_TO_DATE = "up to date"
+    FAILED = "failed"
+
+
+@dataclass
+class Book:
+    path: Path
+    name: Path
+    """Path of the output relative to the output directory, without suffix."""
+
+    @property
+    def key(self) -> str:
+        return self.name.as_posix()
+
+
+def _glob_root(pattern: str) -> Path:
+    """The directory a glob pattern is rooted at: its parts before any magic."""
+    parts: list[str] = []
+    for part in Path(pattern).parts:
+        if any(c in part for c in "*?["):
+            break
+        parts.append(part)
+    return Path(*parts)
+
+
+def find_books(inputs: Iterable[str]) -> list[Book]:
+    """The ``.txt`` books of directories (recursively), files and glob patterns.
+
+    Outputs are named after the path of a book relative to the directory or
+    glob root it was found under; two books getting the same name is a
+    :class:`ValueError`.
+    """
+    books: dict[str, Book] = {}
+    for given in inputs:
+        path = Path(given)
+        if path.is_dir():
+            found = [(p, p.relative_to(path)) for p in path.rglob("*.txt")]
+        elif path.is_file():
+            found = [(path, Path(path.name))]
+        else:
+            root = _glob_root(given)
+            found = [
+                (p, p.relative_to(root))
+                for p in map(Path, glob.glob(given, recursive=True))
+                if p.is_file()
+            ]
+        for p, relative in sorted(found):
+            book = Book(p, relative.with_suffix(""))
+            if (other := books.get(book.key)) is not None and other.path != p:
+                raise ValueError(f"{other.path} and {p} both map to {book.key}")
+            books[book.key] = book
+    return sorted(books.values(), key=lambda b: b.key)
+
+
+def read_manifest(out: Path) -> dict[str, dict]:
+    """The latest manifest entry of every book written to ``out``."""
+    entries: dict[str, dict] = {}
+    try:
+        lines = (out / MANIFEST).read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return entries
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue  # the last line of a run killed while appending it
+        entries[entry["book"]] = entry
+    return entries
+
+
+def _classify_book(cc: ConversationClassifier, path: Path) -> tuple[str, list]:
+    """Pool task: the digest of a book read and its play rows."""
+    text = path.read_text(encoding="utf-8")
+    # raw dumps are full of soft hyphens and justification spaces
+    clean = sanitize(text)
+    return text_digest(text), list(clean.restore(cc.classify(clean.text)).rows)
+
+
+def _classified(
+    cc: ConversationClassifier, books: list[Book], workers: int
+) -> Iterator[tuple[Book, tuple[str, list] | Exception]]:
+    """:func:`_classify_book` results (or errors) of ``books``, as they complete."""
+    if workers == 1:
+        for book in books:
+            try:
+                yield book, _classify_book(cc, book.path)
+            except Exception as e:  # noqa: BLE001
+                # a bad book must not stop the run (nor every resumed one)
+                yield book, e
+        return
+
+    from ttc.pool import WorkerPool
+
+    with WorkerPool(cc, workers) as pool:
+        futures = {pool.submit(_classify_book, b.path): b for b in books}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:  # noqa: BLE001
+                yield futures[future], e
+
+
+def _is_up_to_date(book: Book, entry: dict | None, version: dict, out: Path) -> bool:
+    if (
+        entry is None
+        or not all(entry.get(k) == v for k, v in version.items())
+        or "output" not in entry
+        or not (out / entry["output"]).is_file()
+    ):
+        return False
+    try:
+        return entry["digest"] == text_digest(book.path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError):
+        return False  # let the classification report it
+
+
+def _write_rows(path: Path, rows: list[PlayRow]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row._asdict(), ensure_ascii=False) + "\n")
+    # never leave a half-written output behind a manifest entry
+    os.replace(tmp, path)
+
+
+def extract_books(
+    cc: ConversationClassifier,
+    books: list[Book],
+    out: Path,
+    workers: int = 1,
+    force: bool = False,
+) -> Iterator[tuple[Book, Outcome, str | None]]:
+    """Write the play of each book to ``out/<name>.jsonl``, one row per line.
+
+    Yields every book with its :class:`Outcome` and, for a failed one, the
+    error. Books are classified in ``workers`` forked processes; each one is
+    added to the manifest once its output is written, in the order they
+    complete. Failures are recorded too, and retried by the next run.
+    """
+    out.mkdir(parents=True, exist_ok=True)
+    version = {"model": model_id(cc), "code": code_version()}
+    done = {} if force else read_manifest(out)
+
+    pending = []
+    for book in books:
+        if _is_up_to_date(book, done.get(book.key), version, out):
+            yield book, Outcome.UP_TO_DATE, None
+        else:
+            pending.append(book)
+    if not pending:
+        return
+
+    with (out / MANIFEST).open("a", encoding="utf-8") as manifest:
+        if manifest.tell() and not (out / MANIFEST).read_bytes().endswith(b"\n"):
+            manifest.write("\n")  # end the line a killed run left unfinished
+        for book, result in _classified(cc, pending, workers):
+            error = None
+            if isinstance(result, Exception):
+                error = f"{type(result).__name__}: {result}"
+                entry = {"book": book.key, **version, "error": error}
+            else:
+                digest, rows = result
+                output = Path(f"{book.key}.jsonl")
+                _write_rows(out / output, rows)
+                entry = {
+                    "book": book.key,
+                    "digest": digest,
+                    **version,
+                    "output": output.as_posix(),
+                    "replicas": len(rows),
+                }
+            manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+            yield book, Outcome.CLASSIFIED if error is None else Outcome.FAILED, error
@@ -2,9 +2,16 @@ from typing import Literal
 
 from ttc.language.conversation_classifier import ConversationClassifier
 from ttc.language.dialogue import Dialogue
-from ttc.language.play import Play
+from ttc.language.play import Attribution, Play, PlayResult, PlayRow
 
-__all__ = ["ConversationClassifier", "Dialogue", "Play"]
+__all__ = [
+    "Attribution",
+    "ConversationClassifier",
+    "Dialogue",
+    "Play",
+    "PlayResult",
+    "PlayRow",
+]
 
 LanguageCode = Literal["ru", "en"]
 """IETF language code, such as 'ru' or 'en'."""
@@ -0,0 +1,159 @@
+"""Per-token NumPy columns of a Doc's tags and morphology.
+
+Predicates over spans (``any(ANIM in t.morph for t in span)`` and the
+like) allocate lists and strings for every token they touch. A
+:class:`FeatureStore` is built once per Doc through ``Doc.to_array`` and
+answers the same questions as array slices. It must be built from a fully
+processed Doc: later changes to the annotations are not picked up.
+"""
+
+from collections.abc import Callable
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from spacy.attrs import (  # type: ignore
+    ENT_TYPE,
+    IDX,
+    IS_ALPHA,
+    IS_PUNCT,
+    LENGTH,
+    MORPH,
+    ORTH,
+    POS,
+    SPACY,
+)
+from spacy.morphology import Morphology  # type: ignore
+from spacy.tokens import Doc, Span, Token
+
+EMPTY_MORPHS = frozenset({"", "_"})
+
+
+class FeatureStore:
+    """Tag columns of one Doc, indexed by token position.
+
+    ``pos`` holds universal POS symbols (``spacy.symbols.NOUN`` etc.),
+    ``ent_type`` codes into ``ent_labels`` (0 = not an entity); morphological
+    features are coded per feature on demand, see :meth:`feature`.
+    """
+
+    __slots__ = (
+        "_feature_codes",
+        "_feature_values",
+        "_masks",
+        "_morph_ids",
+        "_morphs",
+        "ent_labels",
+        "ent_type",
+        "is_alpha",
+        "is_punct",
+        "pos",
+        "strings",
+    )
+
+    def __init__(self, doc: Doc):
+        columns = doc.to_array([POS, ENT_TYPE, MORPH, IS_ALPHA, IS_PUNCT])
+        self.strings = doc.vocab.strings
+        self.pos = columns[:, 0].astype(np.int16)
+        ent_hashes, ent_type = np.unique(columns[:, 1], return_inverse=True)
+        self.ent_labels = [self.strings[int(h)] if h else "" for h in ent_hashes]
+        if self.ent_labels and self.ent_labels[0]:
+            # keep code 0 for "no entity" even in a doc full of entities
+            self.ent_labels.insert(0, "")
+            ent_type += 1
+        self.ent_type = ent_type.astype(np.int16)
+        morph_hashes, morph_ids = np.unique(columns[:, 2], return_inverse=True)
+        self._morph_ids = morph_ids
+        self._morphs = [self._parse(int(h)) for h in morph_hashes]
+        self.is_alpha = columns[:, 3].astype(bool)
+        self.is_punct = columns[:, 4].astype(bool)
+        self._feature_codes: dict[str, np.ndarray] = {}
+        self._feature_values: dict[str, list[str]] = {}
+        self._masks: dict[tuple[str, str], np.ndarray] = {}
+
+    def _parse(self, morph_hash: int) -> dict[str, str]:
+        feats = self.strings[morph_hash] if morph_hash else ""
+        return {} if feats in EMPTY_MORPHS else Morphology.feats_to_dict(feats)
+
+    @staticmethod
+    def of(doc: Doc) -> "FeatureStore":
+        if (store := _FEATURE_STORES.get(doc)) is None:
+            store = _FEATURE_STORES[doc] = FeatureStore(doc)
+        return store
+
+    def feature(self, name: str) -> np.ndarray:
+        """int16 code of each token's value of ``name`` (0 = absent).
+
+        Multi-valued features are coded as a whole (``"Acc,Nom"``), so equal
+        codes mean equal ``token.morph.get(name)`` lists.
+        """
+        if (codes := self._feature_codes.get(name)) is None:
+            values = [""]
+            ids: dict[str, int] = {"": 0}
+            per_morph = np.array(
+                [
+                    ids.setdefault(v, len(ids))
+                    for v in (m.get(name, "") for m in self._morphs)
+                ],
+                dtype=np.int16,
+            )
+            values += [v for v in ids if v]
+            codes = self._feature_codes[name] = per_morph[self._morph_ids]
+            self._feature_values[name] = values
+        return codes
+
+    def values(self, name: str, i: int) -> list[str]:
+        """``token.morph.get(name)`` of the token at ``i``."""
+        code = self.feature(name)[i]
+        value = self._feature_values[name][code]
+        return value.split(",") if value else []
+
+    def has(self, name: str, value: str | None = None) -> np.ndarray:
+        """Tokens whose feature ``name`` includes ``value`` (any value if None)."""
+        key = (name, value or "")
+        if (mask := self._masks.get(key)) is None:
+            codes = self.feature(name)
+            if value is None:
+                mask = codes != 0
+            else:
+                matching = np.array(
+                    [value in v.split(",") for v in self._feature_values[name]]
+                )
+                mask = matching[codes]
+            self._masks[key] = mask
+        return mask
+
+    def has_pair(self, feature_value: str) -> np.ndarray:
+        """Like :meth:`has`, for a ``"Feature=Value"`` string."""
+        name, _, value = feature_value.partition("=")
+        return self.has(name, value)
+
+    def is_ent(self, label: str) -> np.ndarray:
+        if label not in self.ent_labels:
+            return np.zeros(len(self.ent_type), dtype=bool)
+        return self.ent_type == self.ent_labels.index(label)
+
+
+_FEATURE_STORES: "WeakKeyDictionary[Doc, FeatureStore]" = WeakKeyDictionary()
+
+
+def features(obj: Doc | Span | Token) -> FeatureStore:
+    return FeatureStore.of(obj if isinstance(obj, Doc) else obj.doc)
+
+
+def orth_column(doc: Doc, fn: Callable[[str], Any], dtype=bool) -> np.ndarray:
+    """``fn(token.text)`` of every token, evaluated once per distinct text."""
+    orths, orth_ids = np.unique(doc.to_array(ORTH), return_inverse=True)
+    per_orth = np.array([fn(doc.vocab.strings[int(h)]) for h in orths], dtype=dtype)
+    return per_orth[orth_ids]
+
+
+def newline_mask(doc: Doc) -> np.ndarray:
+    """``token._.has_newline`` of every token."""
+    if not len(doc):
+        return np.zeros(0, dtype=bool)
+    columns = doc.to_array([IDX, LENGTH, SPACY])
+    newlines = np.fromiter(doc._.nl_indices, dtype=np.int64)
+    mask = columns[:, 2].astype(bool) & np.isin(columns[:, 0] + columns[:, 1], newlines)
+    mask[-1] = True
+    return mask
@@ -0,0 +1,81 @@
+"""Per-Dialogue memoization of pure span/token computations.
+
+Actor classification asks the same questions about the same tokens and
+spans many times (every rescan, every reference-resolution region). While
+a :class:`Memo` is active (see :func:`activate`), functions decorated with
+:func:`memoized` answer repeated questions from it. Keys are token/span
+offsets, so a memo must only ever see spans of a single Doc.
+"""
+
+from collections import Counter
+from collections.abc import Generator, Hashable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from types import FunctionType
+from typing import Any, cast
+
+from spacy.tokens import Span, Token
+
+
+@dataclass
+class Memo:
+    tables: dict[str, dict[Hashable, Any]] = field(default_factory=dict)
+    hits: Counter[str] = field(default_factory=Counter)
+    misses: Counter[str] = field(default_factory=Counter)
+
+    def table(self, name: str) -> dict[Hashable, Any]:
+        return self.tables.setdefault(name, {})
+
+    def stats(self) -> dict[str, tuple[int, int]]:
+        """``{function: (hits, misses)}``."""
+        return {
+            name: (self.hits[name], self.misses[name])
+            for name in sorted(self.hits.keys() | self.misses.keys())
+        }
+
+
+_active: ContextVar[Memo | None] = ContextVar("ttc_memo", default=None)
+
+
+def active() -> Memo | None:
+    return _active.get()
+
+
+@contextmanager
+def activate(memo: Memo) -> Generator[Memo, None, None]:
+    token = _active.set(memo)
+    try:
+        yield memo
+    finally:
+        _active.reset(token)
+
+
+def offsets(obj: Span | Token | None) -> Hashable:
+    """Memo key of a span or token within its Doc."""
+    if obj is None:
+        return None
+    if isinstance(obj, Token):
+        return (obj.i,)
+    return obj.start, obj.end
+
+
+def memoized[Fn: FunctionType](f: Fn) -> Fn:
+    """Memoize a pure function of one span/token by its offsets."""
+    name = f.__qualname__
+
+    @wraps(f)
+    def wrapper(obj):
+        if (memo := _active.get()) is None:
+            return f(obj)
+        table = memo.table(name)
+        key = offsets(obj)
+        if key in table:
+            memo.hits[name] += 1
+            return table[key]
+        memo.misses[name] += 1
+        result = table[key] = f(obj)
+        return result
+
+    return cast(Fn, wrapper)
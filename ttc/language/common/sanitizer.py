@@ -0,0 +1,138 @@
+"""Normalization of raw text before it is parsed.
+
+E-book dumps spell the dialogue dash, the quotes and the spaces in many
+ways, while the replicizer only knows :data:`HYPHENS` and the quotes of
+``constants``: a replica opened by a horizontal bar or a non-breaking
+space after its dash is simply not found. :func:`doc_text` maps those
+variants onto the known ones, one character for one, so the offsets of a
+play stay offsets into the original text. :func:`sanitize` goes further
+and drops soft hyphens and redundant whitespace, keeping a map of the
+offsets it shifted.
+
+Every pass is a compiled regex (or ``str.replace``), so the work done in
+Python grows with the number of changes, not of characters: ``str.translate``
+would look up every character of a Cyrillic text in a dict instead.
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Final
+
+from ttc.language.play import PlayResult
+
+DASHES: Final = "‒―⸺⸻﹘"
+"""Dialogue dashes outside of :data:`HYPHENS`, read as an em dash."""
+
+MINUSES: Final = "‐‑−﹣－"
+"""Hyphens and minuses outside of :data:`HYPHENS`, read as a hyphen."""
+
+SPACES: Final = (
+    "\t\r\x1c\x1d\x1e\x1f\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u202f\u205f\u3000"
+)
+"""Spaces the tokenizer would keep as tokens, read as a plain space."""
+
+LINE_BREAKS: Final = "\x0b\x0c\x85\u2028\u2029"
+"""Line breaks other than ``\\n``, read as one."""
+
+INVISIBLE: Final = "\xad\u200b\u200c\u200d\u2060\ufeff"
+"""Soft hyphens and zero-width characters, dropped by :func:`sanitize`."""
+
+QUOTE_VARIANTS: Final = {"❝": "“", "〝": "“", "❞": "”", "〞": "”", "〟": "”", "＂": '"'}
+
+_VARIANTS: Final = {
+    **dict.fromkeys(DASHES, "—"),
+    **dict.fromkeys(MINUSES, "-"),
+    **dict.fromkeys(SPACES, " "),
+    **dict.fromkeys(LINE_BREAKS, "\n"),
+    **QUOTE_VARIANTS,
+}
+_VARIANT: Final = re.compile(f"[{re.escape(''.join(_VARIANTS))}]")
+
+# „Russian“ quotes close with an opening English one; pair them as «»
+_LOW_HIGH_QUOTES: Final = re.compile("„([^„“\n]*)“")
+_NEWLINE: Final = re.compile("\n")
+_COLLAPSIBLE: Final = re.compile(f"[{INVISIBLE}]+| *\n[ \n{INVISIBLE}]*| {{2,}}")
+
+
+def normalize(text: str) -> str:
+    """``text`` with its dash, quote, space and line break variants unified.
+
+    The result has the length of ``text``, and every character stays at its
+    offset.
+    """
+    text = _VARIANT.sub(lambda m: _VARIANTS[m.group()], text)
+    return _LOW_HIGH_QUOTES.sub(r"«\1»", text)
+
+
+def doc_text(text: str) -> tuple[str, frozenset[int]]:
+    """The normalized text given to spaCy and the indices of its newlines.
+
+    Newlines are kept apart (as ``Doc._.nl_indices``) and replaced with
+    spaces, which spaCy does not turn into tokens of their own.
+    """
+    text = normalize(text)
+    nl_indices = frozenset(m.start() for m in _NEWLINE.finditer(text))
+    return text.replace("\n", " "), nl_indices
+
+
+@dataclass(frozen=True)
+class Sanitized:
+    """A normalized text with the offsets it was shifted from kept."""
+
+    text: str
+    starts: tuple[int, ...]
+    shifts: tuple[int, ...]
+    """From ``starts[i]`` on, an offset in ``text`` is ``shifts[i]`` less
+    than in the original."""
+
+    def original(self, i: int) -> int:
+        """The offset in the original text of offset ``i`` in :attr:`text`."""
+        return i + self.shifts[bisect_right(self.starts, i) - 1]
+
+    def restore(self, result: PlayResult) -> PlayResult:
+        """``result`` of :attr:`text`, as offsets into the original text."""
+        o = self.original
+        return PlayResult(
+            tuple(
+                row._replace(
+                    start_char=o(row.start_char),
+                    end_char=o(row.end_char),
+                    actor_start_char=(
+                        None
+                        if row.actor_start_char is None
+                        else o(row.actor_start_char)
+                    ),
+                    actor_end_char=(
+                        None if row.actor_end_char is None else o(row.actor_end_char)
+                    ),
+                )
+                for row in result.rows
+            )
+        )
+
+
+def sanitize(text: str) -> Sanitized:
+    """:func:`normalize` ``text``, then drop the invisible characters and
+    collapse its whitespace: runs of spaces into one, and the spaces around
+    line breaks along with all blank lines but one.
+    """
+    text = normalize(text)
+    pieces: list[str] = []
+    starts, shifts = [0], [0]
+    end = 0
+    for m in _COLLAPSIBLE.finditer(text):
+        run = m.group()
+        if "\n" in run:
+            kept = "\n" * min(run.count("\n"), 2)
+        else:
+            kept = " " if run[0] == " " else ""
+        if kept == run:
+            continue
+        pieces += (text[end : m.start()], kept)
+        end = m.end()
+        # the kept characters still map to the start of the run
+        starts.append(m.start() - shifts[-1] + len(kept))
+        shifts.append(m.end() - starts[-1])
+    pieces.append(text[end:])
+    return Sanitized("".join(pieces), tuple(starts), tuple(shifts))
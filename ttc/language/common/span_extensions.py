@@ -1,8 +1,9 @@
 from collections.abc import Callable
 from functools import wraps
-from typing import Any, Literal, TypeVar, cast
+from typing import Any, Final, Literal, TypeVar, cast
 
-from spacy.tokens import Span, Token
+import numpy as np
+from spacy.tokens import Doc, Span, Token
 
 from ttc.language.common.token_extensions import (
     as_span,
@@ -11,7 +12,8 @@ from ttc.language.common.token_extensions import (
     non_word,
 )
 
-ExtensionKind = Literal["method", "getter", "default"]
+# "tag" extensions are replica tags: a getter and a setter of a bit flag
+ExtensionKind = Literal["method", "getter", "default", "tag"]
 Ext = TypeVar("Ext", bound=Callable[..., Any])
 
 EXTENSIONS: dict[Callable, ExtensionKind] = {}
@@ -126,28 +128,95 @@ def line_above(doclike: Span | Token):
     )
 
 
-@span_extension("default", False)
+# Replica tags are stored per Doc, as (start, end, flags) rows sorted by
+# span offsets in ``doc._.replica_tags``, not as one user_data entry each.
+REPLICA_TAGS: Final = (
+    "is_unannotated_alternation",
+    "is_before_author_insertion",
+    "is_after_author_starting",
+    "is_before_author_ending",
+)
+
+if not Doc.has_extension("replica_tags"):
+    Doc.set_extension("replica_tags", default=None)
+
+
+def replica_tag_table(spans: list[Span], flags: list[int]) -> np.ndarray:
+    """``doc._.replica_tags`` rows of spans with their tag bitmasks."""
+    rows = np.array(
+        [(s.start, s.end, f) for s, f in zip(spans, flags)], dtype=np.int32
+    ).reshape(-1, 3)
+    return rows[np.lexsort((rows[:, 1], rows[:, 0]))]
+
+
+def replica_tag_bit(name: str) -> int:
+    return 1 << REPLICA_TAGS.index(name)
+
+
+def _tag_row(rows: np.ndarray, span: Span) -> tuple[int, bool]:
+    """Row of the span in the table, or where to insert it, and if it exists."""
+    k = int(np.searchsorted(rows[:, 0], span.start))
+    while k < len(rows) and rows[k, 0] == span.start and rows[k, 1] < span.end:
+        k += 1
+    found = k < len(rows) and rows[k, 0] == span.start and rows[k, 1] == span.end
+    return k, bool(found)
+
+
+def replica_flags(span: Span) -> int:
+    """Bitmask of the replica tags of a span (see ``REPLICA_TAGS``)."""
+    if (rows := span.doc._.replica_tags) is None:
+        return 0
+    k, found = _tag_row(rows, span)
+    return int(rows[k, 2]) if found else 0
+
+
+def set_replica_tag(span: Span, name: str, value: bool) -> None:
+    rows = span.doc._.replica_tags
+    if rows is None:
+        rows = np.zeros((0, 3), dtype=np.int32)
+    bit = replica_tag_bit(name)
+    k, found = _tag_row(rows, span)
+    if found:
+        rows[k, 2] = rows[k, 2] | bit if value else rows[k, 2] & ~bit
+    elif value:
+        rows = np.insert(rows, k, (span.start, span.end, bit), axis=0)
+    span.doc._.replica_tags = rows
+
+
+@span_extension("tag")
 def is_unannotated_alternation(self: Span) -> bool:
-    return self._.is_unannotated_alternation or False
+    return bool(replica_flags(self) & replica_tag_bit("is_unannotated_alternation"))
 
 
-@span_extension("default", False)
+@span_extension("tag")
 def is_before_author_insertion(self: Span) -> bool:
-    return self._.is_before_author_insertion or False
+    return bool(replica_flags(self) & replica_tag_bit("is_before_author_insertion"))
 
 
-@span_extension("default", False)
+@span_extension("tag")
 def is_after_author_starting(self: Span) -> bool:
-    return self._.is_after_author_starting or False
+    return bool(replica_flags(self) & replica_tag_bit("is_after_author_starting"))
 
 
-@span_extension("default", False)
+@span_extension("tag")
 def is_before_author_ending(self: Span) -> bool:
-    return self._.is_before_author_ending or False
+    return bool(replica_flags(self) & replica_tag_bit("is_before_author_ending"))
+
+
+def _extension_attrs(name: str, f: Callable) -> dict[str, Any]:
+    kind = EXTENSIONS[f]
+    if kind == "default":
+        return {"default": f.default_value}  # type: ignore
+    if kind == "tag":
+        return {
+            "getter": f,
+            "setter": lambda span, value: set_replica_tag(span, name, value),
+        }
+    return {kind: f}
 
 
 SPAN_EXTENSIONS = {
-    name: {EXTENSIONS[f]: f.default_value if EXTENSIONS[f] == "default" else f}
+    name: _extension_attrs(name, f)
     for name, f in locals().items()
     if callable(f) and hasattr(f, "__wrapped__") and f.__module__ == __name__
 }
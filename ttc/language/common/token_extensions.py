@@ -3,6 +3,7 @@ from collections.abc import Callable
 from spacy.tokens import Span, Token
 
 from ttc.language.common.constants import CLOSE_QUOTES, OPEN_QUOTES
+from ttc.language.common.features import FeatureStore
 
 
 def is_open_quote(self: Token):
@@ -22,8 +23,13 @@ def has_newline(self: Token):
 
 
 def morph_distance(self: Token, other: Token, *morphs: str) -> int:
-    return len(morphs) - sum(
-        self.morph.get(m) == other.morph.get(m) for m in morphs  # type: ignore
+    if self.doc is not other.doc:
+        return len(morphs) - sum(
+            self.morph.get(m) == other.morph.get(m) for m in morphs  # type: ignore
+        )
+    f = FeatureStore.of(self.doc)
+    return sum(
+        int(codes[self.i] != codes[other.i]) for codes in (f.feature(m) for m in morphs)
     )
 
 
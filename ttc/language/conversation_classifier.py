@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 
 from spacy import Language
 
 from ttc.language.dialogue import Dialogue
-from ttc.language.play import Play
+from ttc.language.play import Play, PlayResult
 
 
 class ConversationClassifier(ABC):
@@ -18,3 +19,24 @@ class ConversationClassifier(ABC):
 
     @abstractmethod
     def connect_play(self, dialogue: Dialogue) -> Play: ...
+
+    def extract_dialogues(self, texts: Iterable[str]) -> Iterator[Dialogue]:
+        """:meth:`extract_dialogue` for a batch of texts."""
+        for text in texts:
+            yield self.extract_dialogue(text)
+
+    def classify(self, text: str) -> PlayResult:
+        """
+        Extract and connect the play of a text, keeping only its offsets:
+        the Doc is released as soon as the play is connected.
+        """
+        return PlayResult.of(self.connect_play(self.extract_dialogue(text)))
+
+    def classify_all(self, texts: Iterable[str]) -> Iterator[PlayResult]:
+        """
+        :meth:`classify` for a batch of texts, parsed by
+        :meth:`extract_dialogues`: a Doc is released once its play is
+        connected.
+        """
+        for dialogue in self.extract_dialogues(texts):
+            yield PlayResult.of(self.connect_play(dialogue))
@@ -1,11 +1,16 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from spacy import Language
 from spacy.tokens import Doc, Span
 
+from ttc.language.common.memo import Memo
+
 
 @dataclass
 class Dialogue:
     language: Language
     doc: Doc
     replicas: list[Span]
+
+    memo: Memo = field(default_factory=Memo, compare=False, repr=False)
+    """Cached per-span computations of actor classification on this dialogue."""
@@ -1,8 +1,44 @@
+from bisect import insort
+from collections.abc import Iterator
 from dataclasses import dataclass, field
+from enum import StrEnum
+from itertools import count
+from typing import Final, NamedTuple
 
 from spacy import Language
 from spacy.tokens import Span
 
+_versions = count(1)
+
+
+class Attribution(StrEnum):
+    """How a classifier found the actor of a replica."""
+
+    SAME_LINE = "same_line"
+    """Continues the previous replica's line, past the author speech."""
+    AUTHOR_SPEECH = "author_speech"
+    """Found in the author speech introducing or following the replica."""
+    LINE_ABOVE = "line_above"
+    """Found in the narrative above the replica."""
+    ALTERNATION = "alternation"
+    """Inferred from the speakers taking turns."""
+    REPEAT = "repeat"
+    """The previous replica's actor, repeated."""
+    MISS = "miss"
+    """No rule applied."""
+
+
+CONFIDENCE: Final = {
+    Attribution.SAME_LINE: 0.9,
+    Attribution.AUTHOR_SPEECH: 0.9,
+    Attribution.LINE_ABOVE: 0.7,
+    Attribution.ALTERNATION: 0.4,
+    Attribution.REPEAT: 0.4,
+    Attribution.MISS: 0.0,
+}
+"""Heuristic weight of each :class:`Attribution`, ordered by how reliable
+its rule is thought to be; hand-picked, not measured on a corpus."""
+
 
 @dataclass
 class Play:
@@ -14,6 +50,15 @@ class Play:
     _refs: dict[Span, Span | None] = field(default_factory=dict)
     """Reference -> Actor"""
 
+    sources: dict[Span, Attribution] = field(default_factory=dict, compare=False)
+    """Replica -> how its actor was found, if the classifier tracks it."""
+
+    version: int = field(default_factory=lambda: next(_versions), compare=False)
+    """Changes on every mutation; unique across all plays (a memo key)."""
+
+    _bounds: list[tuple[int, int, int]] = field(default_factory=list, compare=False)
+    """(start, -insertion order, end) of every replica, kept sorted."""
+
     @property
     def lines(self):
         """Replica -> Actor"""
@@ -31,6 +76,13 @@ class Play:
     def actors(self):
         return self._rels.values()
 
+    def replica_bounds(self) -> Iterator[tuple[int, int]]:
+        """(start, end) of the replicas from the bottom up.
+
+        Replicas starting at the same token come in insertion order.
+        """
+        return ((start, end) for start, _, end in reversed(self._bounds))
+
     @property
     def last_actor(self):
         return self[lr] if (lr := self.last_replica) else None
@@ -54,6 +106,12 @@ class Play:
                 return actor
         return None
 
+    def confidence(self, replica: Span) -> float:
+        """:data:`CONFIDENCE` of the replica's attribution; 1.0 if untracked."""
+        if (source := self.sources.get(replica)) is None:
+            return 1.0
+        return CONFIDENCE[source] if self._rels.get(replica) else 0.0
+
     def reference(self, word) -> Span | None:
         return self._refs.get(word, None)
 
@@ -67,6 +125,9 @@ class Play:
         return self._rels[item]
 
     def __setitem__(self, replica, val):
+        self.version = next(_versions)
+        if replica not in self._rels:
+            insort(self._bounds, (replica.start, -self.version, replica.end))
         if isinstance(val, tuple):
             if (isinstance(actor := val[0], Span) or actor is None) and isinstance(
                 ref_chain := val[1], list
@@ -80,7 +141,10 @@ class Play:
             self._rels[replica] = val
 
     def __delitem__(self, key):
+        self.version = next(_versions)
         del self._rels[key]
+        self.sources.pop(key, None)
+        self._bounds = [b for b in self._bounds if (b[0], b[2]) != (key.start, key.end)]
 
     def __repr__(self):
         s = ""
@@ -88,3 +152,71 @@ class Play:
         for replica, actor in self._rels.items():
             s += f"{{:<{first_col_w}}} | {{:<200}}\n".format(str(actor), str(replica))
         return s
+
+
+class PlayRow(NamedTuple):
+    start_char: int
+    end_char: int
+    """Replica character offsets."""
+
+    actor_start_char: int | None
+    actor_end_char: int | None
+    """Actor character offsets; ``None`` for an unattributed replica."""
+
+    actor_key: str
+    """See ``Play._actor_key``; empty for an unattributed replica."""
+
+    confidence: float = 1.0
+    """See :meth:`Play.confidence`."""
+
+    actor_lemma: str = ""
+    """Lemma of the actor span, matched against gold aliases when the
+    surface form is not one (see ``ttc.eval.actor_key_of``)."""
+
+
+@dataclass(frozen=True, slots=True)
+class PlayResult:
+    """The lines of a Play as character offsets, detached from its Doc.
+
+    A Play keeps its Doc (the parse, vectors and user_data) alive through its
+    spans; a PlayResult does not, so many of them can be kept at once.
+    """
+
+    rows: tuple[PlayRow, ...]
+
+    @staticmethod
+    def of(play: Play) -> "PlayResult":
+        return PlayResult(
+            tuple(
+                (
+                    PlayRow(
+                        r.start_char,
+                        r.end_char,
+                        a.start_char,
+                        a.end_char,
+                        play._actor_key(a),
+                        play.confidence(r),
+                        a.lemma_,
+                    )
+                    if a
+                    else PlayRow(
+                        r.start_char, r.end_char, None, None, "", play.confidence(r)
+                    )
+                )
+                for r, a in play.lines
+            )
+        )
+
+    def lines(self, text: str) -> Iterator[tuple[str, str | None]]:
+        """(replica, actor) texts of the rows in ``text``."""
+        for row in self.rows:
+            actor = None
+            if row.actor_start_char is not None:
+                actor = text[row.actor_start_char : row.actor_end_char]
+            yield text[row.start_char : row.end_char], actor
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[PlayRow]:
+        return iter(self.rows)
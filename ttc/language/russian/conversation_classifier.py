@@ -1,5 +1,6 @@
 import os
 import warnings
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 
 import spacy
@@ -9,6 +10,7 @@ from spacy.tokens import Doc, Span, Token
 
 import ttc.language.russian.pipelines as russian_pipelines
 from ttc.language import ConversationClassifier, Dialogue, Play
+from ttc.language.common.sanitizer import doc_text
 from ttc.language.common.span_extensions import SPAN_EXTENSIONS
 from ttc.language.common.token_extensions import TOKEN_EXTENSIONS as TOKEN_EXTS
 from ttc.language.russian.extensions.syntax_iterators import noun_chunks
@@ -64,18 +66,30 @@ class RussianConversationClassifier(ConversationClassifier):
             if not Span.has_extension(name):
                 Span.set_extension(name, **ext)
 
-    def extract_dialogue(self, text: str) -> Dialogue:
+    def _make_doc(self, text: str) -> Doc:
         # 1. store newline indices in the separate text metadata
         # 2. pass the text to spacy with newlines completely removed/replaced with space
         #    (the latter is preferred if it does not create the separate SPACE tokens)
-        doc = self.language.make_doc(text.replace("\n", " "))
-        doc._.nl_indices = frozenset(i for i, c in enumerate(text) if c == "\n")
-        doc = self.language(doc)
+        # 3. unify dash, quote and space variants the replicizer does not know
+        text, nl_indices = doc_text(text)
+        doc = self.language.make_doc(text)
+        doc._.nl_indices = nl_indices
+        return doc
+
+    def _dialogue(self, doc: Doc) -> Dialogue:
         return Dialogue(
             self.language,
             doc,
             extract_replicas(doc, self.language, self.token_matchers),
         )
 
+    def extract_dialogue(self, text: str) -> Dialogue:
+        return self._dialogue(self.language(self._make_doc(text)))
+
+    def extract_dialogues(self, texts: Iterable[str]) -> Iterator[Dialogue]:
+        """Like :meth:`extract_dialogue`, parsing the texts with ``nlp.pipe``."""
+        for doc in self.language.pipe(self._make_doc(text) for text in texts):
+            yield self._dialogue(doc)
+
     def connect_play(self, dialogue: Dialogue) -> Play:
         return classify_actors(self.language, dialogue)
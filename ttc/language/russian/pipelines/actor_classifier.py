@@ -1,8 +1,12 @@
+import heapq
 import sys
+from bisect import bisect_left, bisect_right
 from collections import Counter
 from collections.abc import Callable, Generator
+from dataclasses import dataclass, field
 from itertools import chain, pairwise
 from typing import Final
+from weakref import WeakKeyDictionary
 
 from spacy import Language
 from spacy.matcher import DependencyMatcher
@@ -21,11 +25,15 @@ from spacy.symbols import (  # type: ignore
     obl,
     parataxis,
 )
-from spacy.tokens import Span, Token
+from spacy.tokens import Doc, Span, Token
 
 from ttc.iterables import flatten, iter_by_triples
-from ttc.language import Dialogue, Play
+from ttc.language import Attribution, Dialogue, Play
 from ttc.language.common.constants import HYPHENS as HYPHENS_STR
+from ttc.language.common.features import features
+from ttc.language.common.memo import activate as activate_memo
+from ttc.language.common.memo import active as active_memo
+from ttc.language.common.memo import memoized, offsets
 from ttc.language.common.span_extensions import (
     contiguous,
     expand_line_end,
@@ -137,40 +145,54 @@ def expand_hyphenated_span(span: Span) -> Span:
 
 
 def span_has_animacy(span: Span, value: str) -> bool:
-    return any(value in t.morph for t in span)
+    return bool(features(span).has_pair(value)[span.start : span.end].any())
 
 
 def span_has_animate_noun(span: Span) -> bool:
-    return any(t.pos == NOUN and ANIMACY_ANIM in t.morph for t in span)
+    f = features(span)
+    window = slice(span.start, span.end)
+    return bool(((f.pos[window] == NOUN) & f.has_pair(ANIMACY_ANIM)[window]).any())
 
 
 def span_is_collective(span: Span) -> bool:
     if not span:
         return False
-    if span.root.lemma_ == "голос" and NUMBER_PLUR in span.root.morph:
+    f = features(span)
+    plural = f.has_pair(NUMBER_PLUR)
+    if span.root.lemma_ == "голос" and plural[span.root.i]:
         return True
-    return any(NUMBER_PLUR in t.morph for t in span if t.is_alpha)
+    window = slice(span.start, span.end)
+    return bool((plural[window] & f.is_alpha[window]).any())
 
 
 def is_nominative(token: Token) -> bool:
-    return "Case=Nom" in token.morph
+    return bool(features(token).has("Case", "Nom")[token.i])
 
 
 def is_oblique(token: Token) -> bool:
-    cases = token.morph.get("Case", [])
-    return bool(cases) and "Nom" not in cases
+    f = features(token)
+    return bool(f.has("Case")[token.i] and not f.has("Case", "Nom")[token.i])
+
+
+def has_person(span: Span, person: str) -> bool:
+    f = features(span)
+    window = slice(span.start, span.end)
+    return bool((f.has("Person", person)[window] & f.is_alpha[window]).any())
 
 
 def has_first_person(span: Span) -> bool:
-    return any("First" in t.morph.get("Person", []) for t in span if t.is_alpha)
+    return has_person(span, "First")
 
 
 def has_second_person(span: Span) -> bool:
-    return any("Second" in t.morph.get("Person", []) for t in span if t.is_alpha)
+    return has_person(span, "Second")
 
 
 def has_imperative(span: Span) -> bool:
-    return any(t.pos in {VERB, AUX} and "Imp" in t.morph.get("Mood", []) for t in span)
+    f = features(span)
+    window = slice(span.start, span.end)
+    verbal = (f.pos[window] == VERB) | (f.pos[window] == AUX)
+    return bool((verbal & f.has("Mood", "Imp")[window]).any())
 
 
 def has_specific_role(span: Span) -> bool:
@@ -273,6 +295,7 @@ def is_brief_reply(span: Span) -> bool:
     return sum(t.is_alpha for t in span) <= 2
 
 
+@memoized
 def actor_key(span: Span | None) -> str:
     if not span:
         return ""
@@ -286,16 +309,18 @@ def actor_key(span: Span | None) -> str:
     return span.text.lower()
 
 
+@memoized
 def is_human_like(span: Span | None) -> bool:
     if not span:
         return False
-    if any(t.ent_type_ == "PER" for t in span):
+    f = features(span)
+    window = slice(span.start, span.end)
+    if f.is_ent("PER")[window].any():
         return True
-    if any(t.pos == NOUN and ANIMACY_ANIM in t.morph for t in span):
+    pos = f.pos[window]
+    if (((pos == NOUN) | (pos == PROPN)) & f.has_pair(ANIMACY_ANIM)[window]).any():
         return True
-    if any(t.pos == PROPN and ANIMACY_ANIM in t.morph for t in span):
-        return True
-    return any(t.pos == PRON and t.morph.get("Person", []) for t in span)
+    return bool(((pos == PRON) & f.has("Person")[window]).any())
 
 
 def has_voice_intro(replica: Span) -> bool:
@@ -307,6 +332,7 @@ def has_voice_intro(replica: Span) -> bool:
     return False
 
 
+@memoized
 def refined_noun_chunk(token: Token | Span) -> Span:
     return normalize_span(expand_hyphenated_span(noun_chunk(token)))
 
@@ -372,6 +398,7 @@ def ref_matches(ref: Token, target: Token) -> bool:
     return morph_distance(target, ref, Gender, Number, Tense) < 2
 
 
+@memoized
 def is_ref(noun: Span | Token):
     if isinstance(noun, Token):
         if noun.pos == PRON:
@@ -440,7 +467,7 @@ def morph_aligns_with(target: Token) -> Callable[[Token], bool]:
     def aligned_gender(tk) -> str | None:
         t = noun_chunk(tk)
         if len(t) == 1:
-            return [*t.root.morph.get(Gender, []), None][0]
+            return [*features(t).values(Gender, t.root.i), None][0]
         morphs: dict[str, str] = next(
             (
                 v
@@ -450,7 +477,8 @@ def morph_aligns_with(target: Token) -> Callable[[Token], bool]:
             ),
             {},
         )
-        stats = Counter([*tk.morph.get(Gender, []), None][0] for tk in t)
+        f = features(t)
+        stats = Counter([*f.values(Gender, tk.i), None][0] for tk in t)
         return morphs.get(Gender, max(stats, key=stats.get))  # type: ignore
 
     target_gender = aligned_gender(target)
@@ -506,6 +534,60 @@ def resolve_role_actor(play: Play, actor: Span, *, prefer_recent_actor: bool) ->
     return actor
 
 
+@dataclass
+class NameIndex:
+    """Sorted token positions of the names and nouns of one Doc.
+
+    Built once per Doc (on first use, after the pipeline has run), so that
+    finding the nearest occurrence of a name is a bisection instead of a
+    scan over the whole document.
+    """
+
+    nominative_propn_by_lemma: dict[str, list[int]] = field(default_factory=dict)
+    nominative_propn_by_prefix: dict[str, list[int]] = field(default_factory=dict)
+    """Keyed by every lowercase prefix of at least two characters."""
+
+    oblique_noun_by_lemma: dict[str, list[int]] = field(default_factory=dict)
+
+    @staticmethod
+    def of(doc: Doc) -> "NameIndex":
+        if (index := _NAME_INDICES.get(doc)) is None:
+            index = _NAME_INDICES[doc] = NameIndex.build(doc)
+        return index
+
+    @staticmethod
+    def build(doc: Doc) -> "NameIndex":
+        index = NameIndex()
+        for token in doc:  # ascending, so every position list stays sorted
+            if token.pos == PROPN and is_nominative(token):
+                index.nominative_propn_by_lemma.setdefault(token.lemma_, []).append(
+                    token.i
+                )
+                lower = token.text.lower()
+                for n in range(2, len(lower) + 1):
+                    index.nominative_propn_by_prefix.setdefault(lower[:n], []).append(
+                        token.i
+                    )
+            elif token.pos == NOUN and is_oblique(token):
+                index.oblique_noun_by_lemma.setdefault(token.lemma_, []).append(token.i)
+        return index
+
+
+_NAME_INDICES: "WeakKeyDictionary[Doc, NameIndex]" = WeakKeyDictionary()
+
+
+def nearest_before(positions: list[int], i: int) -> int | None:
+    """Greatest position below ``i``."""
+    k = bisect_left(positions, i)
+    return positions[k - 1] if k else None
+
+
+def nearest_after(positions: list[int], i: int) -> int | None:
+    """Least position at or above ``i``."""
+    k = bisect_left(positions, i)
+    return positions[k] if k < len(positions) else None
+
+
 def resolve_named_case(play: Play, actor: Span, *, force: bool = False) -> Span:
     if not (actor.root.pos == PROPN or actor.root.ent_type_ == "PER"):
         return actor
@@ -523,34 +605,25 @@ def resolve_named_case(play: Play, actor: Span, *, force: bool = False) -> Span:
         return actor
     root_text = actor.root.text.lower()
     stem = root_text[:-1] if len(root_text) > 2 else ""
+    index = NameIndex.of(actor.doc)
+    lookups = (
+        index.nominative_propn_by_lemma.get(actor.root.lemma_, []),
+        index.nominative_propn_by_prefix.get(stem, []) if stem else [],
+    )
 
-    def find_by_lemma(tokens):
-        for token in tokens:
-            if (
-                token.lemma_ == actor.root.lemma_
-                and token.pos == PROPN
-                and is_nominative(token)
-            ):
-                return actor.doc[token.i : token.i + 1]
-        return None
-
-    def find_by_stem(tokens):
-        if not stem:
-            return None
-        for token in tokens:
-            if (
-                token.pos == PROPN
-                and is_nominative(token)
-                and token.text.lower().startswith(stem)
+    def find_nearest() -> Span | None:
+        # nearest by lemma before/after the actor, then by stem before/after
+        for positions in lookups:
+            for i in (
+                nearest_before(positions, actor.start),
+                nearest_after(positions, actor.end),
             ):
-                return actor.doc[token.i : token.i + 1]
+                if i is not None:
+                    return actor.doc[i : i + 1]
         return None
 
-    if force:
-        for finder in (find_by_lemma, find_by_stem):
-            for tokens in (reversed(actor.doc[: actor.start]), actor.doc[actor.end :]):
-                if found := finder(tokens):
-                    return found
+    if force and (found := find_nearest()):
+        return found
 
     for prev in reversed(list(play.actors)):
         if not prev or prev.root.lemma_ != actor.root.lemma_:
@@ -558,11 +631,7 @@ def resolve_named_case(play: Play, actor: Span, *, force: bool = False) -> Span:
         if prev.root.pos == PROPN and is_nominative(prev.root):
             return prev
 
-    for finder in (find_by_lemma, find_by_stem):
-        for tokens in (reversed(actor.doc[: actor.start]), actor.doc[actor.end :]):
-            if found := finder(tokens):
-                return found
-    return actor
+    return find_nearest() or actor
 
 
 def resolve_noun_case(play: Play, actor: Span) -> Span:
@@ -581,13 +650,12 @@ def resolve_noun_case(play: Play, actor: Span) -> Span:
             and is_oblique(prev.root)
         ):
             return prev
-    for token in reversed(actor.doc[: actor.start]):
-        if (
-            token.lemma_ == actor.root.lemma_
-            and token.pos == NOUN
-            and is_oblique(token)
-        ):
-            return refined_noun_chunk(token)
+    i = nearest_before(
+        NameIndex.of(actor.doc).oblique_noun_by_lemma.get(actor.root.lemma_, []),
+        actor.start,
+    )
+    if i is not None:
+        return refined_noun_chunk(actor.doc[i])
     return actor
 
 
@@ -692,26 +760,44 @@ def mentions_actor_as_verbal_subject(span: Span, actor: Span) -> bool:
     return False
 
 
-def reference_resolution_context(bounds: list[Span]) -> Generator[Span, None, None]:
-    """Yields all the spans between `bounds`, from bottom to the top.
-    Each span is split into sentences, if needed.
+def sentence_ends(doc: Doc) -> list[int]:
+    """Sorted ``end_char`` of every sentence of ``doc`` (computed once)."""
+    if (ends := _SENTENCE_ENDS.get(doc)) is None:
+        ends = _SENTENCE_ENDS[doc] = [s.end_char for s in doc.sents]
+    return ends
+
+
+_SENTENCE_ENDS: "WeakKeyDictionary[Doc, list[int]]" = WeakKeyDictionary()
+
+
+def reference_resolution_context(
+    play: Play, extra: list[Span]
+) -> Generator[Span, None, None]:
+    """Yields all the spans between the play replicas and `extra` spans,
+    from bottom to the top. Each span is split into sentences, if needed.
+
+    Bounds are walked lazily from the bottom, so the cost of reaching the
+    nearest regions does not grow with the length of the play.
     """
-    if not bounds:
+    if not extra and not len(play):
         return
-    doc = bounds[0].doc
-    bounds = sorted(bounds, key=lambda sp: sp.start, reverse=True) + [doc[0:0]]
+    doc = extra[0].doc if extra else next(iter(play.replicas)).doc
+    extra_bounds = sorted(
+        ((s.start, s.end) for s in extra), key=lambda b: b[0], reverse=True
+    )
+    bounds = chain(
+        # on equal starts, play replicas go first
+        heapq.merge(play.replica_bounds(), extra_bounds, key=lambda b: -b[0]),
+        [(0, 0)],
+    )
+    ends = sentence_ends(doc)
     # Read context pieces between bounds
-    for r_bound, l_bound in pairwise(bounds):
-        if not (bet := trim_non_word(doc[l_bound.end : r_bound.start])):
+    for (r_start, _), (_, l_end) in pairwise(bounds):
+        if not (bet := trim_non_word(doc[l_end:r_start])):
             continue
-        split_idxs = sorted(
-            (
-                i
-                for s in doc.sents
-                if bet.start_char <= (i := s.end_char) <= bet.end_char
-            ),
-            reverse=True,
-        )
+        split_idxs = ends[
+            bisect_left(ends, bet.start_char) : bisect_right(ends, bet.end_char)
+        ][::-1]
         if not split_idxs:
             yield bet
             continue
@@ -733,8 +819,58 @@ def actor_search(
     resolve_refs: bool = True,
     prefer_recent_actor: bool = False,
 ) -> Span | None:
+    """Find the actor of ``replica`` in ``span``, extending ``ref_chain``.
+
+    Memoized on the active memo: the result depends only on the offsets,
+    the reference chain, the flags and the state of ``play``, and a cached
+    call restores the reference chain it left behind.
+    """
     if ref_chain is None:
         ref_chain = []
+    if (memo := active_memo()) is None:
+        return _actor_search(
+            span,
+            play,
+            replica,
+            ref_chain=ref_chain,
+            resolve_refs=resolve_refs,
+            prefer_recent_actor=prefer_recent_actor,
+        )
+    key = (
+        offsets(span),
+        offsets(replica),
+        tuple(t.i for t in ref_chain),
+        resolve_refs,
+        prefer_recent_actor,
+        play.version,
+    )
+    table = memo.table("actor_search")
+    if key in table:
+        memo.hits["actor_search"] += 1
+        actor, ref_chain[:] = table[key]
+        return actor
+    memo.misses["actor_search"] += 1
+    actor = _actor_search(
+        span,
+        play,
+        replica,
+        ref_chain=ref_chain,
+        resolve_refs=resolve_refs,
+        prefer_recent_actor=prefer_recent_actor,
+    )
+    table[key] = actor, list(ref_chain)
+    return actor
+
+
+def _actor_search(
+    span: Span,
+    play: Play,
+    replica: Span,
+    *,
+    ref_chain: list[Token],
+    resolve_refs: bool,
+    prefer_recent_actor: bool,
+) -> Span | None:
     ref = ref_chain[-1] if ref_chain else None
     ref_matcher = morph_aligns_with(ref) if ref else lambda _: True
 
@@ -945,10 +1081,10 @@ def actor_search(
                 ref_roots = m_verbs
 
         search_ctx = reference_resolution_context(
-            # Spans between which the antecedent will be searched
-            list(play.replicas)
-            + ([] if ref else ([replica] if replica else []))
-            + [span]
+            # Spans between which (and the play replicas) the antecedent
+            # will be searched
+            play,
+            ([] if ref else ([replica] if replica else [])) + [span],
         )
         cached_ctx: list[Span] = []
         for word in ref_roots:
@@ -1004,6 +1140,14 @@ def actor_search(
 def classify_actors(
     language: Language,
     dialogue: Dialogue,
+) -> Play:
+    with activate_memo(dialogue.memo):
+        return _classify_actors(language, dialogue)
+
+
+def _classify_actors(
+    language: Language,
+    dialogue: Dialogue,
 ) -> Play:
     p = Play(language)
 
@@ -1022,6 +1166,7 @@ def classify_actors(
         ):
             # Replica is on the same line - probably separated by author speech
             p[replica] = p[p_replica]  # <=> previous actor
+            p.sources[replica] = Attribution.SAME_LINE
 
         # Non-first replica fills line
         elif (
@@ -1035,6 +1180,7 @@ def classify_actors(
                 and has_voice_intro(p_replica)
             ):
                 p[replica] = p[p_replica]
+                p.sources[replica] = Attribution.SAME_LINE
                 continue
             if (
                 p_replica
@@ -1063,13 +1209,16 @@ def classify_actors(
                 )
             ):
                 p[replica] = p[p_replica]
+                p.sources[replica] = Attribution.LINE_ABOVE
                 continue
             if not p.penult() and not replica._.is_unannotated_alternation:
                 p[replica] = p[p_replica]
+                p.sources[replica] = Attribution.REPEAT
                 continue
             if penult := p.penult():
                 # Line has no author speech => speakers alternation
                 actor = penult
+                p.sources[replica] = Attribution.ALTERNATION
                 if p_replica and has_imperative(replica) and has_imperative(p_replica):
                     actor = p[p_replica]
                 if replica._.is_unannotated_alternation and (
@@ -1115,6 +1264,7 @@ def classify_actors(
                     and replica[0].pos != PRON
                 ):
                     p[replica] = p[p_replica]
+                    p.sources[replica] = Attribution.REPEAT
                     continue
                 if (
                     replica._.is_unannotated_alternation
@@ -1125,6 +1275,7 @@ def classify_actors(
                     )
                 ):
                     p[replica] = p[p_replica]
+                    p.sources[replica] = Attribution.REPEAT
                     continue
                 if (
                     replica._.is_unannotated_alternation
@@ -1144,6 +1295,7 @@ def classify_actors(
                     )
                 ):
                     p[replica] = actor
+                    p.sources[replica] = Attribution.LINE_ABOVE
                     continue
                 leading = doc[
                     min(p_replica.start, p_replica.sent.start) - 2 : p_replica.start
@@ -1185,6 +1337,7 @@ def classify_actors(
                         prefer_recent_actor=True,
                     )
                 p[replica] = (actor, ref_chain)
+                p.sources[replica] = Attribution.LINE_ABOVE
 
         # After author starting ( ... [:])
         elif replica._.is_after_author_starting:
@@ -1248,6 +1401,7 @@ def classify_actors(
                 )
 
             p[replica] = (actor, ref_chain)
+            p.sources[replica] = Attribution.AUTHOR_SPEECH
 
         # Before author ending ([-] ... [\n])
         elif replica._.is_before_author_ending:
@@ -1282,6 +1436,7 @@ def classify_actors(
                 ),
                 ref_chain,
             )
+            p.sources[replica] = Attribution.AUTHOR_SPEECH
             if (
                 actor
                 and prev_actor
@@ -1295,6 +1450,7 @@ def classify_actors(
                 and not any(t.pos == PROPN or t.ent_type_ == "PER" for t in actor)
             ):
                 p[replica] = prev_penult
+                p.sources[replica] = Attribution.ALTERNATION
             if not p[replica]:
                 if (
                     (above := line_above(replica))
@@ -1319,10 +1475,12 @@ def classify_actors(
                     )
                 ):
                     p[replica] = candidate
+                    p.sources[replica] = Attribution.LINE_ABOVE
                 if not p[replica] and prev_penult:
                     # Author speech is present, but it has
                     # no reference to the actor => actor alternation
                     p[replica] = prev_penult
+                    p.sources[replica] = Attribution.ALTERNATION
 
         # Author insertion
         elif replica._.is_before_author_insertion and n_replica:
@@ -1348,6 +1506,7 @@ def classify_actors(
                 ),
                 ref_chain,
             )
+            p.sources[replica] = Attribution.AUTHOR_SPEECH
             if (
                 actor
                 and prev_actor
@@ -1361,6 +1520,7 @@ def classify_actors(
                 and not any(t.pos == PROPN or t.ent_type_ == "PER" for t in actor)
             ):
                 p[replica] = prev_penult
+                p.sources[replica] = Attribution.ALTERNATION
             if not p[replica]:
                 if (
                     (above := line_above(replica))
@@ -1385,10 +1545,12 @@ def classify_actors(
                     )
                 ):
                     p[replica] = candidate
+                    p.sources[replica] = Attribution.LINE_ABOVE
                 if not p[replica] and prev_penult:
                     # Author speech is present, but it has
                     # no reference to the actor => actor alternation
                     p[replica] = prev_penult
+                    p.sources[replica] = Attribution.ALTERNATION
 
         # Fallback, similar to ( ... [:]), but
         # constrained to a single line between replicas
@@ -1405,6 +1567,7 @@ def classify_actors(
             )
         ):
             # TODO: check for appeal in the replica text, then fallback on actor_search.
+            source = Attribution.LINE_ABOVE
 
             # Start with the sentence nearest to the replica
             full_search_span = search_span
@@ -1497,23 +1660,26 @@ def classify_actors(
                 )
                 and (penult := p.penult())
             ):
-                actor = penult
+                actor, source = penult, Attribution.ALTERNATION
             if (
                 not actor
                 and replica._.is_unannotated_alternation
                 and (penult := p.penult())
             ):
-                actor = penult
+                actor, source = penult, Attribution.ALTERNATION
             if actor and span_is_collective(actor) and (penult := p.penult()):
-                actor = penult
+                actor, source = penult, Attribution.ALTERNATION
             p[replica] = actor
+            p.sources[replica] = source
 
         # Fallback - repeat actor from prev replica
         elif fills_line(replica) and p_replica and p_replica in p:
             p[replica] = p[p_replica]  # <=> previous actor
+            p.sources[replica] = Attribution.REPEAT
 
         else:
             p[replica] = None
+            p.sources[replica] = Attribution.MISS
             print("MISS", replica, file=sys.stderr)  # TODO: handle
 
     return p
@@ -1,27 +1,36 @@
+import numpy as np
 from spacy import Language
 from spacy.tokens import Doc, Span, Token
 
-from ttc.language.common.token_extensions import has_newline
+from ttc.language.common.features import newline_mask
 
 NAME = "line_numerator"
 
+
+def line_no(token: Token) -> int:
+    numbers = token.doc._.line_numbers
+    return 1 if numbers is None else int(numbers[token.i])
+
+
+# Line numbers are stored as one int32 array per Doc instead of a
+# user_data entry per token
+if not Doc.has_extension("line_numbers"):
+    Doc.set_extension("line_numbers", default=None)
+
 if not Token.has_extension("line_no"):
-    Token.set_extension("line_no", default=1)
+    Token.set_extension("line_no", getter=line_no)
 
 if not Span.has_extension("start_line_no"):
-    Span.set_extension("start_line_no", getter=lambda s: s[0]._.line_no)
+    Span.set_extension("start_line_no", getter=lambda s: line_no(s[0]))
 
 if not Span.has_extension("end_line_no"):
-    Span.set_extension("end_line_no", getter=lambda s: s[-1]._.line_no)
+    Span.set_extension("end_line_no", getter=lambda s: line_no(s[-1]))
 
 
 @Language.component(NAME)
 def _mark_line_numbers(doc: Doc):
-    line_no = 1
-
-    for token in doc:
-        token._.line_no = line_no
-        if has_newline(token):
-            line_no += 1
-
+    newline = newline_mask(doc)
+    line_numbers = np.ones(len(doc), dtype=np.int32)
+    line_numbers[1:] += np.cumsum(newline[:-1], dtype=np.int32)
+    doc._.line_numbers = line_numbers
     return doc
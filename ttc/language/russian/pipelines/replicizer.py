@@ -1,24 +1,26 @@
 from collections import deque
 from collections.abc import Callable
-from typing import Any, Final, Literal
+from enum import IntEnum
+from typing import Any
 
+import numpy as np
 from spacy import Language
+from spacy.attrs import IS_PUNCT, IS_SPACE  # type: ignore
 from spacy.matcher import DependencyMatcher, Matcher
 from spacy.symbols import AUX, NOUN, PRON, PROPN, VERB, parataxis  # type: ignore
 from spacy.tokens import Doc, Span, Token
 
+from ttc.language.common.constants import CLOSE_QUOTES, HYPHENS, OPEN_QUOTES
+from ttc.language.common.features import newline_mask, orth_column
 from ttc.language.common.span_extensions import (
     is_after_author_starting,
     is_before_author_ending,
     is_before_author_insertion,
     is_unannotated_alternation,
+    replica_tag_bit,
+    replica_tag_table,
     trim_non_word,
 )
-from ttc.language.common.token_extensions import (
-    has_newline,
-    is_close_quote,
-    is_open_quote,
-)
 from ttc.language.russian.dependency_patterns import (
     ACTION_VERB_CONJUNCT_ACTOR,
     ACTION_VERB_TO_ACTOR,
@@ -28,6 +30,112 @@ from ttc.language.russian.token_extensions import (
 )
 from ttc.language.russian.token_patterns import TokenMatcherClass
 
+# Token classes the replica automaton branches on, as bit flags
+HYPHEN = 1
+OPEN_QUOTE = 2
+CLOSE_QUOTE = 4
+COLON = 8
+NEWLINE = 16
+PUNCT = 32
+SPACE = 64
+
+
+class ReplicaState(IntEnum):
+    AUTHOR = 0
+    AUTHOR_INSERTION = 1
+    REPLICA_BY_NEWLINE_AND_HYPHEN = 2
+    REPLICA_BY_COLON_AND_QUOTE = 3
+    REPLICA_BY_QUOTE = 4  # Can be a mistreated author's speech
+
+
+REPLICA_STATES = frozenset(
+    {
+        ReplicaState.REPLICA_BY_NEWLINE_AND_HYPHEN,
+        ReplicaState.REPLICA_BY_COLON_AND_QUOTE,
+        ReplicaState.REPLICA_BY_QUOTE,
+    }
+)
+
+
+def _orth_class(text: str) -> int:
+    return (
+        (HYPHEN if text in HYPHENS else 0)
+        | (OPEN_QUOTE if text in OPEN_QUOTES else 0)
+        | (CLOSE_QUOTE if text in CLOSE_QUOTES else 0)
+        | (COLON if ":" in text else 0)
+    )
+
+
+def token_classes(doc: Doc) -> np.ndarray:
+    """Class flags of every token of a Doc (see ``HYPHEN`` etc.)."""
+    codes = orth_column(doc, _orth_class, dtype=np.uint8)
+    lexical = doc.to_array([IS_PUNCT, IS_SPACE]).astype(bool).reshape(-1, 2)
+    codes[newline_mask(doc)] |= NEWLINE
+    codes[lexical[:, 0]] |= PUNCT
+    codes[lexical[:, 1]] |= SPACE
+    return codes
+
+
+def significant_tokens(codes: np.ndarray) -> list[np.ndarray]:
+    """
+    Transition table of the replica automaton: for each state, the positions
+    of tokens where it may change state or end a replica. Every other token
+    is appended to the current replica in replica states and skipped
+    in author states.
+    """
+    first = np.zeros(len(codes), dtype=bool)
+    first[:1] = True
+    prev = np.zeros_like(codes)
+    prev[1:] = codes[:-1]
+
+    hyphen = (codes & HYPHEN) != 0
+    open_quote = (codes & OPEN_QUOTE) != 0
+    close_quote = (codes & CLOSE_QUOTE) != 0
+    # pt.is_punct and is_hyphen(t)
+    hyphen_after_punct = hyphen & ((prev & PUNCT) != 0)
+    author = (
+        # [Автор:]\n— Реплика
+        hyphen & (first | ((prev & (SPACE | NEWLINE)) != 0))
+        # Автор: [«"]Реплика[»"] OR "Реплика" — автор
+        | open_quote & (first | ((prev & (COLON | PUNCT)) != 0))
+    )
+
+    table = {
+        ReplicaState.AUTHOR: author,
+        ReplicaState.AUTHOR_INSERTION: author | hyphen_after_punct,
+        ReplicaState.REPLICA_BY_NEWLINE_AND_HYPHEN: ((codes & NEWLINE) != 0)
+        | hyphen_after_punct,
+        ReplicaState.REPLICA_BY_COLON_AND_QUOTE: close_quote,
+        ReplicaState.REPLICA_BY_QUOTE: close_quote | hyphen_after_punct,
+    }
+    return [np.flatnonzero(table[state]) for state in ReplicaState]
+
+
+class LineMatches:
+    """
+    Matches of a token matcher in a Doc, indexed by their start token.
+    The matcher is run over a whole line (up to a token with a newline) the
+    first time a match starting in it is asked for; matches never cross
+    line ends, since the line is also where a decision point's search ends.
+    """
+
+    def __init__(self, doc: Doc, matcher: Matcher, line_ends: np.ndarray):
+        self.doc = doc
+        self.matcher = matcher
+        self.line_ends = line_ends
+        self._by_start: dict[int, list[Span]] = {}
+        self._matched_lines: set[int] = set()
+
+    def starting_at(self, i: int) -> list[Span]:
+        line = int(np.searchsorted(self.line_ends, i))
+        if line not in self._matched_lines:
+            self._matched_lines.add(line)
+            start = int(self.line_ends[line - 1]) + 1 if line else 0
+            end = int(self.line_ends[line]) + 1
+            for m in self.matcher(self.doc[start:end], as_spans=True):
+                self._by_start.setdefault(m.start, []).append(m)
+        return self._by_start.get(i, [])
+
 
 def depends_on(match: Span, phrase: set[Token]):
     """
@@ -53,7 +161,7 @@ def extract_replicas(
     The function uses a state machine to process the text and identify the replicas.
     """
     replicas: list[Span] = []
-    tokens: Final[list[Token]] = []
+    replica_flags: list[int] = []  # tag bitmasks of the replicas
 
     dep_matcher = DependencyMatcher(language.vocab)
     dep_matcher.add("*", [ACTION_VERB_TO_ACTOR])
@@ -100,40 +208,64 @@ def extract_replicas(
 
         return any(t.pos in (NOUN, PROPN, PRON) for t in sample)
 
+    codes = token_classes(doc)
+    stops = significant_tokens(codes)
+    newline_at = (codes & NEWLINE) != 0
+    line_ends = np.flatnonzero(newline_at)
+    insertions = LineMatches(doc, matchers["AUTHOR_INSERTION"], line_ends)
+    endings = LineMatches(doc, matchers["AUTHOR_ENDING"], line_ends)
+
+    # The pending replica is always a contiguous run of tokens,
+    # doc[replica_start:replica_end] (None while there is none)
+    replica_start: int | None = None
+    replica_end = 0
+
+    def append_tokens(start: int, end: int):
+        nonlocal replica_start, replica_end
+        if start < end:
+            if replica_start is None:
+                replica_start = start
+            replica_end = end
+
+    def clear_tokens():
+        nonlocal replica_start
+        replica_start = None
+
     def flush_replica(*tags: Callable[[Span], Any]):
-        if tokens:
-            replica_span = doc[tokens[0].i : tokens[-1].i + 1]
+        if replica_start is not None:
+            replicas.append(doc[replica_start:replica_end])
+            flags = 0
             for tag in tags:
-                replica_span._.set(getattr(tag, "__name__", str(tag)), True)
-            replicas.append(replica_span)
-            tokens.clear()
-
-    states: deque[
-        Literal[
-            "author",
-            "author_insertion",
-            "replica_by_newline_and_hyphen",
-            "replica_by_colon_and_quote",
-            "replica_by_quote",  # Can be a mistreated author's speech
-        ]
-    ] = deque(maxlen=3)
-    states.append("author")
-
-    ti = -1  # token index
-    doc_length = len(doc)
-    while ti + 1 < doc_length:
-        ti += 1
+                flags |= replica_tag_bit(getattr(tag, "__name__", str(tag)))
+            replica_flags.append(flags)
+            clear_tokens()
 
-        pt: Token | None = doc[ti - 1] if ti > 0 else None
-        nt: Token | None = doc[ti + 1] if ti + 1 < doc_length else None
-        nnt: Token | None = doc[ti + 2] if ti + 2 < doc_length else None
-        t: Token = doc[ti]
+    states: deque[ReplicaState] = deque(maxlen=3)
+    states.append(ReplicaState.AUTHOR)
 
+    ti = 0  # index of the next token to process
+    doc_length = len(doc)
+    while ti < doc_length:
         state = states[-1]
 
-        if state == "replica_by_quote":
-            if is_close_quote(t):
-                if has_newline(t) or (nt and has_newline(nt)):
+        # jump to the next token that matters in the current state
+        state_stops = stops[state]
+        k = int(np.searchsorted(state_stops, ti))
+        i = int(state_stops[k]) if k < len(state_stops) else doc_length
+        if state in REPLICA_STATES:
+            append_tokens(ti, i)
+        if i >= doc_length:
+            break
+        ti = i + 1
+
+        pt: Token | None = doc[i - 1] if i > 0 else None
+        nt: Token | None = doc[i + 1] if i + 1 < doc_length else None
+        nnt: Token | None = doc[i + 2] if i + 2 < doc_length else None
+        flags = codes[i]
+
+        if state == ReplicaState.REPLICA_BY_QUOTE:
+            if flags & CLOSE_QUOTE:
+                if newline_at[i] or (nt and newline_at[i + 1]):
                     # "\n OR ".\n
                     flush_replica()
                 elif nt and (is_hyphen(nt) or (nt.is_punct and nnt and is_hyphen(nnt))):
@@ -141,155 +273,129 @@ def extract_replicas(
                     flush_replica(is_before_author_ending)
                 else:
                     # skip, just a quoted author speech
-                    tokens.clear()
-                states.append("author")
-            elif pt and pt.is_punct and is_hyphen(t):
+                    clear_tokens()
+                states.append(ReplicaState.AUTHOR)
+            else:  # a hyphen after punctuation
                 flush_replica(is_before_author_insertion)
-                states.append("author_insertion")
-            else:
-                tokens.append(t)
+                states.append(ReplicaState.AUTHOR_INSERTION)
 
-        elif state == "replica_by_colon_and_quote":
-            if is_close_quote(t):
-                flush_replica(is_after_author_starting)
-                states.append("author")
-            else:
-                tokens.append(t)
+        elif state == ReplicaState.REPLICA_BY_COLON_AND_QUOTE:  # a close quote
+            flush_replica(is_after_author_starting)
+            states.append(ReplicaState.AUTHOR)
 
-        elif state == "replica_by_newline_and_hyphen":
-            if has_newline(t):
-                tokens.append(t)
-                if doc[tokens[0].i - 2].text == ":":
+        elif state == ReplicaState.REPLICA_BY_NEWLINE_AND_HYPHEN:
+            if newline_at[i]:
+                append_tokens(i, i + 1)
+                assert replica_start is not None
+                if doc[replica_start - 2].text == ":":
                     flush_replica(is_after_author_starting)
                 else:
                     flush_replica(is_unannotated_alternation)
-                states.append("author")
-
-            elif pt and pt.is_punct and is_hyphen(t):
-                # (+) onomatopoeia
-                # — Все тихо, и вдруг — бам-бам-бам! — заколотили в дверь...
-                # — Из кустов — кря! — ...
-                # (-) not an onomatopoeia
-                # — То — дедам! — Сказал ...
-                if (
-                    pt.text in ("!",)
-                    and nt
-                    and not nt.is_title
-                    and len(tokens) > 2
-                    and (
-                        # found a — [word] [punct] — construct
-                        is_hyphen(tokens[-3])
-                        # where [word] is not a noun
-                        and tokens[-2].pos not in (NOUN, PRON, PROPN)
-                        or
-                        # found a repetitive sequence (x-x)
-                        is_hyphen(tokens[-3])
-                        and tokens[-2].lemma_ == tokens[-4].lemma_
-                    )
-                ):
-                    tokens.append(t)
-                    continue
+                states.append(ReplicaState.AUTHOR)
+                continue
+
+            # a hyphen after punctuation: an author insertion or ending
+            # decision point, falls back to token-level matching
+            assert pt is not None
+            if replica_start is None:
+                tokens = doc[i:i]
+            else:
+                tokens = doc[replica_start:replica_end]
+
+            # (+) onomatopoeia
+            # — Все тихо, и вдруг — бам-бам-бам! — заколотили в дверь...
+            # — Из кустов — кря! — ...
+            # (-) not an onomatopoeia
+            # — То — дедам! — Сказал ...
+            if (
+                pt.text in ("!",)
+                and nt
+                and not nt.is_title
+                and len(tokens) > 2
+                and (
+                    # found a — [word] [punct] — construct
+                    is_hyphen(tokens[-3])
+                    # where [word] is not a noun
+                    and tokens[-2].pos not in (NOUN, PRON, PROPN)
+                    or
+                    # found a repetitive sequence (x-x)
+                    is_hyphen(tokens[-3])
+                    and tokens[-2].lemma_ == tokens[-4].lemma_
+                )
+            ):
+                append_tokens(i, i + 1)
+                continue
 
-                phrase = {t for t in tokens if t.is_alpha}
+            phrase = {t for t in tokens if t.is_alpha}
 
-                # checking for author insertion
-                line_end_i = doc_length
-                for i, token in enumerate(doc[pt.i :], pt.i):
-                    if has_newline(token) or token.i == doc_length - 1:
-                        line_end_i = i
-                        break
-                results = matchers["AUTHOR_INSERTION"](
-                    doc[pt.i : line_end_i + 1], as_spans=True
-                )
-                match: Span | None = None
-                for m in results:
-                    if m.start != pt.i:
-                        continue
-                    if not is_author_annotation(m):
-                        continue
-                    if depends_on(m, phrase) and not (
-                        (pt and pt.text in SENTENCE_END_PUNCT)
-                        or has_explicit_subject(m)
-                    ):
-                        continue
-                    match = m
+            # checking for author insertion
+            match: Span | None = None
+            for m in insertions.starting_at(pt.i):
+                if not is_author_annotation(m):
+                    continue
+                if depends_on(m, phrase) and not (
+                    (pt and pt.text in SENTENCE_END_PUNCT) or has_explicit_subject(m)
+                ):
+                    continue
+                match = m
+                break
+            if match:
+                flush_replica(is_before_author_insertion)
+                # skip to the end of author insertion
+                ti = match[:-2].end + 1
+                continue
+
+            # checking for author ending
+            for m in endings.starting_at(pt.i):
+                # may be an interrogative or exclamatory ending of a speech
+                # e.g. После всего этого, — что ты еще сказал?
+                if m[0] != pt and m[0].is_punct:
+                    append_tokens(i, i + 1)
                     break
-                if match:
-                    flush_replica(is_before_author_insertion)
-                    # skip to the end of author insertion
-                    ti = match[:-2].end
+                if depends_on(m, phrase) and not (
+                    (pt and pt.text in SENTENCE_END_PUNCT) or has_explicit_subject(m)
+                ):
                     continue
-
-                # checking for author ending
-                results = matchers["AUTHOR_ENDING"](
-                    doc[pt.i : line_end_i + 1], as_spans=True
-                )
-                for m in results:
-                    if m.start != pt.i:
-                        continue
-                    # may be an interrogative or exclamatory ending of a speech
-                    # e.g. После всего этого, — что ты еще сказал?
-                    if m[0] != pt and m[0].is_punct:
-                        tokens.append(t)
-                        break
-                    if depends_on(m, phrase) and not (
-                        (pt and pt.text in SENTENCE_END_PUNCT)
-                        or has_explicit_subject(m)
-                    ):
-                        continue
-                    if is_author_annotation(m):
-                        flush_replica(is_before_author_ending)
-                        states.append("author")
-                        # skip to the end of author ending
-                        ti = m.end - 1
-                        break
-                    # - 1 is a line break offset
-                    if is_author_annotation(m) and (
-                        m.end >= doc_length - 1 or has_newline(doc[m.end - 1])
-                    ):
-                        flush_replica(is_before_author_ending)
-                        states.append("author")
-                        # skip to the end of author ending
-                        ti = m.end - 1
-                        break
-                else:
-                    tokens.append(t)
-
+                if is_author_annotation(m):
+                    flush_replica(is_before_author_ending)
+                    states.append(ReplicaState.AUTHOR)
+                    # skip to the end of author ending
+                    ti = m.end
+                    break
+                # - 1 is a line break offset
+                if is_author_annotation(m) and (
+                    m.end >= doc_length - 1 or newline_at[m.end - 1]
+                ):
+                    flush_replica(is_before_author_ending)
+                    states.append(ReplicaState.AUTHOR)
+                    # skip to the end of author ending
+                    ti = m.end
+                    break
             else:
-                tokens.append(t)
+                append_tokens(i, i + 1)
 
         # author* -> replica* transitions
-        elif (pt is None or pt.is_space or has_newline(pt)) and is_hyphen(t):
+        elif (pt is None or pt.is_space or newline_at[i - 1]) and flags & HYPHEN:
             # [Автор:]\n— Реплика
-            states.append("replica_by_newline_and_hyphen")
+            states.append(ReplicaState.REPLICA_BY_NEWLINE_AND_HYPHEN)
 
-        elif pt and ":" in pt.text and is_open_quote(t):
+        elif pt and codes[i - 1] & COLON and flags & OPEN_QUOTE:
             # Автор: [«"]Реплика[»"]
-            states.append("replica_by_colon_and_quote")
+            states.append(ReplicaState.REPLICA_BY_COLON_AND_QUOTE)
 
-        elif (not pt or pt.is_punct) and is_open_quote(t):
+        elif (not pt or pt.is_punct) and flags & OPEN_QUOTE:
             # "Реплика" — автор
-            states.append("replica_by_quote")
+            states.append(ReplicaState.REPLICA_BY_QUOTE)
 
-        elif state == "author_insertion" and pt and pt.is_punct and is_hyphen(t):
+        else:  # a hyphen after punctuation in an author insertion
             # — автор<punct> — [Рр]еплика
             #                 ^
             # return to the state preceding the author insertion
             states.append(states[-2])
 
-    if "replica" in states[-1]:
+    if states[-1] in REPLICA_STATES:
         flush_replica()  # may have a trailing replica
 
-    def copy_replica_tags(source: Span, target: Span) -> None:
-        for tag in (
-            is_before_author_insertion,
-            is_before_author_ending,
-            is_after_author_starting,
-            is_unannotated_alternation,
-        ):
-            if getattr(source._, tag.__name__, False):
-                target._.set(tag.__name__, True)
-
     def extend_interrogative_tail(replica: Span) -> Span:
         if not replica or replica.end >= len(doc):
             return replica
@@ -305,7 +411,7 @@ def extract_replicas(
             steps += 1
             if steps > 15:
                 break
-            if has_newline(token):
+            if newline_at[idx]:
                 break
             if "Second" in token.morph.get("Person", []):
                 has_second_person = True
@@ -316,11 +422,10 @@ def extract_replicas(
                 break
             idx += 1
         if tail_end and has_second_person:
-            extended = doc[replica.start : tail_end]
-            copy_replica_tags(replica, extended)
-            return extended
+            return doc[replica.start : tail_end]
         return replica
 
     replicas = [extend_interrogative_tail(replica) for replica in replicas]
+    doc._.replica_tags = replica_tag_table(replicas, replica_flags)
 
     return replicas
@@ -1,10 +1,13 @@
 from collections.abc import Callable
 
+import numpy as np
 import spacy
 from spacy import Language
+from spacy.attrs import IS_PUNCT  # type: ignore
+from spacy.tokens import Doc
 
-from ttc.language.common.token_extensions import has_newline
-from ttc.language.russian.token_extensions import is_hyphen
+from ttc.language.common.constants import HYPHENS
+from ttc.language.common.features import newline_mask, orth_column
 
 NAME = "patched_sentencizer"
 
@@ -39,38 +42,44 @@ class Sentencizer(spacy.pipeline.Sentencizer):
             guesses = [[] for doc in docs]
             return guesses
 
+        punct_chars = frozenset(self.default_punct_chars)
         guesses = []
         for doc in docs:
-            doc_guesses = [False] * len(doc)
+            if len(doc) == 0:
+                guesses.append([])
+                continue
+            guesses.append(sentence_starts(doc, punct_chars).tolist())
 
-            if len(doc) > 0:
-                start = 0
-                seen_period = False
-                doc_guesses[0] = True
+        return guesses
 
-                for i, token in enumerate(doc):
-                    is_in_punct_chars = token.text in self.default_punct_chars
-                    # An actual TTC patch is here
-                    # (sentence splits by newlines; hyphen starts a sentence)
-                    #  ~~~~~~~~~~~~~~~~~~~~~~
-                    if has_newline(token):
-                        doc_guesses[start] = True
-                        start = token.i + int(not is_hyphen(token))
-                        seen_period = False
-                    elif (
-                        seen_period
-                        and (not token.is_punct or is_hyphen(token))
-                        and not is_in_punct_chars
-                    ):
-                        doc_guesses[start] = True
-                        start = token.i
-                        seen_period = False
-                    elif is_in_punct_chars:
-                        seen_period = True
 
-                if start < len(doc):
-                    doc_guesses[start] = True
+def sentence_starts(doc: Doc, punct_chars: frozenset[str]) -> np.ndarray:
+    """
+    Sentence start flags of the tokens of a non-empty Doc, as the spaCy
+    sentencizer loop sets them, with the TTC patch: sentences are also split
+    by newlines, and a hyphen followed by a newline starts the next one.
+    """
+    n = len(doc)
+    newline = newline_mask(doc)
+    hyphen = orth_column(doc, lambda text: text in HYPHENS)
+    period = orth_column(doc, punct_chars.__contains__)
+    punct = doc.to_array(IS_PUNCT).astype(bool)
+    # tokens after which a sentence ends on the next non-period token ...
+    sets_period = period & ~newline
+    # ... which is one of these (they also reset a pending period)
+    may_break = (~punct | hyphen) & ~period & ~newline
 
-            guesses.append(doc_guesses)
+    # a token breaks the sentence iff the last event before it set a period
+    events = np.flatnonzero(newline | sets_period | may_break)
+    after_period = np.zeros(len(events), dtype=bool)
+    after_period[1:] = sets_period[events[:-1]]
+    breaks = events[may_break[events] & after_period]
 
-        return guesses
+    line_starts = np.flatnonzero(newline)
+    line_starts += ~hyphen[line_starts]
+
+    starts = np.zeros(n + 1, dtype=bool)
+    starts[0] = True
+    starts[breaks] = True
+    starts[line_starts] = True
+    return starts[:n]
@@ -0,0 +1,147 @@
+"""Two-tier classification: a small model first, a large one where unsure.
+
+The small model trails the large one by only a couple of points, mostly on
+replicas whose actor was guessed from speakers taking turns or not found
+at all (see :meth:`ttc.language.Play.confidence`). The play of the small
+model is kept for every other replica; the lines around uncertain ones are
+parsed again with the large model, which attributes them instead.
+"""
+
+from collections.abc import Iterable, Iterator
+from typing import Final
+
+from spacy.tokens import Doc, Span
+
+from ttc.language import ConversationClassifier, Dialogue, Play
+from ttc.language.russian.conversation_classifier import (
+    RussianConversationClassifier,
+)
+
+CONFIDENCE_THRESHOLD: Final = 0.5
+"""Replicas attributed with a lower confidence are re-parsed: with the
+heuristic :data:`ttc.language.play.CONFIDENCE`, those guessed from turn
+taking or a repeat, and those left unattributed."""
+
+CONTEXT_REPLICAS: Final = 3
+"""Replicas before an uncertain one that are re-parsed with it, as context."""
+
+
+def original_text(doc: Doc) -> str:
+    """The (normalized) text of a Doc made by ``extract_dialogue``, with its
+    newlines back."""
+    chars = list(doc.text)
+    for i in doc._.nl_indices:
+        chars[i] = "\n"
+    return "".join(chars)
+
+
+def _line_start(text: str, i: int) -> int:
+    return text.rfind("\n", 0, i) + 1
+
+
+def _line_end(text: str, i: int) -> int:
+    return len(text) if (end := text.find("\n", i)) < 0 else end
+
+
+def escalation_regions(
+    text: str, replicas: list[Span], uncertain: list[int]
+) -> list[tuple[int, int, list[int]]]:
+    """
+    ``(start_char, end_char, replica indices)`` of the whole lines to re-parse
+    for the ``uncertain`` replica indices: from the line above the
+    ``CONTEXT_REPLICAS`` preceding replicas to the end of the uncertain one's
+    line, overlapping regions merged.
+    """
+    regions: list[tuple[int, int, list[int]]] = []
+    for i in uncertain:
+        start = _line_start(text, replicas[max(0, i - CONTEXT_REPLICAS)].start_char)
+        if start:
+            start = _line_start(text, start - 1)
+        end = _line_end(text, replicas[i].end_char)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(end, regions[-1][1]), regions[-1][2])
+            regions[-1][2].append(i)
+        else:
+            regions.append((start, end, [i]))
+    return regions
+
+
+class TieredConversationClassifier(ConversationClassifier):
+    """A Russian classifier escalating uncertain replicas to a larger model.
+
+    ``n_replicas`` and ``n_escalated`` count the replicas classified and
+    re-parsed so far.
+    """
+
+    def __init__(
+        self,
+        model_size: str | None = None,
+        accurate_size: str = "lg",
+        threshold: float = CONFIDENCE_THRESHOLD,
+    ):
+        super().__init__()
+        self.fast = RussianConversationClassifier(model_size or "sm")
+        self.language = self.fast.language
+        self.accurate_size = accurate_size
+        self.threshold = threshold
+        self._accurate: RussianConversationClassifier | None = None
+        self.n_replicas = 0
+        self.n_escalated = 0
+
+    @property
+    def accurate(self) -> RussianConversationClassifier:
+        """The large-model classifier, loaded on first use."""
+        if self._accurate is None:
+            self._accurate = RussianConversationClassifier(self.accurate_size)
+        return self._accurate
+
+    @property
+    def variant(self) -> str:
+        """Cache key suffix, see :func:`ttc.predictions.model_id`."""
+        return f"+{self.accurate_size}@{self.threshold}"
+
+    def extract_dialogue(self, text: str) -> Dialogue:
+        return self.fast.extract_dialogue(text)
+
+    def extract_dialogues(self, texts: Iterable[str]) -> Iterator[Dialogue]:
+        return self.fast.extract_dialogues(texts)
+
+    def connect_play(self, dialogue: Dialogue) -> Play:
+        play = self.fast.connect_play(dialogue)
+        replicas = dialogue.replicas
+        uncertain = [
+            i
+            for i, r in enumerate(replicas)
+            if r in play and play.confidence(r) < self.threshold
+        ]
+        self.n_replicas += len(replicas)
+        self.n_escalated += len(uncertain)
+        if uncertain:
+            text = original_text(dialogue.doc)
+            for start, end, indices in escalation_regions(text, replicas, uncertain):
+                self._escalate(
+                    play, dialogue.doc, text, start, end, [replicas[i] for i in indices]
+                )
+        return play
+
+    def _escalate(
+        self, play: Play, doc: Doc, text: str, start: int, end: int, targets: list
+    ) -> None:
+        """Re-attribute ``targets`` by the large model's play of their region."""
+        dialogue = self.accurate.extract_dialogue(text[start:end])
+        accurate = self.accurate.connect_play(dialogue)
+        by_offsets = {
+            (r.start_char + start, r.end_char + start): r for r in accurate.replicas
+        }
+        for replica in targets:
+            # keep the small model's guess where the large one has none
+            if (r := by_offsets.get((replica.start_char, replica.end_char))) is None:
+                continue
+            if (actor := accurate[r]) is None:
+                continue
+            span = doc.char_span(actor.start_char + start, actor.end_char + start)
+            if span is None:
+                continue
+            play[replica] = span
+            if (source := accurate.sources.get(r)) is not None:
+                play.sources[replica] = source
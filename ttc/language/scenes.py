@@ -0,0 +1,197 @@
+"""Scene segmentation of a dialogue, for classifying scenes independently.
+
+Play context (who spoke last, who was mentioned above) rarely crosses a
+scene break: a blank line, a ``***`` separator line or a long stretch of
+narrative without replicas. Each scene can then be connected on its own,
+in parallel worker processes, and the scene plays merged in order.
+"""
+
+import pickle
+import re
+from bisect import bisect_left, bisect_right
+from collections.abc import Hashable, Iterable, Iterator, Sequence
+from itertools import pairwise
+from typing import Final, cast
+
+from spacy.tokens import Doc, Span, Token
+
+from ttc.language.conversation_classifier import ConversationClassifier
+from ttc.language.dialogue import Dialogue
+from ttc.language.play import Play
+from ttc.pool import WorkerPool
+
+MAX_NARRATIVE_TOKENS: Final = 400
+"""Narrative longer than this between two replicas starts a new scene."""
+
+SEPARATOR_LINE: Final = re.compile(r"\s*(?:[*#~]\s*){3,}")
+
+
+def is_scene_break(doc: Doc, start: int, end: int, newlines: list[int]) -> bool:
+    """
+    Whether the tokens ``doc[start:end]`` between two replicas break a scene;
+    ``newlines`` are the sorted ``doc._.nl_indices``.
+    """
+    if end - start > MAX_NARRATIVE_TOKENS:
+        return True
+    # from the end of the previous replica to the start of the next one
+    start_char = doc[start - 1].idx + len(doc[start - 1]) if start else 0
+    end_char = doc[end].idx if end < len(doc) else len(doc.text)
+    between = newlines[
+        bisect_left(newlines, start_char) : bisect_right(newlines, end_char)
+    ]
+    # only whole lines count, from one newline to the next
+    for line_start, line_end in pairwise(between):
+        line = doc.text[line_start + 1 : line_end]
+        if not line.strip() or SEPARATOR_LINE.fullmatch(line):
+            return True
+    return False
+
+
+def split_scenes(dialogue: Dialogue) -> list[Dialogue]:
+    """Dialogues of the scenes of ``dialogue``, sharing its Doc."""
+    scenes: list[Dialogue] = []
+    replicas = dialogue.replicas
+    newlines = sorted(dialogue.doc._.nl_indices)
+    first = 0
+    for i in range(1, len(replicas) + 1):
+        if i == len(replicas) or is_scene_break(
+            dialogue.doc, replicas[i - 1].end, replicas[i].start, newlines
+        ):
+            scenes.append(Dialogue(dialogue.language, dialogue.doc, replicas[first:i]))
+            first = i
+    return scenes
+
+
+def merge_plays(dialogue: Dialogue, plays: Sequence[Play]) -> Play:
+    """One play of the scene plays of ``dialogue``, in scene order."""
+    merged = Play(dialogue.language)
+    for play in plays:
+        for replica, actor in play.lines:
+            merged[replica] = actor
+        merged._refs.update(play._refs)
+        merged.sources.update(play.sources)
+    return merged
+
+
+def _encode(obj: Span | Token | None) -> Hashable:
+    if obj is None:
+        return None
+    if isinstance(obj, Token):
+        return (obj.i,)
+    return obj.start, obj.end
+
+
+def _decode(doc: Doc, offsets) -> Span | Token | None:
+    if offsets is None:
+        return None
+    if len(offsets) == 1:
+        return doc[offsets[0]]
+    return doc[offsets[0] : offsets[1]]
+
+
+def _play_offsets(play: Play) -> tuple[list, list]:
+    return (
+        [(_encode(r), _encode(a), play.sources.get(r)) for r, a in play.lines],
+        [(_encode(ref), _encode(a)) for ref, a in play._refs.items()],
+    )
+
+
+def _play_from_offsets(dialogue: Dialogue, lines: list, refs: list) -> Play:
+    play = Play(dialogue.language)
+    doc = dialogue.doc
+    for (start, end), actor, source in lines:
+        play[span := doc[start:end]] = _decode(doc, actor)
+        if source is not None:
+            play.sources[span] = source
+    for ref, actor in refs:
+        # ref chains are of tokens, though Play._refs is keyed by spans;
+        # their actors are spans or None
+        play._refs[cast(Span, _decode(doc, ref))] = cast(
+            Span | None, _decode(doc, actor)
+        )
+    return play
+
+
+def _connect_scene_batch(cc: ConversationClassifier, task) -> list:
+    """Pool task: connect scenes of a serialized Doc, return them as offsets."""
+    doc_bytes, user_data, scenes = task
+    doc = Doc(cc.language.vocab).from_bytes(doc_bytes)
+    doc.user_data.update(pickle.loads(user_data))
+    return [
+        _play_offsets(
+            cc.connect_play(
+                Dialogue(cc.language, doc, [doc[start:end] for start, end in scene])
+            )
+        )
+        for scene in scenes
+    ]
+
+
+def connect_scenes(
+    cc: ConversationClassifier, dialogue: Dialogue, pool: WorkerPool | None = None
+) -> Play:
+    """
+    Connect the play of ``dialogue`` scene by scene. With a ``pool``
+    (sharing ``cc``), scenes are connected in its workers; the Doc is
+    serialized once per worker batch.
+    """
+    scenes = split_scenes(dialogue)
+    if pool is None or len(scenes) < 2:
+        return merge_plays(dialogue, [cc.connect_play(scene) for scene in scenes])
+
+    doc = dialogue.doc
+    doc_bytes = doc.to_bytes(exclude=["user_data"])
+    user_data = pickle.dumps(doc.user_data)
+    # contiguous batches of roughly equal replica counts, one per worker
+    batches: list[list[list[tuple[int, int]]]] = [[] for _ in range(pool.workers)]
+    per_batch = len(dialogue.replicas) / pool.workers
+    done = 0
+    for scene in scenes:
+        batches[min(int(done // per_batch), pool.workers - 1)].append(
+            [(r.start, r.end) for r in scene.replicas]
+        )
+        done += len(scene.replicas)
+    results = pool.map(
+        _connect_scene_batch,
+        [(doc_bytes, user_data, batch) for batch in batches if batch],
+    )
+    return merge_plays(
+        dialogue,
+        [
+            _play_from_offsets(dialogue, lines, refs)
+            for batch in results
+            for lines, refs in batch
+        ],
+    )
+
+
+class SceneClassifier(ConversationClassifier):
+    """``cc`` connecting every text scene by scene (see :func:`connect_scenes`).
+
+    Rarely crossing a scene break is not never: wrapping a classifier lets
+    ``ttc eval --scenes`` measure what splitting costs against ``cc`` itself.
+    """
+
+    def __init__(self, cc: ConversationClassifier):
+        self.cc = cc
+        self.language = cc.language
+
+    @property
+    def variant(self) -> str:
+        """Cache key suffix, see :func:`ttc.predictions.model_id`."""
+        return getattr(self.cc, "variant", "") + "+scenes"
+
+    def __getattr__(self, name: str):
+        # the counters and settings of cc, e.g. a tiered one's
+        if name == "cc":
+            raise AttributeError(name)
+        return getattr(self.cc, name)
+
+    def extract_dialogue(self, text: str) -> Dialogue:
+        return self.cc.extract_dialogue(text)
+
+    def extract_dialogues(self, texts: Iterable[str]) -> Iterator[Dialogue]:
+        return self.cc.extract_dialogues(texts)
+
+    def connect_play(self, dialogue: Dialogue) -> Play:
+        return connect_scenes(self.cc, dialogue)
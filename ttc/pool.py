@@ -0,0 +1,86 @@
+"""Worker processes sharing one pre-loaded classifier.
+
+A spaCy model with its matchers and extensions costs hundreds of MB per
+process, so workers are forked from a parent that has already loaded it:
+the read-only model pages stay shared through copy-on-write, and each
+worker only pays for what it allocates while processing.
+"""
+
+import gc
+import multiprocessing
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Self
+
+# State inherited by forked workers; set by the parent before forking.
+_shared: object = None
+
+
+def _call(fn: Callable[[Any, Any], Any], item: Any) -> Any:
+    return fn(_shared, item)
+
+
+class WorkerPool:
+    """Runs ``fn(shared, item)`` over items in forked worker processes.
+
+    ``shared`` (typically a loaded classifier) is never pickled: workers
+    inherit it from the parent's memory. Only ``fn``, the items and the
+    results cross process boundaries, so they must be picklable, and ``fn``
+    must be a module-level function.
+    """
+
+    def __init__(self, shared: object, workers: int):
+        global _shared
+        if _shared is not None and _shared is not shared:
+            raise RuntimeError("another WorkerPool is already sharing state")
+        _shared = shared
+        self.workers = workers
+        # Move everything loaded so far out of the collector's generations:
+        # collections in the workers would otherwise write to the GC headers
+        # of every model object and un-share their pages.
+        gc.collect()
+        gc.freeze()
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        )
+
+    def map(self, fn: Callable[[Any, Any], Any], items: Iterable) -> Iterator:
+        """Like :func:`map`, preserving the order of ``items``."""
+        return self._executor.map(partial(_call, fn), items)
+
+    def submit(self, fn: Callable[[Any, Any], Any], item: Any) -> Future:
+        """Schedule ``fn(shared, item)``; results can be taken as they complete."""
+        return self._executor.submit(_call, fn, item)
+
+    def close(self) -> None:
+        global _shared
+        self._executor.shutdown()
+        gc.unfreeze()
+        _shared = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def process_memory(pid: int | str = "self") -> dict[str, int]:
+    """Memory counters of a process in kB, from ``/proc/<pid>/smaps_rollup``.
+
+    ``Rss`` counts shared pages in full; ``Pss`` splits them between their
+    sharers; ``Private_Dirty`` is what the process added or un-shared.
+    """
+    counters: dict[str, int] = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value, *_ = line.split()
+        counters[name.rstrip(":")] = int(value)
+    return counters
+
+
+def worker_memory(_shared_state: object, _item: object) -> tuple[int, dict[str, int]]:
+    """Pool task reporting the calling worker's pid and memory counters."""
+    return os.getpid(), process_memory()
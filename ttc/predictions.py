@@ -0,0 +1,155 @@
+"""Pipeline predictions as plain offsets, and an on-disk cache for them.
+
+A prediction is stored as the :class:`PlayRow` offsets of a play, with the
+actor lemma, which is all that is needed to re-score it against
+gold (see :func:`ttc.eval.actor_key_of`). Cached predictions are keyed by
+the text digest, the spaCy model and the TTC code version, so editing an
+alias section or a gold pair never invalidates them, while any change to
+``ttc/language`` or the model does.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+
+from ttc.language import ConversationClassifier, PlayRow
+
+LANGUAGE_ROOT = Path(__file__).parent / "language"
+
+
+def predict(cc: ConversationClassifier, text: str) -> tuple[list[PlayRow], float]:
+    """Run the full pipeline; returns the predictions and the seconds spent."""
+    started = time.perf_counter()
+    rows = list(cc.classify(text).rows)
+    return rows, time.perf_counter() - started
+
+
+def predict_all(
+    cc: ConversationClassifier, texts: Iterable[str]
+) -> Iterator[tuple[list[PlayRow], float]]:
+    """:func:`predict` for a batch of texts, parsed together by
+    ``cc.classify_all``; the seconds of a text are those spent until its
+    play was connected, so the first of a parsed batch pays for parsing it.
+    """
+    started = time.perf_counter()
+    for result in cc.classify_all(texts):
+        rows = list(result.rows)
+        yield rows, time.perf_counter() - started
+        started = time.perf_counter()
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def model_id(cc: ConversationClassifier) -> str:
+    meta = cc.language.meta
+    # e.g. a tiered classifier, answering from a second model too
+    variant = getattr(cc, "variant", "")
+    return f"{meta['lang']}_{meta['name']}-{meta['version']}{variant}"
+
+
+def code_version(root: Path = LANGUAGE_ROOT) -> str:
+    """Git tree hash of ``root``, or a content digest if it is not committed.
+
+    Uncommitted edits (the usual state while tuning rules) and installs
+    outside a git checkout fall back to hashing the sources directly, so a
+    rule change always yields a new version.
+    """
+    try:
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--", "."],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        if not dirty:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD:./"],
+                cwd=root,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    digest = hashlib.sha1()
+    for path in sorted(root.rglob("*.py")):
+        digest.update(path.relative_to(root).as_posix().encode("utf-8") + b"\0")
+        digest.update(path.read_bytes())
+    return f"src-{digest.hexdigest()}"
+
+
+def default_cache_dir() -> Path:
+    if env := os.environ.get("TTC_CACHE_DIR"):
+        return Path(env)
+    return Path.home() / ".cache" / "ttc"
+
+
+class PredictionCache:
+    """Serves :func:`predict` results from ``root`` for unchanged inputs."""
+
+    def __init__(self, cc: ConversationClassifier, root: Path | None = None):
+        self.cc = cc
+        self.dir = (
+            (root or default_cache_dir())
+            / "predictions"
+            / model_id(cc)
+            / code_version()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, text: str) -> Path:
+        return self.dir / f"{text_digest(text)}.json"
+
+    def get(self, text: str) -> tuple[list[PlayRow], float] | None:
+        try:
+            entry = json.loads(self._path(text).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return [PlayRow(*row) for row in entry["lines"]], entry["seconds"]
+
+    def put(self, text: str, rows: list[PlayRow], seconds: float) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(text)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps(
+                {"seconds": seconds, "lines": [list(row) for row in rows]},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        tmp.replace(path)
+
+    def predict(self, text: str) -> tuple[list[PlayRow], float]:
+        if (cached := self.get(text)) is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        rows, seconds = predict(self.cc, text)
+        self.put(text, rows, seconds)
+        return rows, seconds
+
+    def predict_all(
+        self, texts: Sequence[str]
+    ) -> Iterator[tuple[list[PlayRow], float]]:
+        """:meth:`predict` for a batch of texts; those not cached are
+        classified together (see :func:`predict_all`)."""
+        cached = [self.get(text) for text in texts]
+        fresh = predict_all(self.cc, [t for t, c in zip(texts, cached) if c is None])
+        for text, hit in zip(texts, cached):
+            if hit is not None:
+                self.hits += 1
+                yield hit
+                continue
+            self.misses += 1
+            rows, seconds = next(fresh)
+            self.put(text, rows, seconds)
+            yield rows, seconds
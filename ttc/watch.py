@@ -0,0 +1,100 @@
+"""Re-evaluation of rule edits in a warm process.
+
+Tuning the rules means re-running the evaluation after every edit, and a
+fresh run pays the model load, the matcher build and the parse of every
+text before the first rule is applied. A :class:`WarmClassifier` keeps
+the loaded model and the parsed Docs instead; after an edit,
+:func:`reload_rules` re-imports only the rule modules, so the next run
+costs just the replica extraction and actor classification.
+"""
+
+import importlib
+import pickle
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Final
+
+from spacy.tokens import Doc, Span
+
+from ttc.language import ConversationClassifier, Dialogue, Play
+from ttc.language.russian.conversation_classifier import (
+    RussianConversationClassifier,
+)
+
+LANGUAGE_ROOT: Final = Path(__file__).parent / "language"
+
+RULE_MODULES: Final = (
+    # in dependency order: later modules import names from earlier ones
+    "ttc.language.common.span_extensions",
+    "ttc.language.russian.pipelines.replicizer",
+    "ttc.language.russian.pipelines.actor_classifier",
+)
+"""Modules :func:`reload_rules` re-imports; edits elsewhere need a restart."""
+
+
+def module_path(name: str) -> Path:
+    return LANGUAGE_ROOT.parent.parent.joinpath(*name.split(".")).with_suffix(".py")
+
+
+def reload_rules() -> None:
+    """Re-import :data:`RULE_MODULES` and re-register their Span extensions."""
+    modules = [importlib.reload(importlib.import_module(m)) for m in RULE_MODULES]
+    for name, ext in modules[0].SPAN_EXTENSIONS.items():
+        Span.set_extension(name, **ext, force=True)
+
+
+class WarmClassifier(ConversationClassifier):
+    """A Russian classifier parsing every text once.
+
+    The pipeline output of each text is kept serialized; every
+    :meth:`extract_dialogue` restores a fresh copy and runs the current
+    replica extraction over it, and :meth:`connect_play` the current actor
+    classification.
+    """
+
+    def __init__(self, cc: RussianConversationClassifier):
+        super().__init__()
+        self.cc = cc
+        self.language = cc.language
+        self._parsed: dict[str, tuple[bytes, bytes]] = {}
+
+    def _doc(self, text: str) -> Doc:
+        if (parsed := self._parsed.get(text)) is None:
+            doc = self.cc.language(self.cc._make_doc(text))
+            parsed = self._parsed[text] = (
+                doc.to_bytes(exclude=["user_data"]),
+                pickle.dumps(doc.user_data),
+            )
+        doc_bytes, user_data = parsed
+        doc = Doc(self.language.vocab).from_bytes(doc_bytes)
+        doc.user_data.update(pickle.loads(user_data))
+        return doc
+
+    def extract_dialogue(self, text: str) -> Dialogue:
+        replicizer = importlib.import_module(RULE_MODULES[1])
+        doc = self._doc(text)
+        return Dialogue(
+            self.language,
+            doc,
+            replicizer.extract_replicas(doc, self.language, self.cc.token_matchers),
+        )
+
+    def connect_play(self, dialogue: Dialogue) -> Play:
+        actor_classifier = importlib.import_module(RULE_MODULES[2])
+        return actor_classifier.classify_actors(self.language, dialogue)
+
+
+def _mtimes(root: Path) -> dict[Path, float]:
+    return {p: p.stat().st_mtime for p in root.rglob("*.py")}
+
+
+def watch_changes(root: Path = LANGUAGE_ROOT, interval: float = 0.5) -> Iterator[set]:
+    """Sets of ``.py`` files under ``root`` changed (or added) since the last."""
+    seen = _mtimes(root)
+    while True:
+        time.sleep(interval)
+        current = _mtimes(root)
+        if changed := {p for p, mtime in current.items() if seen.get(p) != mtime}:
+            yield changed
+        seen = current